@@ -6,9 +6,13 @@ from csv import QUOTE_NONE
 from csv import QUOTE_NONNUMERIC
 
 from .__version__ import __version__
+from .batch import detect_dialects
+from .column_types import infer_column_types
+from .consistency import DetectionBudget
 from .cparser_util import field_size_limit
 from .detect import Detector
 from .detect import Detector as Sniffer
+from .detection_cache import DetectionCache
 from .dialect import excel
 from .dialect import excel_tab
 from .dialect import unix_dialect
@@ -16,6 +20,7 @@ from .dict_read_write import DictReader
 from .dict_read_write import DictWriter
 from .exceptions import Error
 from .read import reader
+from .type_cache import TypeCache
 from .wrappers import detect_dialect
 from .wrappers import read_dataframe
 from .wrappers import read_dicts
@@ -31,9 +36,11 @@ __all__ = [
     "QUOTE_NONE",
     "QUOTE_NONNUMERIC",
     "__version__",
+    "DetectionBudget",
     "field_size_limit",
     "Detector",
     "Sniffer",
+    "DetectionCache",
     "excel",
     "excel_tab",
     "unix_dialect",
@@ -41,7 +48,10 @@ __all__ = [
     "DictWriter",
     "Error",
     "reader",
+    "TypeCache",
     "detect_dialect",
+    "detect_dialects",
+    "infer_column_types",
     "read_dataframe",
     "read_dicts",
     "read_table",
@@ -1,16 +1,95 @@
 # -*- coding: utf-8 -*-
 
+import sys
+
+from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Match
+from typing import Optional
 from typing import Pattern
+from typing import Union
 
 import regex
 
+
+class LazyPattern:
+    """A regular expression that is compiled when it is first used
+
+    Compiling all patterns would take a large part of the time needed to
+    import the package, while most programs only use a few of them. The
+    source of the pattern is available without compiling it, and the
+    matching methods compile the pattern on their first call. Other
+    attributes of the compiled pattern are available from :attr:`compiled`.
+    """
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self._compiled: Optional[Pattern[str]] = None
+
+    @property
+    def compiled(self) -> Pattern[str]:
+        """The compiled pattern"""
+        if self._compiled is None:
+            self._compiled = regex.compile(self.pattern)
+        return self._compiled
+
+    def match(
+        self, string: str, pos: int = 0, endpos: int = sys.maxsize
+    ) -> Optional[Match[str]]:
+        return self.compiled.match(string, pos, endpos)
+
+    def fullmatch(
+        self, string: str, pos: int = 0, endpos: int = sys.maxsize
+    ) -> Optional[Match[str]]:
+        return self.compiled.fullmatch(string, pos, endpos)
+
+    def search(
+        self, string: str, pos: int = 0, endpos: int = sys.maxsize
+    ) -> Optional[Match[str]]:
+        return self.compiled.search(string, pos, endpos)
+
+    def finditer(
+        self, string: str, pos: int = 0, endpos: int = sys.maxsize
+    ) -> Iterator[Match[str]]:
+        return self.compiled.finditer(string, pos, endpos)
+
+    def findall(
+        self, string: str, pos: int = 0, endpos: int = sys.maxsize
+    ) -> List[Any]:
+        return self.compiled.findall(string, pos, endpos)
+
+    def split(self, string: str, maxsplit: int = 0) -> List[Any]:
+        return self.compiled.split(string, maxsplit)
+
+    def sub(
+        self,
+        repl: Union[str, Callable[[Match[str]], str]],
+        string: str,
+        count: int = 0,
+    ) -> str:
+        return self.compiled.sub(repl, string, count)
+
+    def __repr__(self) -> str:
+        return "LazyPattern(%r)" % self.pattern
+
+
+#: A compiled regular expression, or one that is compiled when it is used
+TypePattern = Union[Pattern[str], LazyPattern]
+
+
+def lazy_compile(pattern: str) -> LazyPattern:
+    """Create a regular expression that is compiled when it is first used"""
+    return LazyPattern(pattern)
+
+
 ##########################################
 # Regular expressions for number formats #
 ##########################################
 
-PATTERN_NUMBER_1: Pattern[str] = regex.compile(
+PATTERN_NUMBER_1: LazyPattern = lazy_compile(
     r"^(?=[+-\.\d])"
     r"[+-]?"
     r"(?:0|[1-9]\d*)?"
@@ -35,11 +114,11 @@ PATTERN_NUMBER_1: Pattern[str] = regex.compile(
     r"$"
 )
 
-PATTERN_NUMBER_2: Pattern[str] = regex.compile(
+PATTERN_NUMBER_2: LazyPattern = lazy_compile(
     r"[+-]?(?:[1-9]|[1-9]\d{0,2})(?:\,\d{3})+\.\d*"
 )
 
-PATTERN_NUMBER_3: Pattern[str] = regex.compile(
+PATTERN_NUMBER_3: LazyPattern = lazy_compile(
     r"[+-]?(?:[1-9]|[1-9]\d{0,2})(?:\.\d{3})+\,\d*"
 )
 
@@ -47,7 +126,38 @@ PATTERN_NUMBER_3: Pattern[str] = regex.compile(
 # Regular expressions for url, email, and ip #
 ##############################################
 
-PATTERN_URL: Pattern[str] = regex.compile(
+# The labels of a domain name are matched without backtracking, and the
+# top-level domain and the optional extension at the end are checked with a
+# lookbehind. This keeps the matching time linear in the length of the cell.
+# Only a full match of a cell is the same as for PATTERN_URL_FILTER.
+PATTERN_URL: LazyPattern = lazy_compile(
+    r"("
+    r"(https?|ftp):\/\/(?!\-)"
+    r")?"
+    r"("
+    r"[\p{L}\p{N}-]++(?:\.[\p{L}\p{N}-]++)++"
+    r"("
+    r"(?<=\.[a-z]{2,}(\.[a-z]{2,3})?)"
+    r"(\/[\p{L}\p{N}_\/()~?=&%\-\#\.:]*+)?"
+    r"|"
+    r"(?<=\.[a-z]{2,}(\.[a-z]{2,3})?\.[a-z]+)"
+    r")"
+    r"|"
+    r"("
+    r"localhost(\:\d{1,5})?"
+    r"|"
+    r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(\:\d{1,5})?)"
+    r")"
+    r"(\/[\p{L}\p{N}_\/()~?=&%\-\#\.:]*+)?"
+    r"(\.[a-z]+)?"
+    r")"
+)
+
+# The URL pattern that is replaced in the data by filter_urls. The labels of
+# a domain name are matched with backtracking, so that a match can end at an
+# earlier top-level domain, as in "foo.com" of "foo.com-bar". PATTERN_URL
+# can't give back a label and finds no match there.
+PATTERN_URL_FILTER: LazyPattern = lazy_compile(
     r"("
     r"(https?|ftp):\/\/(?!\-)"
     r")?"
@@ -62,17 +172,32 @@ PATTERN_URL: Pattern[str] = regex.compile(
     r"(\.[a-z]+)?"
 )
 
-PATTERN_EMAIL: Pattern[str] = regex.compile(
+# Every match of PATTERN_URL_FILTER lies in a run of the characters below and
+# contains one of the anchors: the dot of a lowercase top-level domain,
+# "localhost", or the dots of an IPv4 address. See filter_urls.
+PATTERN_URL_ANCHOR: LazyPattern = lazy_compile(
+    r"\.(?:[a-z]{2}|\d{1,3}\.\d{1,3}\.\d)|localhost"
+)
+
+PATTERN_URL_CHARS: LazyPattern = lazy_compile(
+    r"[\p{L}\p{N}_\/()~?=&%\-\#\.:]*+"
+)
+
+PATTERN_URL_CHARS_REVERSE: LazyPattern = lazy_compile(
+    r"(?r)[\p{L}\p{N}_\/()~?=&%\-\#\.:]*+"
+)
+
+PATTERN_EMAIL: LazyPattern = lazy_compile(
     r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
 )
 
-PATTERN_IPV4: Pattern[str] = regex.compile(r"(?:\d{1,3}\.){3}\d{1,3}")
+PATTERN_IPV4: LazyPattern = lazy_compile(r"(?:\d{1,3}\.){3}\d{1,3}")
 
 #################################################
 # Regular expressions related to time notations #
 #################################################
 
-PATTERN_TIME_HHMMSSZZ: Pattern[str] = regex.compile(
+PATTERN_TIME_HHMMSSZZ: LazyPattern = lazy_compile(
     r"(0[0-9]|1[0-9]|2[0-3])"
     r":"
     r"([0-5][0-9])"
@@ -84,23 +209,23 @@ PATTERN_TIME_HHMMSSZZ: Pattern[str] = regex.compile(
     r"([0-5][0-9])"
 )
 
-PATTERN_TIME_HHMMSS: Pattern[str] = regex.compile(
+PATTERN_TIME_HHMMSS: LazyPattern = lazy_compile(
     r"(0[0-9]|1[0-9]|2[0-3]):([0-5][0-9]):([0-5][0-9])"
 )
 
-PATTERN_TIME_HHMM_1: Pattern[str] = regex.compile(
+PATTERN_TIME_HHMM_1: LazyPattern = lazy_compile(
     r"(0[0-9]|1[0-9]|2[0-3]):([0-5][0-9])"
 )
 
-PATTERN_TIME_HHMM_2: Pattern[str] = regex.compile(
+PATTERN_TIME_HHMM_2: LazyPattern = lazy_compile(
     r"(0[0-9]|1[0-9]|2[0-3])([0-5][0-9])"
 )
 
-PATTERN_TIME_HH: Pattern[str] = regex.compile(
+PATTERN_TIME_HH: LazyPattern = lazy_compile(
     r"(0[0-9]|1[0-9]|2[0-3])([0-5][0-9])"
 )
 
-PATTERN_TIME_HMM: Pattern[str] = regex.compile(
+PATTERN_TIME_HMM: LazyPattern = lazy_compile(
     r"([0-9]|1[0-9]|2[0-3]):([0-5][0-9])"
 )
 
@@ -111,7 +236,7 @@ PATTERN_TIME_HMM: Pattern[str] = regex.compile(
 # Regex for various date formats. See
 # https://github.com/alan-turing-institute/CleverCSV/blob/master/notes/date_regex/dateregex_annotated.txt
 # for an explanation.
-PATTERN_DATE: Pattern[str] = regex.compile(
+PATTERN_DATE: LazyPattern = lazy_compile(
     r"("
     r"(0[1-9]|1[0-2])"
     r"("
@@ -240,15 +365,15 @@ QUOTED_SPECIALS_ALLOWED: List[str] = [
 ALPHANUM_SPECIALS: str = regex.escape(r"".join(SPECIALS_ALLOWED))
 
 # Regex for alphanumeric text
-PATTERN_ALPHANUM: Pattern[str] = regex.compile(
+PATTERN_ALPHANUM: LazyPattern = lazy_compile(
     r"("
-    r"\p{N}?\p{L}+"
+    r"\p{N}?+\p{L}++"
     r"["
-    r"\p{N}\p{L}\ " + ALPHANUM_SPECIALS + r"]*"
+    r"\p{N}\p{L}\ " + ALPHANUM_SPECIALS + r"]*+"
     r"|"
-    r"\p{L}?"
+    r"\p{L}?+"
     r"["
-    r"\p{N}\p{L}\ " + ALPHANUM_SPECIALS + r"]+"
+    r"\p{N}\p{L}\ " + ALPHANUM_SPECIALS + r"]++"
     r")"
 )
 
@@ -256,15 +381,15 @@ ALPANUM_QUOTED_SPECIALS: str = regex.escape(
     r"".join(SPECIALS_ALLOWED) + r"".join(QUOTED_SPECIALS_ALLOWED)
 )
 # Regex for alphanumeric text in quoted strings
-PATTERN_ALPHANUM_QUOTED: Pattern[str] = regex.compile(
+PATTERN_ALPHANUM_QUOTED: LazyPattern = lazy_compile(
     r"("
-    r"\p{N}?\p{L}+"
+    r"\p{N}?+\p{L}++"
     r"["
-    r"\p{N}\p{L}\ " + ALPANUM_QUOTED_SPECIALS + r"]*"
+    r"\p{N}\p{L}\ " + ALPANUM_QUOTED_SPECIALS + r"]*+"
     r"|"
-    r"\p{L}?"
+    r"\p{L}?+"
     r"["
-    r"\p{N}\p{L}\ " + ALPANUM_QUOTED_SPECIALS + r"]+"
+    r"\p{N}\p{L}\ " + ALPANUM_QUOTED_SPECIALS + r"]++"
     r")"
 )
 
@@ -272,21 +397,21 @@ PATTERN_ALPHANUM_QUOTED: Pattern[str] = regex.compile(
 # Regular expression for currency #
 ###################################
 
-PATTERN_CURRENCY: Pattern[str] = regex.compile(r"\p{Sc}\s?(.*)")
+PATTERN_CURRENCY: LazyPattern = lazy_compile(r"\p{Sc}\s?(.*)")
 
 #####################################
 # Regular expression for unix paths #
 #####################################
 
-PATTERN_UNIX_PATH: Pattern[str] = regex.compile(
-    r"[~.]?(?:\/[a-zA-Z0-9\.\-\_]+)+\/?"
+PATTERN_UNIX_PATH: LazyPattern = lazy_compile(
+    r"[~.]?(?:\/[a-zA-Z0-9\.\-\_]++)++\/?"
 )
 
 ################################################
 # Map of regular expresions for type detection #
 ################################################
 
-DEFAULT_TYPE_REGEXES: Dict[str, Pattern[str]] = {
+DEFAULT_TYPE_REGEXES: Dict[str, LazyPattern] = {
     "number_1": PATTERN_NUMBER_1,
     "number_2": PATTERN_NUMBER_2,
     "number_3": PATTERN_NUMBER_3,
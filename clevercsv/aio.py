@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""
+Asyncio wrappers for detecting the dialect of and reading CSV files.
+
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import AsyncIterator
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from .dialect import SimpleDialect
+from .encoding import get_encoding
+from .exceptions import NoDetectionResult
+from .read import reader
+from .wrappers import detect_dialect
+
+if TYPE_CHECKING:
+    from ._types import FileDescriptorOrPath
+    from ._types import _DialectLike
+
+#: Default number of rows that are read in the executor at a time
+DEFAULT_BATCH_SIZE: int = 1000
+
+
+async def get_encoding_async(
+    filename: "FileDescriptorOrPath",
+    executor: Optional[Executor] = None,
+) -> Optional[str]:
+    """Detect the encoding of a file without blocking the event loop
+
+    Parameters
+    ----------
+    filename : str
+        Path of the file
+
+    executor : Optional[Executor]
+        The executor to run encoding detection in. If None, the default
+        executor of the event loop is used.
+
+    Returns
+    -------
+    encoding : Optional[str]
+        The encoding of the file. See :func:`clevercsv.encoding.get_encoding`.
+
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, get_encoding, filename)
+
+
+async def detect_dialect_async(
+    filename: "FileDescriptorOrPath",
+    executor: Optional[Executor] = None,
+    **kwargs: Any,
+) -> Optional[SimpleDialect]:
+    """Detect the dialect of a CSV file without blocking the event loop
+
+    Reading the file and dialect detection are run in the given executor.
+    Since detection is CPU-bound, a
+    :class:`~concurrent.futures.ProcessPoolExecutor` allows detection to run
+    in parallel for multiple files. In that case the arguments must be
+    picklable, so a ``type_cache`` or ``detection_cache`` can't be used.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the CSV file
+
+    executor : Optional[Executor]
+        The executor to run detection in. If None, the default executor of
+        the event loop is used.
+
+    **kwargs
+        Keyword arguments for :func:`clevercsv.wrappers.detect_dialect`.
+
+    Returns
+    -------
+    dialect : Optional[SimpleDialect]
+        The detected dialect, or None if detection failed.
+
+    """
+    loop = asyncio.get_running_loop()
+    func = functools.partial(detect_dialect, filename, **kwargs)
+    return await loop.run_in_executor(executor, func)
+
+
+async def stream_table_async(
+    filename: "FileDescriptorOrPath",
+    dialect: Optional["_DialectLike"] = None,
+    encoding: Optional[str] = None,
+    num_chars: Optional[int] = None,
+    verbose: bool = False,
+    executor: Optional[Executor] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> AsyncIterator[List[str]]:
+    """Read a CSV file as an asynchronous iterator over rows of a table
+
+    The encoding and the dialect are detected in the executor if they are not
+    provided. The rows are then read from the file in batches of
+    ``batch_size`` rows. A batch is only read when the previous batch has
+    been consumed, so a slow consumer never causes more than one batch to be
+    held in memory.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the CSV file
+
+    dialect : str, SimpleDialect, or csv.Dialect object
+        If the dialect is known, it can be provided here. If None, the
+        dialect will be detected.
+
+    encoding : str
+        The encoding of the file. If None, it is detected.
+
+    num_chars : int
+        Number of characters to use to detect the dialect. If None, use the
+        entire file.
+
+    verbose : bool
+        Whether or not to show detection progress.
+
+    executor : Optional[Executor]
+        The executor to run detection and reading in. If None, the default
+        executor of the event loop is used. An open file can't be shared
+        between processes, so if this is a
+        :class:`~concurrent.futures.ProcessPoolExecutor` it is only used for
+        detection and the rows are read in the default executor.
+
+    batch_size : int
+        The number of rows to read in the executor at a time.
+
+    Yields
+    ------
+    rows : List[str]
+        The rows of the file.
+
+    Raises
+    ------
+    NoDetectionResult
+        When the dialect detection fails.
+
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+
+    loop = asyncio.get_running_loop()
+    if encoding is None:
+        encoding = await get_encoding_async(filename, executor=executor)
+    if dialect is None:
+        dialect = await detect_dialect_async(
+            filename,
+            executor=executor,
+            num_chars=num_chars,
+            encoding=encoding,
+            verbose=verbose,
+        )
+        if dialect is None:
+            raise NoDetectionResult()
+
+    read_executor = executor
+    if isinstance(executor, ProcessPoolExecutor):
+        read_executor = None
+
+    fp = await loop.run_in_executor(
+        read_executor,
+        functools.partial(open, filename, "r", newline="", encoding=encoding),
+    )
+    rows = reader(fp, dialect)
+    pending: Optional[asyncio.Future[List[List[str]]]] = None
+    try:
+        while True:
+            pending = loop.run_in_executor(
+                read_executor, _next_batch, rows, batch_size
+            )
+            batch = await pending
+            for row in batch:
+                yield row
+            if len(batch) < batch_size:
+                return
+    finally:
+        if pending is None or pending.done():
+            fp.close()
+        else:
+            # the consumer was cancelled while a batch was being read
+            pending.add_done_callback(lambda _: fp.close())
+
+
+async def read_table_async(
+    filename: "FileDescriptorOrPath",
+    dialect: Optional["_DialectLike"] = None,
+    encoding: Optional[str] = None,
+    num_chars: Optional[int] = None,
+    verbose: bool = False,
+    executor: Optional[Executor] = None,
+) -> List[List[str]]:
+    """Read a CSV file as a table without blocking the event loop
+
+    See :func:`stream_table_async` for a description of the parameters.
+
+    Returns
+    -------
+    rows : List[List[str]]
+        Returns rows as a list of lists.
+
+    Raises
+    ------
+    NoDetectionResult
+        When the dialect detection fails.
+
+    """
+    return [
+        row
+        async for row in stream_table_async(
+            filename,
+            dialect=dialect,
+            encoding=encoding,
+            num_chars=num_chars,
+            verbose=verbose,
+            executor=executor,
+        )
+    ]
+
+
+def _next_batch(rows: Iterator[List[str]], size: int) -> List[List[str]]:
+    batch: List[List[str]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            break
+    return batch
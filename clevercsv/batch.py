@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+
+"""
+Dialect detection for many files with a pool of worker processes.
+
+"""
+
+import dataclasses
+import os
+import time
+
+from typing import TYPE_CHECKING
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from ._types import AnyPath
+from .consistency import DetectionBudget
+from .detect import Detector
+from .dialect import SimpleDialect
+from .encoding import get_encoding
+from .exceptions import NoDetectionResult
+from .type_cache import TypeCache
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+
+# The detector of a worker process, which is kept between files so that its
+# type cache stays warm.
+_worker_detector: Optional[Detector] = None
+
+
+class DetectionResult(NamedTuple):
+    """Result of dialect detection for a single file
+
+    The ``error`` is None if detection succeeded. If the file couldn't be
+    read or detection failed, ``error`` holds the exception and ``dialect``
+    is None. This is a :class:`TimeoutError` if detection took longer than
+    the timeout, and a :class:`ChildProcessError` if the worker process
+    exited. If the detection budget was exhausted, ``approximate`` is True
+    and ``dialect`` holds the best dialect found so far.
+    """
+
+    path: AnyPath
+    dialect: Optional[SimpleDialect]
+    encoding: Optional[str]
+    error: Optional[Exception]
+    approximate: bool = False
+
+
+def _init_worker(cache_capacity: Optional[int]) -> None:
+    global _worker_detector
+    _worker_detector = Detector(type_cache=TypeCache(capacity=cache_capacity))
+
+
+def _detect_file(
+    detector: Detector,
+    path: AnyPath,
+    num_chars: Optional[int],
+    encoding: Optional[str],
+    method: str,
+    skip: bool,
+    budget: Optional[DetectionBudget],
+) -> DetectionResult:
+    start = time.monotonic()
+    enc = encoding
+    try:
+        enc = encoding or get_encoding(path)
+        with open(path, "r", newline="", encoding=enc) as fp:
+            data = fp.read(num_chars) if num_chars else fp.read()
+        if budget is not None and budget.max_time is not None:
+            remaining = budget.max_time - (time.monotonic() - start)
+            budget = dataclasses.replace(budget, max_time=max(0.0, remaining))
+        dialect = detector.detect(
+            data, method=method, skip=skip, budget=budget
+        )
+    except Exception as err:
+        return DetectionResult(path, None, enc, err)
+
+    error = NoDetectionResult() if dialect is None else None
+    return DetectionResult(path, dialect, enc, error, detector.approximate_)
+
+
+# A task of a worker process: the path, number of characters, encoding,
+# method, skip, and budget of _detect_file
+_Task = Tuple[
+    AnyPath, Optional[int], Optional[str], str, bool, Optional[DetectionBudget]
+]
+
+
+def _worker_main(conn: "Connection", cache_capacity: Optional[int]) -> None:
+    # Detect the dialect of the files that are received, until None is
+    # received. None is also sent once the worker is ready.
+    _init_worker(cache_capacity)
+    assert _worker_detector is not None
+    conn.send(None)
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        result = _detect_file(_worker_detector, *task)
+        try:
+            conn.send(result)
+        except Exception:
+            # the error can't be pickled
+            conn.send(result._replace(error=RuntimeError(repr(result.error))))
+
+
+class _Worker:
+    """A worker process that detects the dialect of one file at a time
+
+    The worker is replaced by a new process if it is killed, so that it can
+    be stopped when it exceeds the timeout for a file.
+    """
+
+    def __init__(self, cache_capacity: Optional[int]) -> None:
+        self.cache_capacity = cache_capacity
+        self.task: Optional[_Task] = None
+        self.deadline = float("inf")
+        self._start()
+
+    def _start(self) -> None:
+        import multiprocessing
+
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_main,
+            args=(child_conn, self.cache_capacity),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def submit(self, task: _Task, timeout: Optional[float]) -> None:
+        if not self.process.is_alive():
+            self.kill()
+            self._start()
+        if not self.ready:
+            # the timeout doesn't include the start of the process
+            try:
+                self.conn.recv()
+            except EOFError:
+                raise ChildProcessError("Worker process failed to start")
+            self.ready = True
+        self.conn.send(task)
+        self.task = task
+        if timeout is not None:
+            self.deadline = time.monotonic() + timeout
+
+    def receive(self) -> DetectionResult:
+        assert self.task is not None
+        path, encoding = self.task[0], self.task[2]
+        self.task = None
+        self.deadline = float("inf")
+        try:
+            result: DetectionResult = self.conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            error = ChildProcessError(
+                "Worker process exited with code %s" % self.process.exitcode
+            )
+            self._start()
+            return DetectionResult(path, None, encoding, error)
+        except Exception as err:
+            # the error can't be unpickled
+            return DetectionResult(path, None, encoding, err)
+        # the path of the caller instead of a copy
+        return result._replace(path=path)
+
+    def cancel(self, error: Exception) -> DetectionResult:
+        assert self.task is not None
+        path, encoding = self.task[0], self.task[2]
+        self.task = None
+        self.deadline = float("inf")
+        self.kill()
+        self._start()
+        return DetectionResult(path, None, encoding, error)
+
+    def stop(self) -> None:
+        if self.task is None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(1.0)
+        self.kill()
+
+
+def detect_dialects(
+    paths: Iterable[AnyPath],
+    workers: Optional[int] = None,
+    num_chars: Optional[int] = None,
+    encoding: Optional[str] = None,
+    method: str = "auto",
+    skip: bool = True,
+    budget: Optional[DetectionBudget] = None,
+    timeout: Optional[float] = None,
+    cache_capacity: Optional[int] = 100_000,
+) -> Iterator[DetectionResult]:
+    """Detect the dialects of many CSV files
+
+    Detection is run in a pool of worker processes. Every worker keeps a
+    :class:`~clevercsv.detect.Detector` with a
+    :class:`~clevercsv.type_cache.TypeCache` for all the files it processes,
+    which avoids repeating the start-up work for every file. Every worker
+    processes one file at a time, and the paths are taken from ``paths`` as
+    workers become free. The results are yielded in the order in which they
+    finish, which is not necessarily the order of ``paths``.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        The paths of the CSV files
+
+    workers : Optional[int]
+        The number of worker processes. If None, the number of CPUs is used.
+        If 1 and ``timeout`` is None, detection is run in the current
+        process.
+
+    num_chars : Optional[int]
+        Number of characters to read from each file for detection. If None,
+        the entire file is read.
+
+    encoding : Optional[str]
+        The encoding of the files. If None, it is detected for every file.
+
+    method : str
+        Dialect detection method to use. See :func:`detect_dialect`.
+
+    skip : bool
+        Skip computation of the type score for dialects with a low pattern
+        score. See :func:`detect_dialect`.
+
+    budget : Optional[DetectionBudget]
+        Limits on the work spent on dialect detection for a single file. The
+        time spent on detecting the encoding and reading the file counts
+        towards the time budget. This is a soft limit that is only checked
+        during the consistency measure (see
+        :class:`~clevercsv.consistency.DetectionBudget`). If the budget is
+        exhausted, the result has ``approximate`` set to True and the best
+        dialect found so far as ``dialect``.
+
+    timeout : Optional[float]
+        Maximum time in seconds for a single file. A worker that exceeds it
+        is killed and replaced by a new process, and the result of the file
+        has a :class:`TimeoutError` as ``error``. Use it together with
+        ``budget`` to get an approximate dialect for most slow files, and a
+        hard limit for the files that the budget doesn't stop. If None,
+        there is no limit.
+
+    cache_capacity : Optional[int]
+        The capacity of the type cache of each worker. See
+        :class:`~clevercsv.type_cache.TypeCache`.
+
+    Yields
+    ------
+    result : DetectionResult
+        A named tuple ``(path, dialect, encoding, error, approximate)`` for
+        every file. Errors are reported in the result instead of being
+        raised, including errors of worker processes that exit.
+
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Number of workers must be positive")
+    if timeout is not None and timeout <= 0:
+        raise ValueError("Timeout must be positive")
+
+    if workers == 1 and timeout is None:
+        detector = Detector(type_cache=TypeCache(capacity=cache_capacity))
+        for path in paths:
+            yield _detect_file(
+                detector, path, num_chars, encoding, method, skip, budget
+            )
+        return
+
+    # The connections are imported here, since they are only needed for
+    # worker processes and importing them takes a while
+    from multiprocessing.connection import wait
+
+    pool: List[_Worker] = []
+    try:
+        pool.extend(_Worker(cache_capacity) for _ in range(workers))
+        todo = iter(paths)
+        exhausted = False
+        while True:
+            for worker in pool:
+                if worker.task is None and not exhausted:
+                    next_path = next(todo, None)
+                    if next_path is None:
+                        exhausted = True
+                        break
+                    task = (
+                        next_path,
+                        num_chars,
+                        encoding,
+                        method,
+                        skip,
+                        budget,
+                    )
+                    worker.submit(task, timeout)
+            busy = [worker for worker in pool if worker.task is not None]
+            if not busy:
+                return
+
+            deadline = min(worker.deadline for worker in busy)
+            wait_time = None
+            if deadline != float("inf"):
+                wait_time = max(0.0, deadline - time.monotonic())
+            ready = set(
+                wait(
+                    [w.conn for w in busy]
+                    + [w.process.sentinel for w in busy],
+                    wait_time,
+                )
+            )
+            for worker in busy:
+                if worker.conn in ready or worker.process.sentinel in ready:
+                    yield worker.receive()
+                elif (
+                    timeout is not None and time.monotonic() >= worker.deadline
+                ):
+                    yield worker.cancel(
+                        TimeoutError(
+                            "Detection took longer than %g seconds" % timeout
+                        )
+                    )
+    finally:
+        # workers that are still busy when the consumer stops are killed
+        for worker in pool:
+            worker.stop()
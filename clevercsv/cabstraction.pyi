@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
+from typing import List
 from typing import Optional
+from typing import Tuple
 
 def base_abstraction(
     data: str,
@@ -9,3 +11,6 @@ def base_abstraction(
     escapechar: Optional[str],
 ) -> str: ...
 def c_merge_with_quotechar(data: str) -> str: ...
+def c_masked_by_quotechar(
+    data: str, pairs: List[Tuple[str, str]], test_chars: str
+) -> List[str]: ...
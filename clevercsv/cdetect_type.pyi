@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any
+from typing import Callable
+
+def number(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def number_1(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def number_2(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def number_3(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def time(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def time_hmm(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def time_hhmm(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def time_hhmmss(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def time_hhmmsszz(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def time_HHMM(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def time_HH(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def date(fallback: Callable[[str], Any], cell: str) -> bool: ...
+def json_structure(cell: str, max_depth: int) -> bool: ...
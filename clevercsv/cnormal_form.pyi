@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import Tuple
+
+def normal_forms(
+    rows: List[str], delimiters: str, quotechars: str
+) -> List[Tuple[int, str, str]]: ...
+def preceding_chars(data: str, chars: str) -> Dict[str, Set[str]]: ...
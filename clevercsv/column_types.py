@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+Inference of the types of the columns of a CSV file.
+
+"""
+
+from __future__ import annotations
+
+import itertools
+
+from collections import Counter
+
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Pattern
+
+import regex
+
+from .detect_type import TypeDetector
+from .encoding import get_encoding
+from .read import reader
+
+if TYPE_CHECKING:
+    from ._types import FileDescriptorOrPath
+    from ._types import _DialectLike
+
+#: Number of rows that are classified at a time
+INFERENCE_BATCH_SIZE: int = 1000
+
+#: Number of rows that read_dataframe classifies to infer the column types
+DEFAULT_SAMPLE_ROWS: int = 1000
+
+# Numbers that can be parsed as 64-bit integers or as floats by pandas
+_PATTERN_INTEGER: Pattern[str] = regex.compile(r"[+-]?[0-9]{1,18}")
+_PATTERN_FLOAT: Pattern[str] = regex.compile(
+    r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+)
+
+# Dates and times in ISO 8601 format that pandas parses unambiguously
+_PATTERN_ISO_DATE: Pattern[str] = regex.compile(
+    r"[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])"
+)
+_PATTERN_ISO_DATETIME: Pattern[str] = regex.compile(
+    r"[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])"
+    r"[T ](?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]"
+)
+
+# Values of the nan type that pandas reads as missing by default
+_PANDAS_NA_VALUES = frozenset(["N/A", "NA", "NaN", "n/a", "nan"])
+
+
+def _refine_type(cell: str, cell_type: Optional[str]) -> Optional[str]:
+    if cell_type == "number":
+        if _PATTERN_INTEGER.fullmatch(cell):
+            return "integer"
+        if _PATTERN_FLOAT.fullmatch(cell):
+            return "float"
+    elif cell_type == "nan" and cell in _PANDAS_NA_VALUES:
+        return "missing"
+    elif cell_type == "date" and _PATTERN_ISO_DATE.fullmatch(cell):
+        return "iso_date"
+    elif cell_type == "datetime" and _PATTERN_ISO_DATETIME.fullmatch(cell):
+        return "iso_datetime"
+    return cell_type
+
+
+def infer_column_types(
+    filename: "FileDescriptorOrPath",
+    dialect: "_DialectLike",
+    encoding: Optional[str] = None,
+    sample_rows: Optional[int] = None,
+    header: bool = False,
+) -> List[Dict[Optional[str], int]]:
+    """Compute a histogram of the types of the cells of every column
+
+    The file is read in a single streaming pass, and the types of the cells
+    are detected with a :class:`~clevercsv.detect_type.TypeDetector`.
+    Numbers are further divided into the types ``integer`` and ``float`` if
+    they can be parsed as such without whitespace, a thousands separator, or
+    a decimal comma. Other numbers keep the type ``number``. Cells of the
+    ``nan`` type that pandas reads as a missing value by default get the
+    type ``missing``. Dates of the form ``YYYY-MM-DD`` get the type
+    ``iso_date``, and date times of the form ``YYYY-MM-DD HH:MM:SS`` (with a
+    space or a ``T`` as separator) get the type ``iso_datetime``. Other
+    dates and date times keep the type ``date`` or ``datetime``.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the CSV file
+
+    dialect : str, SimpleDialect, or csv.Dialect object
+        The dialect of the CSV file
+
+    encoding : Optional[str]
+        The encoding of the file. If None, it is detected.
+
+    sample_rows : Optional[int]
+        Maximum number of rows to use. If None, all rows are used.
+
+    header : bool
+        Whether the first row is a header. If True, it is skipped.
+
+    Returns
+    -------
+    histograms : List[Dict[Optional[str], int]]
+        For every column, the number of cells of each type. The key None is
+        used for cells of an unknown type. Rows that are shorter than others
+        don't add to the histograms of the missing columns.
+
+    """
+    if sample_rows is not None and sample_rows < 0:
+        raise ValueError("sample_rows must be non-negative")
+    if encoding is None:
+        encoding = get_encoding(filename)
+
+    td = TypeDetector(adaptive=True)
+    histograms: List[Counter[Optional[str]]] = []
+    with open(filename, "r", newline="", encoding=encoding) as fp:
+        csv_reader = reader(fp, dialect=dialect)
+        if header:
+            next(csv_reader, None)
+        rows = itertools.islice(csv_reader, sample_rows)
+        while True:
+            batch = list(itertools.islice(rows, INFERENCE_BATCH_SIZE))
+            if not batch:
+                break
+            for i, column in enumerate(itertools.zip_longest(*batch)):
+                if i == len(histograms):
+                    histograms.append(Counter())
+                cells = [cell for cell in column if cell is not None]
+                histograms[i].update(
+                    _refine_type(cell, cell_type)
+                    for cell, cell_type in zip(cells, td.detect_types(cells))
+                )
+    return [dict(h) for h in histograms]
+
+
+def column_dtype(histogram: Dict[Optional[str], int]) -> Optional[str]:
+    """Choose the pandas dtype of a column from its type histogram
+
+    Parameters
+    ----------
+    histogram : Dict[Optional[str], int]
+        The type histogram of the column, see :func:`infer_column_types`.
+
+    Returns
+    -------
+    dtype : Optional[str]
+        The dtype of the column. This is ``"int64"`` for a column of
+        integers, ``"float64"`` for a column of integers and floats or a
+        column of integers with missing values, ``"datetime"`` for a column
+        of ISO 8601 dates or of ISO 8601 date times, and ``"str"`` for a
+        column that mixes numbers with other types. It is None if pandas can
+        infer the type of the column by itself, for instance if all cells
+        are text or missing. Columns with other dates are also None, since
+        their format can be ambiguous (for instance if the day or the month
+        comes first) and such dates are left as text by pandas.
+
+    """
+    missing = ("empty", "missing")
+    types = {t for t, count in histogram.items() if count} - set(missing)
+    if not types:
+        return None
+    if types == {"integer"}:
+        if any(histogram.get(t) for t in missing):
+            return "float64"
+        return "int64"
+    if types <= {"integer", "float"}:
+        return "float64"
+    if types == {"iso_date"} or types == {"iso_datetime"}:
+        return "datetime"
+    if types & {"integer", "float", "number"}:
+        return "str"
+    return None
@@ -7,22 +7,41 @@ Author: Gertjan van den Burg
 
 """
 
+import io
+import math
+import random
+import time
+
 from dataclasses import dataclass
 from functools import lru_cache
+from statistics import NormalDist
 
+from typing import Callable
 from typing import Dict
 from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 
-from . import field_size_limit
 from .break_ties import tie_breaker
+from .cparser_util import count_known_types
+from .cparser_util import field_size_limit
+from .cparser_util import parse_data
 from .cparser_util import parse_string
+from .detect_pattern import abstraction_pattern_score
+from .detect_pattern import make_abstraction
+from .detect_pattern import max_num_cells
 from .detect_pattern import pattern_score
+from .detect_pattern import pattern_score_bounds
 from .detect_type import DEFAULT_EPS_TYPE
 from .detect_type import TypeDetector
+from .detection_profile import DetectionProfile
+from .detection_profile import DialectProfile
+from .detection_profile import timed
 from .dialect import SimpleDialect
 from .potential_dialects import get_dialects
+from .type_cache import TypeCache
 
 
 @dataclass
@@ -47,6 +66,67 @@ class ConsistencyScore:
     Q: Optional[float]
 
 
+@dataclass
+class DetectionBudget:
+    """Limits on the work done during dialect detection
+
+    When the budget is exhausted, detection stops and the best dialect found
+    so far is returned. The result is then marked as approximate.
+
+    The budget is checked between dialects, and while computing the type
+    score it is checked between rows, after about every 1000 cells. Finding
+    the potential dialects, creating the abstraction for a dialect, and
+    tie-breaking are not interrupted when the budget is exhausted. The
+    budget is therefore a soft limit that may be exceeded.
+
+    Parameters
+    ----------
+    max_time : Optional[float]
+        The maximum wall time in seconds.
+
+    max_cells : Optional[int]
+        The maximum number of cells for which the type is detected.
+
+    """
+
+    max_time: Optional[float] = None
+    max_cells: Optional[int] = None
+
+
+@dataclass
+class TypeScoreSample:
+    """Container to track a type score computed on a sample of rows
+
+    Parameters
+    ----------
+    rows : List[List[Tuple[str, bool]]]
+        The parsed rows of the data for the dialect.
+
+    num_rows : int
+        The number of rows used in the sample.
+
+    T : float
+        The estimate of the type score.
+
+    T_lower : float
+        Lower bound of the confidence interval on the type score.
+
+    T_upper : float
+        Upper bound of the confidence interval on the type score.
+
+    """
+
+    rows: List[List[Tuple[str, bool]]]
+    num_rows: int
+    T: float
+    T_lower: float
+    T_upper: float
+
+    @property
+    def exact(self) -> bool:
+        return self.num_rows >= len(self.rows)
+
+
 class ConsistencyDetector:
     """Detect the dialect with the data consistency measure
 
@@ -67,6 +147,55 @@ class ConsistencyDetector:
         result greatly speeds up the computation of the consistency measure.
         The size of the cache can be changed to trade off memory use and speed.
 
+    type_sample_size : Optional[int]
+        If not None, the type score is estimated from a stratified random
+        sample of this many rows, instead of from all rows. The sample is
+        enlarged for the best dialects as long as the confidence intervals of
+        their consistency scores overlap. If the sample had to grow to include
+        all rows, the :attr:`sampling_fallback_` attribute is set to True
+        after detection.
+
+    type_sample_confidence : float
+        The confidence level of the intervals on the type score when
+        :attr:`type_sample_size` is used.
+
+    seed : Optional[int]
+        Seed for the random number generator used to draw the sample of rows.
+
+    type_cache : Optional[TypeCache]
+        A :class:`~clevercsv.type_cache.TypeCache` to use for the results of
+        type detection. Unlike the internal cache, this cache is not cleared
+        between calls to :meth:`detect`, so it can be shared between
+        detectors and reused for files with a similar vocabulary. If given,
+        :attr:`cache_capacity` is ignored.
+
+    budget : Optional[DetectionBudget]
+        Limits on the time and the number of cells used for detection. When
+        the budget is exhausted, :meth:`detect` returns the best dialect
+        found so far and the :attr:`approximate_` attribute is set to True.
+
+    profile : Optional[DetectionProfile]
+        If not None, timings of the stages of :meth:`detect`, timings for
+        every dialect, and statistics of the type cache are recorded in this
+        :class:`~clevercsv.detection_profile.DetectionProfile`.
+
+    prefilter : bool
+        Consider the dialects in order of an upper bound on their pattern
+        score, computed from the number of occurrences of the delimiter on
+        every line (see
+        :func:`~clevercsv.detect_pattern.pattern_score_bounds`). Once the
+        bound drops below the best consistency score found so far, the
+        remaining delimiters can't produce a competitive score and their
+        dialects are dropped without computing their abstraction. This
+        doesn't change the detected dialect. The dropped delimiters are
+        available in the :attr:`dropped_delimiters_` attribute after
+        detection. Only used if ``skip`` is True.
+
+    test_masked_by_quotes : bool
+        Remove potential dialects where the delimiter never occurs outside
+        quoted segments before computing any scores. See
+        :func:`~clevercsv.potential_dialects.get_dialects`.
+
     """
 
     def __init__(
@@ -74,18 +203,63 @@ class ConsistencyDetector:
         skip: bool = True,
         verbose: bool = False,
         cache_capacity: int = 100_000,
+        type_sample_size: Optional[int] = None,
+        type_sample_confidence: float = 0.99,
+        seed: Optional[int] = 0,
+        type_cache: Optional[TypeCache] = None,
+        budget: Optional[DetectionBudget] = None,
+        profile: Optional[DetectionProfile] = None,
+        prefilter: bool = False,
+        test_masked_by_quotes: bool = False,
     ) -> None:
+        if type_sample_size is not None and type_sample_size < 1:
+            raise ValueError("type_sample_size must be positive")
+        if not 0 < type_sample_confidence < 1:
+            raise ValueError("type_sample_confidence must be in (0, 1)")
         self._skip = skip
         self._verbose = verbose
-        self._type_detector = TypeDetector()
+        self._type_detector = TypeDetector(adaptive=True)
         self._cache_capacity = cache_capacity
+        self._type_sample_size = type_sample_size
+        self._type_sample_z = NormalDist().inv_cdf(
+            (1 + type_sample_confidence) / 2
+        )
+        self._seed = seed
+        self._type_cache = type_cache
+        self._budget = budget
+        self._profile = profile
+        self._prefilter = prefilter
+        self._test_masked_by_quotes = test_masked_by_quotes
+        self._deadline: Optional[float] = None
+        self._cells_left: Optional[int] = None
+        self.sampling_fallback_ = False
+        self.approximate_ = False
+        self.dropped_delimiters_: List[str] = []
+
+        self._cached_is_known_type: Callable[[str, bool], bool]
+        if type_cache is None:
+            # NOTE: A bit ugly but allows setting the cache size dynamically
+            @lru_cache(cache_capacity)
+            def cached_is_known_type(cell: str, is_quoted: bool) -> bool:
+                return self._type_detector.is_known_type(cell, is_quoted)
+
+            self._cached_is_known_type = cached_is_known_type
+            self._clear_type_cache = cached_is_known_type.cache_clear
+
+            def type_cache_counts() -> Tuple[int, int]:
+                info = cached_is_known_type.cache_info()
+                return info.hits, info.misses
+
+            self._type_cache_counts = type_cache_counts
+        else:
+            is_known_type = self._type_detector.is_known_type
 
-        # NOTE: A bit ugly but allows setting the cache size dynamically
-        @lru_cache(cache_capacity)
-        def cached_is_known_type(cell: str, is_quoted: bool) -> bool:
-            return self._type_detector.is_known_type(cell, is_quoted)
+            def shared_is_known_type(cell: str, is_quoted: bool) -> bool:
+                return type_cache.lookup(cell, is_quoted, is_known_type)
 
-        self._cached_is_known_type = cached_is_known_type
+            self._cached_is_known_type = shared_is_known_type
+            self._clear_type_cache = lambda: None
+            self._type_cache_counts = lambda: type_cache.info()[:2]
 
     def detect(
         self, data: str, delimiters: Optional[List[str]] = None
@@ -108,27 +282,133 @@ class ConsistencyDetector:
             The detected dialect. If no dialect could be detected, returns None.
 
         """
-        self._cached_is_known_type.cache_clear()
+        # Clear the private type cache of the detector. A shared TypeCache
+        # is not cleared, so it is kept between calls.
+        self._clear_type_cache()
+        self._type_detector.reset_type_order()
+        self._start_budget()
+        self.dropped_delimiters_ = []
+        profile = self._profile
+        cache_hits, cache_misses = self._type_cache_counts()
 
         # TODO: probably some optimization there too
-        dialects = get_dialects(data, delimiters=delimiters)
+        with timed(profile, "get_dialects"):
+            dialects = get_dialects(
+                data,
+                delimiters=delimiters,
+                test_masked_by_quotes=self._test_masked_by_quotes,
+                profile=profile,
+            )
 
         # TODO: This is not thread-safe and this object can simply own a Parser
         # for each dialect and set the limit directly there (we can also cache
         # the best parsing result)
         old_limit = field_size_limit(len(data) + 1)
 
-        scores = self.compute_consistency_scores(data, dialects)
+        with timed(profile, "consistency_scores"):
+            if self._type_sample_size is None:
+                scores = self.compute_consistency_scores(data, dialects)
+            else:
+                scores = self.compute_sampled_consistency_scores(
+                    data, dialects
+                )
         best_dialects = ConsistencyDetector.get_best_dialects(scores)
         result: Optional[SimpleDialect] = None
         if len(best_dialects) == 1:
             result = best_dialects[0]
+        elif self.approximate_ and best_dialects:
+            # no budget left for tie-breaking
+            result = best_dialects[0]
         else:
-            result = tie_breaker(data, best_dialects)
+            with timed(profile, "tie_breaking"):
+                result = tie_breaker(data, best_dialects)
 
         field_size_limit(old_limit)
+
+        if profile is not None:
+            hits, misses = self._type_cache_counts()
+            profile.num_dialects = len(dialects)
+            profile.type_cache_hits += hits - cache_hits
+            profile.type_cache_misses += misses - cache_misses
         return result
 
+    def _profile_dialect(
+        self,
+        dialect: SimpleDialect,
+        score: ConsistencyScore,
+        times: List[float],
+        status: str,
+    ) -> None:
+        if self._profile is None:
+            return
+        start, abstraction, pattern = times
+        end = time.perf_counter()
+        self._profile.dialects.append(
+            DialectProfile(
+                dialect,
+                abstraction_time=abstraction - start,
+                pattern_time=pattern - abstraction,
+                type_time=end - pattern,
+                pattern_score=score.P,
+                type_score=score.T,
+                status=status,
+            )
+        )
+
+    def _order_dialects(
+        self, data: str, dialects: List[SimpleDialect]
+    ) -> List[Tuple[SimpleDialect, float]]:
+        # Pair the dialects with the upper bound on their pattern score, in
+        # the order in which they are considered.
+        if not (self._prefilter and self._skip):
+            return [(dialect, math.inf) for dialect in sorted(dialects)]
+        delimiters = {d.delimiter for d in dialects if d.delimiter is not None}
+        with timed(self._profile, "prefilter"):
+            bounds = pattern_score_bounds(data, delimiters)
+        ordered = []
+        for dialect in dialects:
+            if dialect.delimiter is None:
+                ordered.append((dialect, math.inf))
+            else:
+                ordered.append((dialect, bounds[dialect.delimiter]))
+        return sorted(ordered, key=lambda item: (-item[1], item[0]))
+
+    def _drop_dialects(
+        self, dropped: List[Tuple[SimpleDialect, float]], incumbent: float
+    ) -> None:
+        delimiters = sorted(
+            {dialect.delimiter or "" for dialect, _ in dropped}
+        )
+        self.dropped_delimiters_ = delimiters
+        if self._profile is not None:
+            self._profile.dropped_delimiters = delimiters
+        if self._verbose:
+            print(
+                "Dropped %i dialects with delimiters %r (P <= %.6f < %.6f)."
+                % (len(dropped), delimiters, dropped[0][1], incumbent)
+            )
+
+    def _start_budget(self) -> None:
+        self.approximate_ = False
+        self._deadline = None
+        self._cells_left = None
+        if self._budget is None:
+            return
+        if self._budget.max_time is not None:
+            self._deadline = time.monotonic() + self._budget.max_time
+        self._cells_left = self._budget.max_cells
+
+    def _budget_exhausted(self, cells: int = 0) -> bool:
+        # Use the budget for the given number of cells and check whether the
+        # budget is exhausted.
+        if self._cells_left is not None:
+            self._cells_left -= cells
+            if self._cells_left < 0:
+                self.approximate_ = True
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            self.approximate_ = True
+        return self.approximate_
+
     def compute_consistency_scores(
         self, data: str, dialects: List[SimpleDialect]
     ) -> Dict[SimpleDialect, ConsistencyScore]:
@@ -139,7 +419,12 @@ class ConsistencyDetector:
         is instantiated with ``skip`` set to False, it also computes the type
         score for each dialect. If ``skip`` is True (the default), the type
         score is only computed if the pattern score is larger or equal to the
-        current best combined score.
+        current best combined score. In that case the computation of the type
+        score is furthermore stopped early once it is clear that the dialect
+        can no longer reach the current best combined score. If the class is
+        instantiated with ``prefilter`` set to True, dialects whose delimiter
+        can't reach the current best combined score aren't included in the
+        result.
 
         Parameters
         ----------
@@ -153,34 +438,242 @@ class ConsistencyDetector:
         -------
         scores : Dict[SimpleDialect, ConsistencyScore]
             A map with a :class:`ConsistencyScore` object for each dialect
-            provided as input.
+            provided as input, except the dialects dropped by the prefilter.
 
         """
 
         scores: Dict[SimpleDialect, ConsistencyScore] = {}
         incumbent_score = -float("inf")
-        for dialect in sorted(dialects):
-            P = pattern_score(data, dialect)
+        budgeted = self._budget is not None
+        ordered = self._order_dialects(data, dialects)
+        for i, (dialect, bound) in enumerate(ordered):
+            if budgeted and scores and self._budget_exhausted():
+                break
+            if bound < incumbent_score:
+                self._drop_dialects(ordered[i:], incumbent_score)
+                break
+
+            times = [time.perf_counter()]
+            A = make_abstraction(data, dialect)
+            times.append(time.perf_counter())
+            P = abstraction_pattern_score(A)
+            times.append(time.perf_counter())
             if P < incumbent_score and self._skip:
                 scores[dialect] = ConsistencyScore(P, None, None)
+                self._profile_dialect(
+                    dialect, scores[dialect], times, "skipped"
+                )
                 if self._verbose:
                     print("%15r:\tP = %15.6f\tskip." % (dialect, P))
                 continue
 
-            T = self.compute_type_score(data, dialect)
+            if self._skip:
+                T = self.compute_type_score(
+                    data,
+                    dialect,
+                    P=P,
+                    incumbent=incumbent_score,
+                    num_cells=max_num_cells(data, dialect),
+                )
+            else:
+                T = self.compute_type_score(data, dialect)
+            if T is None:
+                scores[dialect] = ConsistencyScore(P, None, None)
+                self._profile_dialect(
+                    dialect, scores[dialect], times, "stopped"
+                )
+                if self._verbose:
+                    print("%15r:\tP = %15.6f\tstopped early." % (dialect, P))
+                continue
+
             Q = P * T
             incumbent_score = max(incumbent_score, Q)
             scores[dialect] = ConsistencyScore(P, T, Q)
+            self._profile_dialect(dialect, scores[dialect], times, "scored")
             if self._verbose:
                 print(
                     "%15r:\tP = %15.6f\tT = %15.6f\tQ = %15.6f"
                     % (dialect, P, T, Q)
                 )
+            if self.approximate_:
+                break
+
+        if self._verbose and self.approximate_:
+            print("Detection budget exhausted, result is approximate.")
+        return scores
+
+    def compute_sampled_consistency_scores(
+        self, data: str, dialects: List[SimpleDialect]
+    ) -> Dict[SimpleDialect, ConsistencyScore]:
+        """Compute the consistency score with a sampled type score
+
+        This function is similar to :meth:`compute_consistency_scores`, but
+        the type score is estimated from a sample of the rows. A confidence
+        interval is maintained for each type score, and the sample is grown
+        for the best dialect and all dialects whose consistency score
+        interval overlaps with it, until the intervals no longer overlap or
+        the type score is computed exactly.
+
+        Parameters
+        ----------
+        data : str
+            The data of the file as a string
+
+        dialects : Iterable[SimpleDialect]
+            An iterable of delimiters to consider.
+
+        Returns
+        -------
+        scores : Dict[SimpleDialect, ConsistencyScore]
+            A map with a :class:`ConsistencyScore` object for each dialect
+            provided as input, except the dialects dropped by the prefilter.
+            The type score and the consistency score are estimates for
+            dialects whose type score wasn't computed exactly.
+
+        """
+        assert self._type_sample_size is not None
+        rng = random.Random(self._seed)
+        self.sampling_fallback_ = False
+
+        pattern_scores: Dict[SimpleDialect, float] = {}
+        samples: Dict[SimpleDialect, TypeScoreSample] = {}
+        incumbent_lower = -float("inf")
+        budgeted = self._budget is not None
+        ordered = self._order_dialects(data, dialects)
+        for i, (dialect, bound) in enumerate(ordered):
+            if budgeted and samples and self._budget_exhausted():
+                break
+            if bound < incumbent_lower:
+                self._drop_dialects(ordered[i:], incumbent_lower)
+                break
+
+            P = pattern_scores[dialect] = pattern_score(data, dialect)
+            if P < incumbent_lower and self._skip:
+                if self._verbose:
+                    print("%15r:\tP = %15.6f\tskip." % (dialect, P))
+                continue
+
+            rows = list(parse_string(data, dialect, return_quoted=True))
+            sample = self.sample_type_score(rows, self._type_sample_size, rng)
+            samples[dialect] = sample
+            incumbent_lower = max(incumbent_lower, P * sample.T_lower)
+            if self._verbose:
+                print(
+                    "%15r:\tP = %15.6f\tT = %15.6f\tQ = %15.6f\t(n = %i)"
+                    % (dialect, P, sample.T, P * sample.T, sample.num_rows)
+                )
+
+        while samples and not (budgeted and self._budget_exhausted()):
+            best = max(samples, key=lambda d: pattern_scores[d] * samples[d].T)
+            best_lower = pattern_scores[best] * samples[best].T_lower
+            overlap = [
+                d
+                for d in samples
+                if d != best
+                and pattern_scores[d] * samples[d].T_upper >= best_lower
+            ]
+            contenders = [d for d in [best] + overlap if not samples[d].exact]
+            if not overlap or not contenders:
+                break
+            for dialect in contenders:
+                sample = samples[dialect]
+                samples[dialect] = self.sample_type_score(
+                    sample.rows, 2 * sample.num_rows, rng
+                )
+                if samples[dialect].exact:
+                    self.sampling_fallback_ = True
+                if self._verbose:
+                    P = pattern_scores[dialect]
+                    T = samples[dialect].T
+                    print(
+                        "%15r:\tP = %15.6f\tT = %15.6f\tQ = %15.6f\t(n = %i)"
+                        % (dialect, P, T, P * T, samples[dialect].num_rows)
+                    )
+
+        if self._verbose and self.sampling_fallback_:
+            print("Sampled type score fell back to exact computation.")
+
+        scores: Dict[SimpleDialect, ConsistencyScore] = {}
+        for dialect, P in pattern_scores.items():
+            if dialect in samples:
+                T = samples[dialect].T
+                scores[dialect] = ConsistencyScore(P, T, P * T)
+            else:
+                scores[dialect] = ConsistencyScore(P, None, None)
         return scores
 
+    def sample_type_score(
+        self,
+        rows: List[List[Tuple[str, bool]]],
+        num_rows: int,
+        rng: random.Random,
+        eps: float = DEFAULT_EPS_TYPE,
+    ) -> TypeScoreSample:
+        """Estimate the type score from a stratified sample of rows
+
+        The rows are divided into ``num_rows`` strata of (nearly) equal size
+        and one row is drawn from each stratum. If ``num_rows`` is at least
+        the number of rows, the type score is computed exactly.
+
+        """
+        if num_rows >= len(rows):
+            sampled = rows
+        else:
+            sampled = [
+                rows[
+                    rng.randrange(
+                        i * len(rows) // num_rows,
+                        (i + 1) * len(rows) // num_rows,
+                    )
+                ]
+                for i in range(num_rows)
+            ]
+
+        total = known = 0
+        for row in sampled:
+            for cell, is_quoted in row:
+                total += 1
+                known += self._cached_is_known_type(cell, is_quoted)
+        if self._budget is not None:
+            self._budget_exhausted(total)
+
+        if not total:
+            T = T_lower = T_upper = eps
+        elif len(sampled) == len(rows):
+            T = T_lower = T_upper = max(eps, known / total)
+        else:
+            T = max(eps, known / total)
+            T_lower, T_upper = self._confidence_interval(
+                known, total, len(sampled) / len(rows)
+            )
+            T_lower = max(eps, T_lower)
+            T_upper = max(eps, T_upper)
+        return TypeScoreSample(
+            rows, min(num_rows, len(rows)), T, T_lower, T_upper
+        )
+
+    def _confidence_interval(
+        self, known: int, total: int, fraction: float
+    ) -> Tuple[float, float]:
+        # Wilson score interval, shrunk towards the point estimate with a
+        # finite population correction based on the fraction of sampled rows.
+        z = self._type_sample_z
+        p = known / total
+        denom = 1 + z * z / total
+        center = (p + z * z / (2 * total)) / denom
+        half = (
+            z
+            / denom
+            * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total))
+        )
+        fpc = math.sqrt(1 - fraction)
+        lower = p - (p - max(0.0, center - half)) * fpc
+        upper = p + (min(1.0, center + half) - p) * fpc
+        return lower, upper
+
     @staticmethod
     def get_best_dialects(
-        scores: Dict[SimpleDialect, ConsistencyScore]
+        scores: Dict[SimpleDialect, ConsistencyScore],
     ) -> List[SimpleDialect]:
         """Identify the dialects with the highest consistency score"""
         Qscores = [score.Q for score in scores.values()]
@@ -192,15 +685,255 @@ class ConsistencyDetector:
         return [d for d, score in scores.items() if score.Q == Qmax]
 
     def compute_type_score(
-        self, data: str, dialect: SimpleDialect, eps: float = DEFAULT_EPS_TYPE
+        self,
+        data: str,
+        dialect: SimpleDialect,
+        eps: float = DEFAULT_EPS_TYPE,
+        P: Optional[float] = None,
+        incumbent: Optional[float] = None,
+        num_cells: Optional[int] = None,
+    ) -> Optional[float]:
+        """Compute the type score
+
+        Parameters
+        ----------
+        data : str
+            The data of the file as a string
+
+        dialect : SimpleDialect
+            The dialect to parse the data with
+
+        eps : float
+            The minimum value of the type score
+
+        P : Optional[float]
+            The pattern score of the dialect. Used together with
+            :attr:`incumbent` and :attr:`num_cells` to stop early.
+
+        incumbent : Optional[float]
+            The best consistency score seen so far. If this is provided
+            together with :attr:`P` and :attr:`num_cells`, the computation
+            stops as soon as the consistency score ``P * T`` is guaranteed to
+            be smaller than the incumbent, even if all remaining cells were of
+            a known type.
+
+        num_cells : Optional[int]
+            An upper bound on the number of cells in the data, see
+            :func:`~clevercsv.detect_pattern.max_num_cells`. The computation
+            only stops early when the type score can't reach the incumbent
+            for any number of cells up to this bound, so a lower number can
+            incorrectly stop the computation. If more cells are encountered
+            than this number, early stopping is disabled.
+
+        Returns
+        -------
+        type_score : Optional[float]
+            The type score, or None if the computation was stopped early. If
+            the detection budget is exhausted during the computation, the
+            type score of the cells seen so far is returned.
+
+        """
+        early_stop = (
+            P is not None
+            and incumbent is not None
+            and num_cells is not None
+            and num_cells > 0
+            and P * eps < incumbent
+        )
+        budget = None
+        if self._budget is not None:
+            budget = self._budget_exhausted
+        if early_stop:
+            assert P is not None and incumbent is not None
+            counts = count_known_types(
+                data,
+                dialect,
+                self._cached_is_known_type,
+                num_cells=num_cells,
+                pattern_score=P,
+                incumbent=incumbent,
+                budget=budget,
+            )
+        else:
+            counts = count_known_types(
+                data, dialect, self._cached_is_known_type, budget=budget
+            )
+        if counts is None:
+            return None
+        known, total = counts
+        return max(eps, known / total) if total else eps
+
+
+class ProgressiveConsistencyDetector(ConsistencyDetector):
+    """Detect the dialect with the consistency measure on a growing sample
+
+    This detector is used for progressive detection, where the dialect is
+    detected on a prefix of the file that grows in every round. Data is added
+    with :meth:`update`, which returns the detected dialect for all data
+    added so far. The type score is accumulated between rounds, so that the
+    cells of earlier rounds don't have to be parsed and classified again. For
+    every dialect, parsing resumes at the end of the last row that ended
+    before the end of the data, which is always outside of quotes. The type
+    score is therefore the same as that of a single pass over all data.
+
+    The potential dialects and their pattern scores depend on all data, and
+    these are computed from scratch in every round.
+
+    Parameters
+    ----------
+    skip : bool
+        Skip computation of the type score for dialects with a low pattern
+        score.
+
+    verbose : bool
+        Print out the dialects considered and their scores.
+
+    cache_capacity: int
+        The size of the cache for type detection. The cache is kept between
+        calls to :meth:`update`.
+
+    type_cache : Optional[TypeCache]
+        A shared :class:`~clevercsv.type_cache.TypeCache` to use for the
+        results of type detection.
+
+    delimiters : Optional[List[str]]
+        List of delimiters to consider. If None, the :func:`get_delimiters`
+        function is used to automatically detect this.
+
+    test_masked_by_quotes : bool
+        Remove potential dialects where the delimiter never occurs outside
+        quoted segments. This is applied to all data in every round.
+
+    """
+
+    def __init__(
+        self,
+        skip: bool = True,
+        verbose: bool = False,
+        cache_capacity: int = 100_000,
+        type_cache: Optional[TypeCache] = None,
+        delimiters: Optional[List[str]] = None,
+        test_masked_by_quotes: bool = False,
+    ) -> None:
+        super().__init__(
+            skip=skip,
+            verbose=verbose,
+            cache_capacity=cache_capacity,
+            type_cache=type_cache,
+            test_masked_by_quotes=test_masked_by_quotes,
+        )
+        self._delimiters = delimiters
+        self._data = ""
+        self._type_counts: Dict[SimpleDialect, Tuple[int, int, int]] = {}
+
+    @property
+    def data(self) -> str:
+        """All data added so far"""
+        return self._data
+
+    def update(self, chunk: str) -> Tuple[Optional[SimpleDialect], float]:
+        """Add a chunk of data and detect the dialect on all data so far
+
+        Parameters
+        ----------
+        chunk : str
+            The data to add. For best results the chunk should end at the end
+            of a line.
+
+        Returns
+        -------
+        dialect : Optional[SimpleDialect]
+            The detected dialect, or None if no dialect could be detected.
+
+        margin : float
+            The difference between the consistency score of the detected
+            dialect and that of the runner-up. This is zero when the detected
+            dialect was selected with tie-breaking.
+
+        """
+        self._data += chunk
+        data = self._data
+
+        dialects = get_dialects(
+            data,
+            delimiters=self._delimiters,
+            test_masked_by_quotes=self._test_masked_by_quotes,
+        )
+        old_limit = field_size_limit(len(data) + 1)
+
+        scores: Dict[SimpleDialect, ConsistencyScore] = {}
+        incumbent_score = -float("inf")
+        for dialect in sorted(dialects):
+            P = pattern_score(data, dialect)
+            if P < incumbent_score and self._skip:
+                scores[dialect] = ConsistencyScore(P, None, None)
+                if self._verbose:
+                    print("%15r:\tP = %15.6f\tskip." % (dialect, P))
+                continue
+
+            T = self.accumulated_type_score(dialect)
+            Q = P * T
+            incumbent_score = max(incumbent_score, Q)
+            scores[dialect] = ConsistencyScore(P, T, Q)
+            if self._verbose:
+                print(
+                    "%15r:\tP = %15.6f\tT = %15.6f\tQ = %15.6f"
+                    % (dialect, P, T, Q)
+                )
+
+        best_dialects = ConsistencyDetector.get_best_dialects(scores)
+        result: Optional[SimpleDialect] = None
+        margin = 0.0
+        if len(best_dialects) == 1:
+            result = best_dialects[0]
+            Qs = sorted(
+                [s.Q for s in scores.values() if s.Q is not None],
+                reverse=True,
+            )
+            margin = Qs[0] - Qs[1] if len(Qs) > 1 else Qs[0]
+        elif best_dialects:
+            result = tie_breaker(data, best_dialects)
+
+        field_size_limit(old_limit)
+        return result, margin
+
+    def accumulated_type_score(
+        self, dialect: SimpleDialect, eps: float = DEFAULT_EPS_TYPE
     ) -> float:
-        """Compute the type score"""
-        total = known = 0
-        for row in parse_string(data, dialect, return_quoted=True):
-            assert all(isinstance(cell, tuple) for cell in row)
-            for cell, is_quoted in row:
-                total += 1
-                known += self._cached_is_known_type(cell, is_quoted=is_quoted)
+        """Compute the type score on all data, reusing earlier rounds
+
+        The number of known cells and the total number of cells are stored
+        for each dialect, together with the offset in the data where the last
+        row ended that was followed by more data. The parser only ends a row
+        at the end of a line and outside of quotes, so the next round can
+        start parsing from this offset with a fresh parser.
+
+        """
+        known, total, offset = self._type_counts.get(dialect, (0, 0, 0))
+        data = self._data
+        end = offset
+
+        def lines() -> Iterator[str]:
+            nonlocal end
+            for line in io.StringIO(data[offset:], newline=""):
+                end += len(line)
+                yield line
+
+        row_known = row_total = 0
+        for row in parse_data(lines(), dialect=dialect, return_quoted=True):
+            for cell in row:
+                assert isinstance(cell, tuple)
+                row_total += 1
+                row_known += self._cached_is_known_type(*cell)
+            # Rows at the end of the data may continue in the next round
+            if end < len(data):
+                known += row_known
+                total += row_total
+                offset = end
+                row_known = row_total = 0
+        self._type_counts[dialect] = (known, total, offset)
+        known += row_known
+        total += row_total
         if not total:
             return eps
         return max(eps, known / total)
@@ -211,10 +944,13 @@ def detect_dialect_consistency(
     delimiters: Optional[Iterable[str]] = None,
     skip: bool = True,
     verbose: bool = False,
+    type_sample_size: Optional[int] = None,
 ) -> Optional[SimpleDialect]:
     """Helper function that wraps ConsistencyDetector"""
     # Mostly kept for backwards compatibility
-    consistency_detector = ConsistencyDetector(skip=skip, verbose=verbose)
+    consistency_detector = ConsistencyDetector(
+        skip=skip, verbose=verbose, type_sample_size=type_sample_size
+    )
     if delimiters is not None:
         delimiters = list(delimiters)
     return consistency_detector.detect(data, delimiters=delimiters)
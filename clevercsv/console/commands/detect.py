@@ -6,9 +6,14 @@ import time
 
 from typing import Any
 from typing import Dict
+from typing import Optional
 
 from wilderness import Command
 
+from clevercsv.detect import Detector
+from clevercsv.detection_cache import DetectionCache
+from clevercsv.dialect import SimpleDialect
+from clevercsv.encoding import get_encoding
 from clevercsv.wrappers import detect_dialect
 
 from ._docs import FLAG_DESCRIPTIONS
@@ -99,6 +104,32 @@ class DetectCommand(Command):
             action="store_true",
             help="Add the runtime of the detection to the detection output.",
         )
+        self.add_argument(
+            "--cache",
+            help="Path to a cache file for detection results",
+            description=(
+                "Store the detected dialect in the given cache file (an "
+                "SQLite database, created if it doesn't exist), and reuse it "
+                "on subsequent runs when the CSV file hasn't changed. A "
+                "cached result is only used if the file has the same size "
+                "and modification time, and if detection was run with the "
+                "same options."
+            ),
+        )
+        self.add_argument(
+            "--profile",
+            action="store_true",
+            help="Report the time spent in the stages of detection",
+            description=(
+                "Print a profile of the detection, with the time spent in "
+                "each stage (such as normal form detection, finding the "
+                "potential dialects, computing the consistency scores, and "
+                "tie-breaking), the time spent on the dialects that took the "
+                "longest, and the hit rate of the type cache. With --json, "
+                "the full profile is added under the 'profile' key. The "
+                "detection cache is not used when profiling."
+            ),
+        )
 
     def handle(self) -> int:
         verbose = self.args.verbose
@@ -106,21 +137,37 @@ class DetectCommand(Command):
         method = "consistency" if self.args.consistency else "auto"
         skip = not self.args.no_skip
 
+        cache = None
+        if self.args.cache is not None and not self.args.profile:
+            cache = DetectionCache(self.args.cache)
+
+        detector = None
         t_start = time.time()
-        dialect = detect_dialect(
-            self.args.path,
-            num_chars=num_chars,
-            encoding=self.args.encoding,
-            verbose=verbose,
-            method=method,
-            skip=skip,
-        )
+        if self.args.profile:
+            detector = Detector()
+            dialect = self._detect_profile(
+                detector, num_chars, verbose, method, skip
+            )
+        else:
+            dialect = detect_dialect(
+                self.args.path,
+                num_chars=num_chars,
+                encoding=self.args.encoding,
+                verbose=verbose,
+                method=method,
+                skip=skip,
+                detection_cache=cache,
+            )
         runtime = time.time() - t_start
 
+        if cache is not None:
+            cache.close()
+
         if dialect is None:
             print("Error: Dialect detection failed.", file=sys.stderr)
             return 1
 
+        profile = None if detector is None else detector.profile_
         if self.args.plain:
             print(f"delimiter = {dialect.delimiter}".strip())
             print(f"quotechar = {dialect.quotechar}".strip())
@@ -131,9 +178,29 @@ class DetectCommand(Command):
             dialect_dict: Dict[str, Any] = dialect.to_dict()
             if self.args.add_runtime:
                 dialect_dict["runtime"] = runtime
+            if profile is not None:
+                dialect_dict["profile"] = profile.to_dict()
             print(json.dumps(dialect_dict))
+            return 0
         else:
             print("Detected: " + str(dialect))
             if self.args.add_runtime:
                 print(f"Runtime: {runtime:.6f} seconds")
+        if profile is not None:
+            print(profile.format())
         return 0
+
+    def _detect_profile(
+        self,
+        detector: Detector,
+        num_chars: Optional[int],
+        verbose: bool,
+        method: str,
+        skip: bool,
+    ) -> Optional[SimpleDialect]:
+        encoding = self.args.encoding or get_encoding(self.args.path)
+        with open(self.args.path, "r", newline="", encoding=encoding) as fp:
+            data = fp.read(num_chars) if num_chars else fp.read()
+        return detector.detect(
+            data, verbose=verbose, method=method, skip=skip, profile=True
+        )
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from typing import Callable
 from typing import Final
 from typing import Generic
 from typing import Iterable
@@ -50,5 +51,15 @@ class Parser(Generic[_T]):
     ) -> None: ...
     def __iter__(self) -> "Parser": ...
     def __next__(self) -> _T: ...
+    def count_types(
+        self,
+        classifier: Callable[[str, bool], bool],
+        *,
+        num_cells: int = -1,
+        pattern_score: float = 0.0,
+        incumbent: float = 0.0,
+        budget: Optional[Callable[[int], bool]] = None,
+        budget_interval: int = 1000,
+    ) -> Optional[Tuple[int, int]]: ...
 
 class Error(Exception): ...
@@ -8,6 +8,7 @@ Python utility functions that wrap the C parser.
 import io
 
 from typing import Any
+from typing import Callable
 from typing import Iterable
 from typing import Iterator
 from typing import List
@@ -150,3 +151,88 @@ def parse_string(
         dialect=dialect,
         return_quoted=return_quoted,
     )
+
+
+def count_known_types(
+    data: str,
+    dialect: SimpleDialect,
+    is_known_type: Callable[[str, bool], bool],
+    num_cells: Optional[int] = None,
+    pattern_score: float = 0.0,
+    incumbent: float = 0.0,
+    budget: Optional[Callable[[int], bool]] = None,
+    budget_interval: int = 1000,
+) -> Optional[Tuple[int, int]]:
+    """Count the cells with a known type while parsing the data
+
+    This parses the data with the C parser and classifies every cell as it is
+    parsed, without creating the rows. Empty cells, simple alphanumeric
+    cells, numbers, and percentages are recognized in C, and the
+    ``is_known_type`` function is only called for the remaining cells.
+
+    Parameters
+    ----------
+    data : str
+        The data of the CSV file
+
+    dialect : SimpleDialect
+        The dialect to use for parsing
+
+    is_known_type : Callable[[str, bool], bool]
+        Function that returns whether a cell has a known type, given the cell
+        and whether it was quoted.
+
+    num_cells : Optional[int]
+        Upper bound on the number of cells in the data. If given, counting
+        stops as soon as ``pattern_score`` times the upper bound on the type
+        score is below the ``incumbent`` score. See
+        :meth:`ConsistencyDetector.compute_type_score`.
+
+    pattern_score : float
+        The pattern score of the dialect, used for stopping early.
+
+    incumbent : float
+        The best consistency score found so far, used for stopping early.
+
+    budget : Optional[Callable[[int], bool]]
+        Function that is called with the number of cells counted since its
+        previous call, after the row that brings this number to at least
+        ``budget_interval``, and once more for the remaining cells at the
+        end. If it returns True, counting stops and the counts of the rows
+        parsed so far are returned.
+
+    budget_interval : int
+        The minimum number of cells between calls to ``budget``.
+
+    Returns
+    -------
+    counts : Optional[Tuple[int, int]]
+        The number of cells with a known type and the total number of cells,
+        or None if counting was stopped early because the incumbent can't be
+        reached.
+
+    Raises
+    ------
+    Error : clevercsv.exceptions.Error
+        When an error occurs during parsing.
+
+    """
+    parser = Parser(
+        iter(io.StringIO(data, newline="")),
+        delimiter=dialect.delimiter,
+        quotechar=dialect.quotechar,
+        escapechar=dialect.escapechar,
+        field_limit=field_size_limit(),
+        strict=dialect.strict,
+    )
+    try:
+        return parser.count_types(
+            is_known_type,
+            num_cells=-1 if num_cells is None else num_cells,
+            pattern_score=pattern_score,
+            incumbent=incumbent,
+            budget=budget,
+            budget_interval=budget_interval,
+        )
+    except ParserError as e:
+        raise Error(str(e))
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from typing import Any
+from typing import Callable
 from typing import Iterable
 from typing import Iterator
 from typing import List
@@ -67,3 +68,13 @@ def parse_string(
     dialect: SimpleDialect,
     return_quoted: bool = ...,
 ) -> Iterator[Union[List[str], List[Tuple[str, bool]]]]: ...
+def count_known_types(
+    data: str,
+    dialect: SimpleDialect,
+    is_known_type: Callable[[str, bool], bool],
+    num_cells: Optional[int] = None,
+    pattern_score: float = 0.0,
+    incumbent: float = 0.0,
+    budget: Optional[Callable[[int], bool]] = None,
+    budget_interval: int = 1000,
+) -> Optional[Tuple[int, int]]: ...
@@ -7,19 +7,32 @@ Author: Gertjan van den Burg
 
 """
 
+import dataclasses
+import time
+
 from enum import Enum
 from io import StringIO
 
 from typing import Dict
 from typing import Iterable
+from typing import List
 from typing import Optional
+from typing import TextIO
 from typing import Union
 
 from .consistency import ConsistencyDetector
+from .consistency import DetectionBudget
+from .consistency import ProgressiveConsistencyDetector
+from .detection_profile import DetectionProfile
+from .detection_profile import timed
 from .dialect import SimpleDialect
 from .exceptions import NoDetectionResult
 from .normal_form import detect_dialect_normal
 from .read import reader
+from .type_cache import TypeCache
+
+#: Default number of characters in the first round of progressive detection
+DEFAULT_INITIAL_CHARS: int = 10_000
 
 
 class DetectionMethod(str, Enum):
@@ -50,8 +63,20 @@ class Detector:
     implementation and avoid naming issues. You can import it as ``from ccsv
     import Sniffer`` nonetheless.
 
+    Parameters
+    ----------
+    type_cache : Optional[TypeCache]
+        A :class:`~clevercsv.type_cache.TypeCache` that is used to cache the
+        results of type detection in the consistency measure. The cache is
+        kept between calls to :meth:`detect`, which speeds up repeated
+        detection on files with a similar vocabulary. If None, a new cache is
+        used for every call.
+
     """
 
+    def __init__(self, type_cache: Optional[TypeCache] = None) -> None:
+        self.type_cache = type_cache
+
     def sniff(
         self,
         sample: str,
@@ -68,6 +93,11 @@ class Detector:
         verbose: bool = False,
         method: Union[DetectionMethod, str] = DetectionMethod.AUTO,
         skip: bool = True,
+        type_sample_size: Optional[int] = None,
+        budget: Optional[DetectionBudget] = None,
+        profile: bool = False,
+        prefilter: bool = False,
+        test_masked_by_quotes: bool = True,
     ) -> Optional[SimpleDialect]:
         """Detect the dialect of a CSV file
 
@@ -100,6 +130,43 @@ class Detector:
             :func:`ConsistencyDetector.compute_consistency_scores` for more
             details.
 
+        type_sample_size : Optional[int]
+            If not None, estimate the type score in the consistency detection
+            from a sample of this many rows. The sample is enlarged as long
+            as the best dialects can't be distinguished. The
+            ``sampling_fallback_`` attribute is set to True if this required
+            computing the type score on all rows. See
+            :class:`ConsistencyDetector` for more details.
+
+        budget : Optional[DetectionBudget]
+            Limits on the wall time and the number of cells used for
+            detection. If the budget is exhausted, the best dialect found so
+            far is returned and the ``approximate_`` attribute is set to
+            True. The time spent on normal form detection counts towards the
+            time budget. This is a soft limit, see
+            :class:`~clevercsv.consistency.DetectionBudget`.
+
+        profile : bool
+            Record the time spent in the stages of detection and on every
+            dialect in the consistency measure. The result is available as
+            the ``profile_`` attribute, a
+            :class:`~clevercsv.detection_profile.DetectionProfile`. If False,
+            ``profile_`` is set to None.
+
+        prefilter : bool
+            Drop the potential dialects in the consistency detection whose
+            delimiter provably can't produce a competitive pattern score,
+            based on the number of occurrences of the delimiter on every
+            line. This doesn't change the detected dialect. The dropped
+            delimiters are available in the ``dropped_delimiters_``
+            attribute. See :class:`ConsistencyDetector` for more details.
+
+        test_masked_by_quotes : bool
+            Remove potential dialects where the delimiter never occurs
+            outside quoted segments from the consistency detection. See
+            :func:`~clevercsv.potential_dialects.get_dialects` for more
+            details.
+
         Returns
         -------
         dialect : Optional[SimpleDialect]
@@ -107,24 +174,222 @@ class Detector:
             inconclusive.
 
         """
+        self.sampling_fallback_ = False
+        self.approximate_ = False
+        self.dropped_delimiters_: List[str] = []
+        self.profile_ = DetectionProfile() if profile else None
+        start = time.monotonic()
+        dialect = self._detect(
+            sample,
+            delimiters=delimiters,
+            verbose=verbose,
+            method=method,
+            skip=skip,
+            type_sample_size=type_sample_size,
+            budget=budget,
+            prefilter=prefilter,
+            test_masked_by_quotes=test_masked_by_quotes,
+        )
+        if self.profile_ is not None:
+            self.profile_.method = self.method_.value
+            self.profile_.total_time = time.monotonic() - start
+        return dialect
+
+    def _detect(
+        self,
+        sample: str,
+        delimiters: Optional[Iterable[str]],
+        verbose: bool,
+        method: Union[DetectionMethod, str],
+        skip: bool,
+        type_sample_size: Optional[int],
+        budget: Optional[DetectionBudget],
+        prefilter: bool,
+        test_masked_by_quotes: bool,
+    ) -> Optional[SimpleDialect]:
+        start = time.monotonic()
         method = DetectionMethod(method) if isinstance(method, str) else method
         if delimiters is not None:
             delimiters = list(delimiters)
         if method == DetectionMethod.NORMAL or method == DetectionMethod.AUTO:
             if verbose:
                 print("Running normal form detection ...", flush=True)
-            dialect = detect_dialect_normal(
-                sample, delimiters=delimiters, verbose=verbose
-            )
+            with timed(self.profile_, "normal_form"):
+                dialect = detect_dialect_normal(
+                    sample, delimiters=delimiters, verbose=verbose
+                )
             if dialect is not None:
                 self.method_ = DetectionMethod.NORMAL
                 return dialect
 
         self.method_ = DetectionMethod.CONSISTENCY
-        consistency_detector = ConsistencyDetector(skip=skip, verbose=verbose)
+        if budget is not None and budget.max_time is not None:
+            remaining = budget.max_time - (time.monotonic() - start)
+            budget = dataclasses.replace(budget, max_time=max(0.0, remaining))
+        consistency_detector = ConsistencyDetector(
+            skip=skip,
+            verbose=verbose,
+            type_sample_size=type_sample_size,
+            type_cache=self.type_cache,
+            budget=budget,
+            profile=self.profile_,
+            prefilter=prefilter,
+            test_masked_by_quotes=test_masked_by_quotes,
+        )
         if verbose:
             print("Running data consistency measure ...", flush=True)
-        return consistency_detector.detect(sample, delimiters=delimiters)
+        dialect = consistency_detector.detect(sample, delimiters=delimiters)
+        self.dropped_delimiters_ = consistency_detector.dropped_delimiters_
+        self.sampling_fallback_ = consistency_detector.sampling_fallback_
+        self.approximate_ = consistency_detector.approximate_
+        return dialect
+
+    def detect_progressive(
+        self,
+        data: Union[str, TextIO],
+        delimiters: Optional[Iterable[str]] = None,
+        verbose: bool = False,
+        method: Union[DetectionMethod, str] = DetectionMethod.AUTO,
+        skip: bool = True,
+        initial_chars: int = DEFAULT_INITIAL_CHARS,
+        growth: float = 2.0,
+        stable_rounds: int = 3,
+        max_chars: Optional[int] = None,
+        test_masked_by_quotes: bool = True,
+    ) -> Optional[SimpleDialect]:
+        """Detect the dialect on a prefix of the data that grows as needed
+
+        Instead of detecting the dialect on all data or on a fixed number of
+        characters, this method starts with a small prefix of the data and
+        grows it geometrically. Detection stops when the detected dialect has
+        been the same for :attr:`stable_rounds` rounds while its margin over
+        the runner-up didn't drop by more than half, when all data has been
+        read, or when :attr:`max_chars` characters have been read. The type
+        score of the consistency measure is accumulated between rounds, so
+        that earlier parts of the data are not classified again.
+
+        Parameters
+        ----------
+        data : Union[str, TextIO]
+            The data of the CSV file as a string or as a file object opened
+            in text mode (preferably with ``newline=""``). A file object is
+            only read as far as needed.
+
+        delimiters : Optional[Iterable[str]]
+            Set of delimiters to consider. See :meth:`detect`.
+
+        verbose : bool
+            Enable verbose mode.
+
+        method : Union[DetectionMethod, str]
+            The method to use for dialect detection. See :meth:`detect`.
+
+        skip : bool
+            Whether to skip potential dialects that have too low a pattern
+            score in the consistency detection.
+
+        initial_chars : int
+            The number of characters in the first round. The prefix is always
+            extended to the end of the line.
+
+        growth : float
+            The factor by which the size of the prefix grows in every round.
+
+        stable_rounds : int
+            The number of consecutive rounds in which the detected dialect
+            must be the same before detection stops.
+
+        max_chars : Optional[int]
+            The maximum number of characters to read. If None, detection may
+            continue until all data is read.
+
+        test_masked_by_quotes : bool
+            Remove potential dialects where the delimiter never occurs
+            outside quoted segments from the consistency detection. See
+            :meth:`detect`.
+
+        Returns
+        -------
+        dialect : Optional[SimpleDialect]
+            The detected dialect. Can be `None` if dialect detection was
+            inconclusive. The number of characters used for detection is
+            available in the ``num_chars_`` attribute afterwards.
+
+        """
+        if initial_chars < 1:
+            raise ValueError("initial_chars must be positive")
+        if growth <= 1:
+            raise ValueError("growth must be larger than 1")
+        if stable_rounds < 1:
+            raise ValueError("stable_rounds must be positive")
+
+        self.sampling_fallback_ = False
+        method = DetectionMethod(method) if isinstance(method, str) else method
+        if delimiters is not None:
+            delimiters = list(delimiters)
+        fp = StringIO(data, newline="") if isinstance(data, str) else data
+
+        consistency_detector = ProgressiveConsistencyDetector(
+            skip=skip,
+            verbose=verbose,
+            type_cache=self.type_cache,
+            delimiters=delimiters,
+            test_masked_by_quotes=test_masked_by_quotes,
+        )
+        sample = pending = ""
+        target = initial_chars
+        previous: Optional[SimpleDialect] = None
+        previous_margin = 0.0
+        stable = 0
+        dialect: Optional[SimpleDialect] = None
+        while True:
+            size = target - len(sample)
+            if max_chars is not None:
+                size = min(size, max_chars - len(sample))
+            chunk = fp.read(size)
+            at_end = len(chunk) < size
+            if not at_end:
+                chunk += fp.readline()
+            sample += chunk
+            pending += chunk
+            at_cap = max_chars is not None and len(sample) >= max_chars
+
+            if verbose:
+                print(
+                    "Detecting dialect on %i characters ..." % len(sample),
+                    flush=True,
+                )
+
+            dialect = None
+            margin = 0.0
+            if method in (DetectionMethod.NORMAL, DetectionMethod.AUTO):
+                dialect = detect_dialect_normal(
+                    sample, delimiters=delimiters, verbose=verbose
+                )
+                self.method_ = DetectionMethod.NORMAL
+                margin = float("inf")
+            if dialect is None:
+                self.method_ = DetectionMethod.CONSISTENCY
+                dialect, margin = consistency_detector.update(pending)
+                pending = ""
+
+            if (
+                dialect is not None
+                and dialect == previous
+                and margin > 0
+                and margin >= previous_margin / 2
+            ):
+                stable += 1
+            else:
+                stable = 1 if dialect is not None else 0
+            previous, previous_margin = dialect, margin
+
+            if at_end or at_cap or stable >= stable_rounds:
+                break
+            target = max(int(target * growth), len(sample) + 1)
+
+        self.num_chars_ = len(sample)
+        return dialect
 
     def has_header(self, sample: str, max_rows_to_check: int = 20) -> bool:
         """Detect if a file has a header from a sample.
@@ -8,8 +8,11 @@ Author: Gertjan van den Burg
 """
 
 import collections
+import itertools
 import re
 
+from typing import Dict
+from typing import Iterable
 from typing import Optional
 from typing import Pattern
 
@@ -44,7 +47,32 @@ def pattern_score(
 
     """
     A = make_abstraction(data, dialect)
-    row_patterns = collections.Counter(A.split("R"))
+    return abstraction_pattern_score(A, eps=eps)
+
+
+def abstraction_pattern_score(
+    abstraction: str, eps: float = DEFAULT_EPS_PAT
+) -> float:
+    """Compute the pattern score from an existing abstraction
+
+    This allows the abstraction created by :func:`make_abstraction` to be
+    reused, for instance when the time to create it is measured separately.
+
+    Parameters
+    ----------
+    abstraction : str
+        The abstract representation of the file.
+
+    eps : float
+        The minimum value of the score for a row pattern.
+
+    Returns
+    -------
+    score : float
+        the pattern score
+
+    """
+    row_patterns = collections.Counter(abstraction.split("R"))
     P = 0.0
     for pat_k, Nk in row_patterns.items():
         Lk = len(pat_k.split("D"))
@@ -154,3 +182,79 @@ def strip_trailing(abstract: str) -> str:
     while abstract.endswith("R"):
         abstract = abstract[:-1]
     return abstract
+
+
+def max_num_cells(data: str, dialect: SimpleDialect) -> int:
+    """Upper bound on the number of cells produced by the parser
+
+    The parser ends a cell at a delimiter, at a line break, or at the end of
+    the data. Quoting and escaping can only prevent delimiters and line
+    breaks from ending a cell, so the number of cells can't exceed the number
+    of occurrences of the delimiter and the line break characters in the
+    data, plus one.
+
+    Parameters
+    ----------
+    data : str
+        The data of the file as a string.
+
+    dialect : SimpleDialect
+        The dialect that is used to parse the data.
+
+    Returns
+    -------
+    num_cells : int
+        The upper bound on the number of cells in the file.
+
+    """
+    if not data:
+        return 0
+    num_cells = data.count("\r") + data.count("\n") + 1
+    if dialect.delimiter:
+        num_cells += data.count(dialect.delimiter)
+    return num_cells
+
+
+def pattern_score_bounds(
+    data: str, delimiters: Iterable[str], eps: float = DEFAULT_EPS_PAT
+) -> Dict[str, float]:
+    """Upper bounds on the pattern score of dialects with the given delimiters
+
+    A row with :math:`m` delimiters contributes at most :math:`m / (m + 1)`
+    to the pattern score and a row without delimiters contributes ``eps``.
+    Quoting and escaping can only remove delimiters or join lines into a
+    single row, which never increases this sum. The bound for a delimiter
+    therefore holds for dialects with any quote character or escape
+    character, and it can be computed from the number of occurrences of the
+    delimiter on every line of the file.
+
+    Parameters
+    ----------
+    data : str
+        The data of the file as a string.
+
+    delimiters : Iterable[str]
+        The delimiters to compute the bound for.
+
+    eps : float
+        The minimum value of the score for a row pattern.
+
+    Returns
+    -------
+    bounds : Dict[str, float]
+        A map from every delimiter to the upper bound on the pattern score.
+
+    """
+    if "\r" in data:
+        data = data.replace("\r", "\n")
+    lines = data.split("\n")
+    bounds = {}
+    for delimiter in delimiters:
+        bound = eps * len(lines)
+        if delimiter:
+            counts = collections.Counter(
+                map(str.count, lines, itertools.repeat(delimiter))
+            )
+            bound += sum(n * m / (m + 1) for m, n in counts.items())
+        bounds[delimiter] = bound
+    return bounds
@@ -7,29 +7,468 @@ Author: Gertjan van den Burg
 
 """
 
+import bisect
+import functools
+import itertools
 import json
+import re
+import string
 
+from dataclasses import dataclass
+from dataclasses import field
+from types import MappingProxyType
+
+from typing import Callable
 from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
 from typing import List
+from typing import Mapping
+from typing import NamedTuple
 from typing import Optional
 from typing import Pattern
+from typing import Tuple
+
+import regex
 
+from . import cdetect_type
+from ._regexes import ALPANUM_QUOTED_SPECIALS
+from ._regexes import ALPHANUM_SPECIALS
 from ._regexes import DEFAULT_TYPE_REGEXES
+from ._regexes import PATTERN_ALPHANUM
+from ._regexes import PATTERN_ALPHANUM_QUOTED
+from ._regexes import SPECIALS_ALLOWED
+from ._regexes import TypePattern
 from .cparser_util import parse_string
 from .dialect import SimpleDialect
 
 DEFAULT_EPS_TYPE: float = 1e-10
 
+#: Maximum number of shape signatures cached by a :class:`TypeDetector`
+MAX_SIGNATURE_CACHE_SIZE: int = 10_000
+
+#: Characters in a shape signature for which the result of
+#: :meth:`TypeDetector.is_known_type` is fully determined by the signature.
+#: Any non-empty string of digits, letters, spaces, and allowed specials is
+#: matched by the unicode_alphanum pattern.
+SIGNATURE_DETERMINED_CHARS: str = "9a " + "".join(SPECIALS_ALLOWED)
+
+_SIGNATURE_TABLE = str.maketrans(
+    string.digits + string.ascii_letters,
+    "9" * len(string.digits) + "a" * len(string.ascii_letters),
+)
+
+_RE_SIGNATURE_RUNS: Pattern[str] = re.compile(r"(.)\1+", flags=re.DOTALL)
+
+#: Cells longer than this have runs of characters collapsed in their shape
+#: signature
+SIGNATURE_COLLAPSE_LENGTH: int = 32
+
+#: Maximum number of first and last character pairs for which a
+#: :class:`TypeDetector` stores the type tests that can match
+MAX_DISPATCH_CACHE_SIZE: int = 10_000
+
+#: Suggested maximum length of the cells for which
+#: :meth:`TypeDetector.detect_type` runs a type test, for use with the
+#: ``max_lengths`` argument of :class:`TypeDetector` on untrusted input.
+#: Email addresses are limited to 254 characters by RFC 5321, and longer
+#: URLs are rejected by most browsers. These limits are not used by default.
+SUGGESTED_MAX_CELL_LENGTHS: Dict[str, int] = {
+    "url": 2048,
+    "email": 254,
+    "json": 1_048_576,
+}
+
+
+class TypePrefilter(NamedTuple):
+    """Characters that a cell must start and end with to match a pattern
+
+    Both fields are regular expressions that are matched against a single
+    character, typically a character class. A field that is None allows any
+    character. A pattern with a prefilter is assumed to never match an empty
+    cell. Prefilters allow :class:`TypeDetector` to skip the type tests that
+    can't match a cell, so a prefilter must match the first and last
+    character of every cell that the pattern matches.
+    """
+
+    first: Optional[str] = None
+    last: Optional[str] = None
+
+    def matches(self, first: str, last: str) -> bool:
+        """Check if a cell with this first and last character can match"""
+        if not first:
+            return False
+        if self.first is not None and not regex.fullmatch(self.first, first):
+            return False
+        if self.last is not None and not regex.fullmatch(self.last, last):
+            return False
+        return True
+
+
+_ALPHANUM_CHARS = r"[\p{N}\p{L}\ " + ALPHANUM_SPECIALS + r"]"
+_ALPHANUM_QUOTED_CHARS = r"[\p{N}\p{L}\ " + ALPANUM_QUOTED_SPECIALS + r"]"
+
+#: Prefilters of the default patterns
+DEFAULT_TYPE_PREFILTERS: Dict[str, TypePrefilter] = {
+    "number_1": TypePrefilter(r"[+\-.,\d]", r"[+\-.\d]"),
+    "number_2": TypePrefilter(r"[+\-1-9]", r"[.\d]"),
+    "number_3": TypePrefilter(r"[+\-1-9]", r"[,\d]"),
+    "url": TypePrefilter(r"[\p{L}\p{N}\-]", r"[\p{L}\p{N}_\/()~?=&%\-\#.:]"),
+    "email": TypePrefilter(r"[a-zA-Z0-9_.+\-]", r"[a-zA-Z0-9\-.]"),
+    "ipv4": TypePrefilter(r"\d", r"\d"),
+    "unicode_alphanum": TypePrefilter(_ALPHANUM_CHARS, _ALPHANUM_CHARS),
+    "unicode_alphanum_quoted": TypePrefilter(
+        _ALPHANUM_QUOTED_CHARS, _ALPHANUM_QUOTED_CHARS
+    ),
+    "time_hhmmss": TypePrefilter(r"[0-2]", r"[0-9]"),
+    "time_hhmm": TypePrefilter(r"[0-2]", r"[0-9]"),
+    "time_HHMM": TypePrefilter(r"[0-2]", r"[0-9]"),
+    "time_HH": TypePrefilter(r"[0-2]", r"[0-9]"),
+    "time_hmm": TypePrefilter(r"[0-9]", r"[0-9]"),
+    "time_hhmmsszz": TypePrefilter(r"[0-2]", r"[0-9]"),
+    "currency": TypePrefilter(r"\p{Sc}", None),
+    "unix_path": TypePrefilter(r"[~.\/]", r"[a-zA-Z0-9.\-_\/]"),
+    "date": TypePrefilter(r"\d", r"[\d日일]"),
+}
+
+
+#: Type tests that are a full match of one of the given default patterns. These
+#: are combined into a single regular expression by :class:`TypeDetector`.
+#: The unicode_alphanum test uses the quoted pattern for quoted cells.
+_REGEX_TYPE_TESTS: Dict[str, Tuple[str, ...]] = {
+    "is_url": ("url",),
+    "is_email": ("email",),
+    "is_ipv4": ("ipv4",),
+    "is_number": ("number_1", "number_2", "number_3"),
+    "is_time": ("time_hmm", "time_hhmm", "time_hhmmss", "time_hhmmsszz"),
+    "is_unix_path": ("unix_path",),
+    "is_date": ("date",),
+    "is_unicode_alphanum": ("unicode_alphanum",),
+}
+
+#: Prefilters of the type tests that aren't a full match of a pattern
+_METHOD_PREFILTERS: Dict[str, TypePrefilter] = {
+    "is_percentage": TypePrefilter(None, "%"),
+    "is_nan": TypePrefilter("[nN]", "[aAnN]"),
+    # str.isdigit() is true for some characters that aren't decimal digits
+    "is_datetime": TypePrefilter(r"\p{N}", None),
+    "is_bytearray": TypePrefilter("b", r"\)"),
+    "is_json_obj": TypePrefilter(r"\{", r"\}"),
+}
+
+#: Patterns for which ``clevercsv.cdetect_type`` has a native recognizer
+NATIVE_PATTERNS: Tuple[str, ...] = (
+    "number_1",
+    "number_2",
+    "number_3",
+    "time_hmm",
+    "time_hhmm",
+    "time_hhmmss",
+    "time_hhmmsszz",
+    "time_HHMM",
+    "time_HH",
+    "date",
+)
+
+# Native recognizers of the type tests that are a full match of patterns
+_NATIVE_TYPE_TESTS: Dict[str, Callable[[Callable[[str], bool], str], bool]] = {
+    "is_number": cdetect_type.number,
+    "is_time": cdetect_type.time,
+    "is_date": cdetect_type.date,
+}
+
+
+@dataclass(eq=False)
+class _CombinedTests:
+    """The compiled type tests of a :class:`TypeDetector`
+
+    The combined pattern of the default type tests, the type tests that
+    aren't part of it, the separate tests that precede every type of the
+    combined pattern, and the names of all types that are tested. The
+    speculative tests of the adaptive mode are planned for the learned order
+    with the given version, and are replanned when the order changes.
+    """
+
+    pattern: Optional[Pattern[str]]
+    separate: List[Tuple[str, Callable[[str], bool]]]
+    preceding: Dict[str, List[Tuple[str, Callable[[str], bool]]]]
+    types: FrozenSet[str]
+    order_version: Optional[int] = None
+    speculative: List[Tuple["_CombinedTests", FrozenSet[str]]] = field(
+        default_factory=list
+    )
+
+
+# The types and methods of the default type tests, in order of priority
+_DEFAULT_TYPE_TESTS: Tuple[Tuple[str, str], ...] = (
+    ("empty", "is_empty"),
+    ("url", "is_url"),
+    ("email", "is_email"),
+    ("ipv4", "is_ipv4"),
+    ("number", "is_number"),
+    ("time", "is_time"),
+    ("percentage", "is_percentage"),
+    ("currency", "is_currency"),
+    ("unix_path", "is_unix_path"),
+    ("nan", "is_nan"),
+    ("date", "is_date"),
+    ("datetime", "is_datetime"),
+    ("unicode_alphanum", "is_unicode_alphanum"),
+    ("bytearray", "is_bytearray"),
+    ("json", "is_json_obj"),
+)
+
+# The types of higher priority that can match the same cell as a type, for
+# the default type tests with the default patterns. For example, "1.2.3.4" is
+# both an ipv4 address and a url, and "20200115" is both a number and a date.
+# The types that are missing from this map can overlap with every type of
+# higher priority.
+_TYPE_OVERLAPS: Dict[str, FrozenSet[str]] = {
+    "empty": frozenset(),
+    "url": frozenset(),
+    "email": frozenset(),
+    "ipv4": frozenset(["url"]),
+    "number": frozenset(),
+    "time": frozenset(),
+    "percentage": frozenset(),
+    "currency": frozenset(),
+    "unix_path": frozenset(),
+    "nan": frozenset(),
+    "date": frozenset(["number"]),
+    "datetime": frozenset(),
+    "unicode_alphanum": frozenset(["url", "ipv4", "number", "nan", "date"]),
+}
+
+#: Number of types that the adaptive mode of a :class:`TypeDetector` tries
+#: before it falls back to running all type tests
+MAX_SPECULATIVE_TESTS: int = 2
+
+
+def _non_capturing(source: str) -> str:
+    """Turn the unnamed capturing groups of a pattern into non-capturing ones
+
+    The type tests only use whether a pattern matches, and fewer groups make
+    matching cheaper. Named groups are kept, since they may be used in
+    conditionals and backreferences.
+    """
+    out = []
+    i = 0
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            out.append(source[i : i + 2])
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            # a closing bracket at the start of a class is literal
+            j = i + 1 + source.startswith("^", i + 1)
+            j += source.startswith("]", j)
+            out.append(source[i:j])
+            i = j
+            continue
+        elif source.startswith("(?(", i):
+            # conditional on a group, keep the group name as is
+            j = source.index(")", i + 3) + 1
+            out.append(source[i:j])
+            i = j
+            continue
+        elif char == "(" and not source.startswith("(?", i):
+            out.append("(?:")
+            i += 1
+            continue
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+@functools.lru_cache(maxsize=None)
+def _combine_patterns(
+    groups: Tuple[Tuple[str, Tuple[str, ...]], ...],
+) -> Pattern[str]:
+    """Combine the patterns of type tests into one pattern
+
+    Every type becomes a named group of alternatives. Since alternatives are
+    tried from left to right, a full match of the combined pattern is found
+    in the group of the first type whose pattern matches the entire cell,
+    which preserves the priority order of the type tests.
+    """
+    return regex.compile(
+        "|".join(
+            "(?P<%s>%s)"
+            % (
+                name,
+                "|".join("(?:%s)" % _non_capturing(s) for s in sources),
+            )
+            for name, sources in groups
+        )
+    )
+
+
+def shape_signature(cell: str) -> str:
+    """Compute the shape signature of a cell
+
+    The shape signature replaces every ASCII digit by ``9`` and every ASCII
+    letter by ``a`` and keeps all other characters. For example, the cells
+    ``12.50`` and ``99.01`` both have the signature ``99.99``. For cells
+    longer than :py:data:`SIGNATURE_COLLAPSE_LENGTH` characters, runs of the
+    same character are furthermore collapsed, so that long cells of a similar
+    shape share a signature.
+
+    Parameters
+    ----------
+    cell : str
+        The cell to compute the signature for
+
+    Returns
+    -------
+    signature : str
+        The shape signature of the cell
+
+    """
+    signature = cell.translate(_SIGNATURE_TABLE)
+    if len(signature) <= SIGNATURE_COLLAPSE_LENGTH:
+        return signature
+    return _RE_SIGNATURE_RUNS.sub(r"\1", signature)
+
+
+def is_determined_signature(signature: str) -> bool:
+    """Check if a shape signature determines whether a type is known
+
+    This is the case when the signature consists only of the characters in
+    :py:data:`SIGNATURE_DETERMINED_CHARS`, which means that every cell with
+    this signature is matched by the unicode_alphanum pattern (or the empty
+    type).
+
+    """
+    return not signature.strip(SIGNATURE_DETERMINED_CHARS)
+
 
 class TypeDetector:
+    """Detect the type of cells
+
+    Parameters
+    ----------
+    patterns : Optional[Mapping[str, TypePattern]]
+        Map of regular expressions used by the type tests. If None, the
+        default patterns are used. The map is copied, see :attr:`patterns`.
+
+    strip_whitespace : bool
+        Whether to strip whitespace from cells before detecting their type.
+
+    use_signatures : bool
+        Cache the result of :meth:`is_known_type` by the
+        :func:`shape_signature` of the cell, for signatures that fully
+        determine the result. This is only used when the default patterns for
+        alphanumeric text are used.
+
+    prefilters : Optional[Dict[str, TypePrefilter]]
+        Map of prefilters for the patterns, with the same keys as
+        ``patterns``. The default prefilters are used for the default
+        patterns. A custom pattern without a prefilter is tried for every
+        cell.
+
+    use_native : bool
+        Use the recognizers of ``clevercsv.cdetect_type`` instead of the
+        regular expressions for numbers, dates, and times. This is only done
+        for the default patterns, and gives the same result.
+
+    max_lengths : Optional[Mapping[str, Optional[int]]]
+        Map of type names to the maximum length of the cells for which
+        :meth:`detect_type` runs the type test. Longer cells never get the
+        type. A value of None means no limit, which is the default for all
+        types. See :py:data:`SUGGESTED_MAX_CELL_LENGTHS` for limits that
+        bound the time spent on huge cells.
+
+    max_json_depth : Optional[int]
+        Maximum nesting depth of the objects and arrays of a cell of the
+        json type. Cells with deeper nesting are rejected before they are
+        parsed. If None, any cell that the json module can parse has the
+        json type.
+
+    adaptive : bool
+        Try the types that were detected most often first in
+        :meth:`detect_type`, and only run the tests of the types of higher
+        priority that can match the same cell afterwards. This gives the same
+        result, but is faster when most cells have one of a few types, such
+        as in a single file. The learned order is available from
+        :meth:`type_order`, and is cleared by :meth:`reset_type_order`.
+
+    """
+
     def __init__(
         self,
-        patterns: Optional[Dict[str, Pattern[str]]] = None,
+        patterns: Optional[Mapping[str, TypePattern]] = None,
         strip_whitespace: bool = True,
+        use_signatures: bool = True,
+        prefilters: Optional[Dict[str, TypePrefilter]] = None,
+        use_native: bool = True,
+        max_lengths: Optional[Mapping[str, Optional[int]]] = None,
+        max_json_depth: Optional[int] = None,
+        adaptive: bool = False,
     ) -> None:
-        self.patterns = patterns or DEFAULT_TYPE_REGEXES.copy()
         self.strip_whitespace = strip_whitespace
+        self._use_native = use_native
+        self._custom_prefilters = dict(prefilters or {})
         self._register_type_tests()
+        self.max_lengths: Dict[str, int] = {
+            name: length
+            for name, length in (max_lengths or {}).items()
+            if length is not None
+        }
+        self.max_json_depth = max_json_depth
+        self._length_limits = sorted(set(self.max_lengths.values()))
+        self._use_signatures = use_signatures
+        self.adaptive = adaptive
+        self._order_version = 0
+        self.reset_type_order()
+        self.patterns = patterns or DEFAULT_TYPE_REGEXES
+
+    @property
+    def patterns(self) -> Mapping[str, TypePattern]:
+        """The regular expressions used by the type tests
+
+        This is a read-only map, since the type tests are compiled from it.
+        Assign a new map to change the patterns.
+        """
+        return self._patterns
+
+    @patterns.setter
+    def patterns(self, patterns: Mapping[str, TypePattern]) -> None:
+        self._patterns: Mapping[str, TypePattern] = MappingProxyType(
+            dict(patterns)
+        )
+        self.prefilters = {
+            key: prefilter
+            for key, prefilter in DEFAULT_TYPE_PREFILTERS.items()
+            if self.patterns.get(key) is DEFAULT_TYPE_REGEXES.get(key)
+        }
+        self.prefilters.update(self._custom_prefilters)
+        self._native: Dict[str, Callable[[str], bool]] = {}
+        for key in NATIVE_PATTERNS if self._use_native else ():
+            pattern = self.patterns.get(key)
+            if pattern is DEFAULT_TYPE_REGEXES[key]:
+                self._native[key] = functools.partial(
+                    getattr(cdetect_type, key), pattern.fullmatch
+                )
+        # a limit on the length of alphanumeric cells isn't reflected in the
+        # shape signatures of long cells
+        self.use_signatures = (
+            self._use_signatures
+            and self.patterns.get("unicode_alphanum") is PATTERN_ALPHANUM
+            and self.patterns.get("unicode_alphanum_quoted")
+            is PATTERN_ALPHANUM_QUOTED
+            and "unicode_alphanum" not in self.max_lengths
+        )
+        self._signature_cache: Dict[str, bool] = {}
+        self._combined_tests: Dict[
+            Tuple[bool, FrozenSet[str]], _CombinedTests
+        ] = {}
+        self._dispatch: Dict[Tuple[str, str, bool, int], _CombinedTests] = {}
+        self._overlaps = self._type_overlaps()
 
     def _register_type_tests(self) -> None:
         self._type_tests = [
@@ -50,21 +489,375 @@ class TypeDetector:
             ("json", self.is_json_obj),
         ]
 
+    def _type_overlaps(self) -> Dict[str, FrozenSet[str]]:
+        # The types of higher priority that have to be tested when the test
+        # of a type matches a cell. The known overlaps of the default type
+        # tests are only used if all type tests and patterns are the default.
+        is_default = [
+            (name, self._default_method(func))
+            for name, func in self._type_tests
+        ] == list(_DEFAULT_TYPE_TESTS) and all(
+            self.patterns.get(k) is p for k, p in DEFAULT_TYPE_REGEXES.items()
+        )
+        overlaps = {}
+        higher: List[str] = []
+        for name, _ in self._type_tests:
+            if is_default and name in _TYPE_OVERLAPS:
+                overlaps[name] = _TYPE_OVERLAPS[name]
+            else:
+                overlaps[name] = frozenset(higher)
+            higher.append(name)
+        return overlaps
+
+    def _default_method(self, func: Callable[..., bool]) -> Optional[str]:
+        # Name of the TypeDetector method of a type test, if it isn't
+        # overridden
+        method = getattr(func, "__func__", None)
+        name = getattr(method, "__name__", "")
+        if method is None or method is not vars(TypeDetector).get(name):
+            return None
+        return name
+
+    def _pattern_keys(
+        self, method_name: Optional[str], is_quoted: bool
+    ) -> Optional[Tuple[str, ...]]:
+        # Keys of the patterns of which a type test is a full match
+        if method_name == "is_unicode_alphanum" and is_quoted:
+            return ("unicode_alphanum_quoted",)
+        return _REGEX_TYPE_TESTS.get(method_name or "")
+
+    def _may_match(
+        self,
+        func: Callable[..., bool],
+        first: str,
+        last: str,
+        is_quoted: bool,
+    ) -> bool:
+        # Whether a type test can match a cell with this first and last
+        # character, according to the prefilters
+        method_name = self._default_method(func)
+        if method_name is None:
+            return True
+        if method_name == "is_empty":
+            return not first
+        if method_name == "is_currency":
+            keys: Optional[Tuple[str, ...]] = ("currency",)
+        else:
+            keys = self._pattern_keys(method_name, is_quoted)
+        if keys is None:
+            prefilter = _METHOD_PREFILTERS.get(method_name)
+            return prefilter is None or prefilter.matches(first, last)
+        return any(
+            k not in self.prefilters or self.prefilters[k].matches(first, last)
+            for k in keys
+        )
+
+    def _dispatch_tests(
+        self, first: str, last: str, is_quoted: bool, length_class: int
+    ) -> _CombinedTests:
+        """Get the type tests that can match a cell
+
+        The tests are selected by the prefilters for the first and last
+        character of the cell, and by the number of length limits that the
+        cell exceeds. They are compiled by :meth:`_compile_type_tests`. The
+        result is stored for the pair of characters and the length class.
+        """
+        exceeded = self._length_limits[:length_class]
+        types = frozenset(
+            name
+            for name, func in self._type_tests
+            if self.max_lengths.get(name) not in exceeded
+            and self._may_match(func, first, last, is_quoted)
+        )
+        tests = self._get_type_tests(is_quoted, types)
+        if len(self._dispatch) < MAX_DISPATCH_CACHE_SIZE:
+            self._dispatch[(first, last, is_quoted, length_class)] = tests
+        return tests
+
+    def _get_type_tests(
+        self, is_quoted: bool, types: FrozenSet[str]
+    ) -> _CombinedTests:
+        tests = self._combined_tests.get((is_quoted, types))
+        if tests is None:
+            tests = self._compile_type_tests(is_quoted, types)
+            self._combined_tests[(is_quoted, types)] = tests
+        return tests
+
+    def _compile_type_tests(
+        self, is_quoted: bool, types: FrozenSet[str]
+    ) -> _CombinedTests:
+        """Compile the given type tests for :meth:`detect_type`
+
+        All type tests that are full matches of the default patterns are
+        combined into a single pattern, so that they need only one call to
+        the regex engine. Tests that have a native recognizer, are
+        overridden, use custom patterns, or aren't regular expressions are
+        kept as separate tests. If the combined pattern matches a cell, only
+        the separate tests that come before the matched type in the priority
+        order have to be run.
+        """
+        groups: List[Tuple[str, Tuple[str, ...]]] = []
+        separate: List[Tuple[str, Callable[[str], bool]]] = []
+        preceding: Dict[str, List[Tuple[str, Callable[[str], bool]]]] = {}
+
+        for name, func in self._type_tests:
+            if name not in types:
+                continue
+            method_name = self._default_method(func)
+            keys: Optional[Tuple[str, ...]]
+            if method_name == "is_empty":
+                keys = ()
+            else:
+                keys = self._pattern_keys(method_name, is_quoted)
+
+            native = _NATIVE_TYPE_TESTS.get(method_name or "")
+            if (
+                native is not None
+                and keys
+                and all(k in self._native for k in keys)
+            ):
+                # the method itself is the fallback for non-ASCII cells
+                separate.append((name, functools.partial(native, func)))
+            elif keys is not None and all(
+                self.patterns.get(k) is DEFAULT_TYPE_REGEXES[k] for k in keys
+            ):
+                # the empty type is a group that only matches an empty cell,
+                # and no other default pattern matches an empty cell
+                sources = tuple(DEFAULT_TYPE_REGEXES[k].pattern for k in keys)
+                groups.append((name, sources or ("",)))
+                preceding[name] = list(separate)
+            else:
+                separate.append(
+                    (name, functools.partial(func, is_quoted=is_quoted))
+                )
+
+        pattern = _combine_patterns(tuple(groups)) if groups else None
+        return _CombinedTests(pattern, separate, preceding, types)
+
     def list_known_types(self) -> List[str]:
         return [tt[0] for tt in self._type_tests]
 
+    def type_order(self) -> List[Tuple[str, int]]:
+        """The learned order of the types in the adaptive mode
+
+        Returns
+        -------
+        order : List[Tuple[str, int]]
+            The name of every type with the number of cells that were
+            detected to have the type since the last call to
+            :meth:`reset_type_order`. Types are listed in the order in which
+            they are tried, which is by decreasing count, and by priority for
+            types with the same count.
+
+        """
+        return [(name, self._type_hits[name]) for name in self._type_order]
+
+    def reset_type_order(self) -> None:
+        """Forget the learned order of the types in the adaptive mode
+
+        This should be called when the detector is used for cells from a
+        different source, such as another file.
+        """
+        self._order_version += 1
+        self._type_order = self.list_known_types()
+        self._type_rank = {name: i for i, name in enumerate(self._type_order)}
+        self._type_hits = {name: 0 for name in self._type_order}
+
     def is_known_type(self, cell: str, is_quoted: bool = False) -> bool:
-        return self.detect_type(cell, is_quoted=is_quoted) is not None
+        if not self.use_signatures:
+            return self.detect_type(cell, is_quoted=is_quoted) is not None
+
+        stripped = cell.strip() if self.strip_whitespace else cell
+        signature = shape_signature(stripped)
+        known = self._signature_cache.get(signature)
+        if known is not None:
+            return known
+
+        known = self.detect_type(cell, is_quoted=is_quoted) is not None
+        if len(
+            self._signature_cache
+        ) < MAX_SIGNATURE_CACHE_SIZE and is_determined_signature(signature):
+            self._signature_cache[signature] = known
+        return known
+
+    def _zip_quoted(
+        self, cells: Iterable[str], is_quoted: Optional[Iterable[bool]]
+    ) -> Iterable[Tuple[str, bool]]:
+        if is_quoted is None:
+            return zip(cells, itertools.repeat(False))
+        cells = list(cells)
+        is_quoted = list(is_quoted)
+        if len(cells) != len(is_quoted):
+            raise ValueError(
+                "Number of quoted flags (%i) doesn't match number of cells "
+                "(%i)" % (len(is_quoted), len(cells))
+            )
+        return zip(cells, is_quoted)
+
+    def detect_types(
+        self,
+        cells: Iterable[str],
+        is_quoted: Optional[Iterable[bool]] = None,
+    ) -> List[Optional[str]]:
+        """Detect the type of many cells
+
+        Identical cells are only classified once, so this is faster than
+        calling :meth:`detect_type` for every cell of a column with many
+        repeated values.
+
+        Parameters
+        ----------
+        cells : Iterable[str]
+            The cells to detect the type of. This can also be a NumPy array
+            of strings.
+
+        is_quoted : Optional[Iterable[bool]]
+            Whether every cell was quoted. If None, no cell was quoted.
+
+        Returns
+        -------
+        types : List[Optional[str]]
+            The type of every cell, or None if the type is unknown. See
+            :meth:`detect_type`.
+
+        """
+        types: Dict[Tuple[str, bool], Optional[str]] = {}
+        result = []
+        for key in self._zip_quoted(cells, is_quoted):
+            if key in types:
+                result.append(types[key])
+            else:
+                cell_type = self.detect_type(*key)
+                types[key] = cell_type
+                result.append(cell_type)
+        return result
+
+    def is_known_types(
+        self,
+        cells: Iterable[str],
+        is_quoted: Optional[Iterable[bool]] = None,
+    ) -> List[bool]:
+        """Check for many cells whether their type is known
+
+        Identical cells are only classified once. See :meth:`detect_types`
+        for a description of the parameters.
+
+        Returns
+        -------
+        known : List[bool]
+            Whether the type of every cell is known.
+
+        """
+        known: Dict[Tuple[str, bool], bool] = {}
+        result = []
+        for key in self._zip_quoted(cells, is_quoted):
+            if key in known:
+                result.append(known[key])
+            else:
+                is_known = self.is_known_type(*key)
+                known[key] = is_known
+                result.append(is_known)
+        return result
 
     def detect_type(self, cell: str, is_quoted: bool = False) -> Optional[str]:
         cell = cell.strip() if self.strip_whitespace else cell
-        for name, func in self._type_tests:
-            if func(cell, is_quoted=is_quoted):
+        key = (
+            cell[:1],
+            cell[-1:],
+            is_quoted,
+            bisect.bisect_left(self._length_limits, len(cell)),
+        )
+        tests = self._dispatch.get(key)
+        if tests is None:
+            tests = self._dispatch_tests(*key)
+        if self.adaptive:
+            return self._detect_type_adaptive(cell, is_quoted, tests)
+        return self._run_type_tests(cell, tests)
+
+    def _run_type_tests(
+        self, cell: str, tests: _CombinedTests
+    ) -> Optional[str]:
+        # The first type in the priority order whose test matches the cell
+        pattern, separate = tests.pattern, tests.separate
+        match = None if pattern is None else pattern.fullmatch(cell)
+        if match is not None:
+            separate = tests.preceding[match.lastgroup or ""]
+        for name, func in separate:
+            if func(cell):
                 return name
-        return None
+        return None if match is None else match.lastgroup
+
+    def _detect_type_adaptive(
+        self, cell: str, is_quoted: bool, tests: _CombinedTests
+    ) -> Optional[str]:
+        # Try the most frequent types first, and run all tests if the cell
+        # has none of them. See _plan_speculative_tests.
+        if tests.order_version != self._order_version:
+            self._plan_speculative_tests(is_quoted, tests)
+        cell_type: Optional[str] = None
+        for cheap, final in tests.speculative:
+            found = self._run_type_tests(cell, cheap)
+            if found is not None:
+                if found in final:
+                    cell_type = found
+                break
+        if cell_type is None:
+            cell_type = self._run_type_tests(cell, tests)
+        if cell_type is not None:
+            hits = self._type_hits
+            hits[cell_type] += 1
+            i = self._type_rank[cell_type]
+            if hits[cell_type] == 1 or (
+                i and hits[self._type_order[i - 1]] < hits[cell_type]
+            ):
+                self._promote_type(cell_type)
+        return cell_type
+
+    def _plan_speculative_tests(
+        self, is_quoted: bool, tests: _CombinedTests
+    ) -> None:
+        # Find the speculative tests for the most frequent types that can
+        # match a cell. A cell can also match a type of higher priority, so
+        # these are tested together with the type if they can overlap with
+        # it. The result of these tests is final if all types that can
+        # overlap with it are tested. Tests that need the combined pattern
+        # are skipped, since they are hardly faster than all tests.
+        types = tests.types
+        plan: List[Tuple[_CombinedTests, FrozenSet[str]]] = []
+        for name in self._type_order:
+            if len(plan) == MAX_SPECULATIVE_TESTS or not self._type_hits[name]:
+                break
+            if name not in types:
+                continue
+            tested = frozenset((self._overlaps[name] & types) | {name})
+            cheap = self._get_type_tests(is_quoted, tested)
+            if cheap.pattern is not None:
+                continue
+            final = frozenset(
+                t for t in tested if self._overlaps[t] & types <= tested
+            )
+            plan.append((cheap, final))
+        tests.order_version = self._order_version
+        tests.speculative = plan
+
+    def _promote_type(self, name: str) -> None:
+        # Move a type forward in the learned order, past the types that were
+        # detected less often
+        hits = self._type_hits
+        order = self._type_order
+        i = self._type_rank[name]
+        while i > 0 and hits[order[i - 1]] < hits[name]:
+            order[i - 1], order[i] = name, order[i - 1]
+            self._type_rank[order[i]] = i
+            i -= 1
+        self._type_rank[name] = i
+        self._order_version += 1
 
     def _run_regex(self, cell: str, patname: str) -> bool:
         cell = cell.strip() if self.strip_whitespace else cell
+        native = self._native.get(patname)
+        if native is not None:
+            return native(cell)
         pat = self.patterns.get(patname, None)
         assert pat is not None
         match = pat.fullmatch(cell)
@@ -200,9 +993,15 @@ class TypeDetector:
     def is_json_obj(self, cell: str, is_quoted: bool = False) -> bool:
         if not (cell.startswith("{") and cell.endswith("}")):
             return False
+        # An object can't be nested deeper than half its length
+        max_depth = self.max_json_depth
+        if max_depth is None:
+            max_depth = len(cell) // 2
+        if not cdetect_type.json_structure(cell, max_depth):
+            return False
         try:
             _ = json.loads(cell)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, RecursionError):
             return False
         return True
 
@@ -240,13 +1039,13 @@ def type_score(
         The computed type score
 
     """
-    total = 0
-    known = 0
-    td = TypeDetector()
+    cells: List[str] = []
+    quoted: List[bool] = []
     for row in parse_string(data, dialect, return_quoted=True):
         for cell, is_quoted in row:
-            total += 1
-            known += td.is_known_type(cell, is_quoted=is_quoted)
-    if total == 0:
+            cells.append(cell)
+            quoted.append(is_quoted)
+    if not cells:
         return eps
-    return max(eps, known / total)
+    known = TypeDetector().is_known_types(cells, quoted)
+    return max(eps, sum(known) / len(cells))
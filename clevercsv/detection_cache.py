@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+"""
+On-disk cache for the results of dialect detection.
+
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from typing import Any
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+
+from .__version__ import __version__
+from ._types import AnyPath
+from .dialect import SimpleDialect
+from .utils import sha1sum
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS detection (
+    path TEXT NOT NULL,
+    params TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha1 TEXT,
+    dialect TEXT NOT NULL,
+    encoding TEXT,
+    PRIMARY KEY (path, params)
+)
+"""
+
+
+class DetectionCache:
+    """Cache for detected dialects stored in an SQLite database
+
+    Detecting the dialect of a large file can be slow. When the same files
+    are processed repeatedly, the result of dialect detection can be stored
+    in this cache. Entries are identified by the path of the file and the
+    parameters used for detection, and are only used if the size and
+    modification time of the file are unchanged. Optionally, the SHA1
+    checksum of the file contents is verified as well. Entries saved with a
+    different version of CleverCSV are ignored, since the detected dialect
+    may change between versions.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the SQLite database file to store the cache in. It is created
+        if it doesn't exist.
+
+    verify_hash : bool
+        Also compare the SHA1 checksum of the file contents before using a
+        cached result. This is safer when files may be modified without
+        changing their size and modification time, but requires reading the
+        entire file.
+
+    """
+
+    def __init__(self, filename: AnyPath, verify_hash: bool = False) -> None:
+        self.filename = filename
+        self.verify_hash = verify_hash
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.fsdecode(filename), check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def __enter__(self) -> "DetectionCache":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _key(
+        filename: AnyPath, params: Mapping[str, Any]
+    ) -> Tuple[str, str, int, int]:
+        path = os.path.realpath(os.fsdecode(filename))
+        stat = os.stat(path)
+        # Results of an older version are not used, as detection may differ
+        key = {"version": __version__, "params": dict(params)}
+        key_params = json.dumps(key, sort_keys=True, default=str)
+        return path, key_params, stat.st_size, stat.st_mtime_ns
+
+    def get(
+        self, filename: AnyPath, params: Mapping[str, Any]
+    ) -> Optional[Tuple[SimpleDialect, Optional[str]]]:
+        """Retrieve the cached detection result for a file
+
+        Parameters
+        ----------
+        filename : str
+            Path of the CSV file
+
+        params : Mapping[str, Any]
+            The parameters used for dialect detection, such as the number of
+            characters and the detection method.
+
+        Returns
+        -------
+        result : Optional[Tuple[SimpleDialect, Optional[str]]]
+            The cached dialect and encoding of the file, or None if there is
+            no valid entry in the cache.
+
+        """
+        path, key_params, size, mtime_ns = self._key(filename, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, sha1, dialect, encoding "
+                "FROM detection WHERE path = ? AND params = ?",
+                (path, key_params),
+            ).fetchone()
+        if row is None:
+            return None
+        c_size, c_mtime_ns, c_sha1, c_dialect, c_encoding = row
+        if c_size != size or c_mtime_ns != mtime_ns:
+            return None
+        if self.verify_hash and c_sha1 != sha1sum(path):
+            return None
+        return SimpleDialect.deserialize(c_dialect), c_encoding
+
+    def put(
+        self,
+        filename: AnyPath,
+        params: Mapping[str, Any],
+        dialect: SimpleDialect,
+        encoding: Optional[str],
+    ) -> None:
+        """Store the detection result for a file in the cache
+
+        Parameters
+        ----------
+        filename : str
+            Path of the CSV file
+
+        params : Mapping[str, Any]
+            The parameters used for dialect detection.
+
+        dialect : SimpleDialect
+            The detected dialect
+
+        encoding : Optional[str]
+            The encoding of the file
+
+        """
+        path, key_params, size, mtime_ns = self._key(filename, params)
+        checksum = sha1sum(path) if self.verify_hash else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO detection "
+                "(path, params, size, mtime_ns, sha1, dialect, encoding) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    key_params,
+                    size,
+                    mtime_ns,
+                    checksum,
+                    dialect.serialize(),
+                    encoding,
+                ),
+            )
+
+    def clear(self) -> None:
+        """Remove all entries from the cache"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM detection")
+
+    def close(self) -> None:
+        """Close the connection to the database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+Profiling information for dialect detection.
+
+"""
+
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from .dialect import SimpleDialect
+
+
+@dataclass
+class DialectProfile:
+    """Timings and scores of a single dialect in the consistency measure
+
+    The time to compute the type score includes the time needed to parse the
+    data with the dialect, since cells are classified while parsing. The
+    ``status`` is ``"scored"`` if the consistency score was computed,
+    ``"skipped"`` if the type score wasn't computed because the pattern score
+    was too low, and ``"stopped"`` if the computation of the type score was
+    stopped early.
+    """
+
+    dialect: SimpleDialect
+    abstraction_time: float
+    pattern_time: float
+    type_time: float
+    pattern_score: float
+    type_score: Optional[float]
+    status: str
+
+    @property
+    def total_time(self) -> float:
+        return self.abstraction_time + self.pattern_time + self.type_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dialect": self.dialect.to_dict(),
+            "abstraction_time": self.abstraction_time,
+            "pattern_time": self.pattern_time,
+            "type_time": self.type_time,
+            "pattern_score": self.pattern_score,
+            "type_score": self.type_score,
+            "status": self.status,
+        }
+
+
+@dataclass
+class DetectionProfile:
+    """Profile of a call to :meth:`~clevercsv.detect.Detector.detect`
+
+    The ``stages`` dictionary holds the time in seconds spent in each stage
+    of detection, in the order in which the stages were run. The possible
+    stages are ``"normal_form"``, ``"get_dialects"``, ``"url_filter"`` (part
+    of ``"get_dialects"``), ``"consistency_scores"``, ``"prefilter"`` (part
+    of ``"consistency_scores"``), and ``"tie_breaking"``. The ``dialects``
+    list contains a :class:`DialectProfile` for every dialect for which the
+    consistency score was computed exactly. The ``dropped_delimiters`` list
+    contains the delimiters whose dialects were dropped by the prefilter.
+
+    The type cache statistics count the cells for which the Python type
+    detector was consulted. Cells with a common type are classified by the C
+    parser and don't reach the cache.
+    """
+
+    method: Optional[str] = None
+    total_time: float = 0.0
+    num_dialects: int = 0
+    stages: Dict[str, float] = field(default_factory=dict)
+    dialects: List[DialectProfile] = field(default_factory=list)
+    type_cache_hits: int = 0
+    type_cache_misses: int = 0
+    dropped_delimiters: List[str] = field(default_factory=list)
+
+    @property
+    def type_cache_hit_rate(self) -> Optional[float]:
+        lookups = self.type_cache_hits + self.type_cache_misses
+        if not lookups:
+            return None
+        return self.type_cache_hits / lookups
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "total_time": self.total_time,
+            "num_dialects": self.num_dialects,
+            "stages": dict(self.stages),
+            "dialects": [d.to_dict() for d in self.dialects],
+            "type_cache_hits": self.type_cache_hits,
+            "type_cache_misses": self.type_cache_misses,
+            "type_cache_hit_rate": self.type_cache_hit_rate,
+            "dropped_delimiters": list(self.dropped_delimiters),
+        }
+
+    def format(self, max_dialects: Optional[int] = 10) -> str:
+        """Format the profile as a human-readable report
+
+        Parameters
+        ----------
+        max_dialects : Optional[int]
+            The maximum number of dialects to include, ordered by the time
+            spent on them. If None, all dialects are included.
+
+        Returns
+        -------
+        report : str
+            The profile report
+
+        """
+        lines = [
+            f"Method: {self.method}",
+            f"Total time: {self.total_time:.6f} seconds",
+            f"Potential dialects: {self.num_dialects}",
+        ]
+        if self.dropped_delimiters:
+            lines.append(f"Dropped delimiters: {self.dropped_delimiters!r}")
+        for stage, seconds in self.stages.items():
+            lines.append(f"  {stage:<20s}{seconds:12.6f} seconds")
+
+        rate = self.type_cache_hit_rate
+        lines.append(
+            "Type cache: %i hits, %i misses%s"
+            % (
+                self.type_cache_hits,
+                self.type_cache_misses,
+                "" if rate is None else f" (hit rate {rate:.1%})",
+            )
+        )
+        if not self.dialects:
+            return "\n".join(lines)
+
+        dialects = sorted(self.dialects, key=lambda d: -d.total_time)
+        if max_dialects is not None:
+            dialects = dialects[:max_dialects]
+        lines.append(
+            "%-28s%12s%12s%12s  %s"
+            % ("Dialect", "abstr. (s)", "pattern (s)", "type (s)", "status")
+        )
+        for d in dialects:
+            lines.append(
+                "%-28r%12.6f%12.6f%12.6f  %s"
+                % (
+                    d.dialect,
+                    d.abstraction_time,
+                    d.pattern_time,
+                    d.type_time,
+                    d.status,
+                )
+            )
+        return "\n".join(lines)
+
+
+@contextmanager
+def timed(profile: Optional[DetectionProfile], stage: str) -> Iterator[None]:
+    """Add the time spent in the context to a stage of the profile
+
+    Nothing is recorded if ``profile`` is None.
+    """
+    if profile is None:
+        yield
+        return
+    profile.stages.setdefault(stage, 0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_time(stage, time.perf_counter() - start)
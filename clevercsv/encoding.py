@@ -11,8 +11,6 @@ This file is part of CleverCSV.
 
 from typing import Optional
 
-import chardet
-
 from ._optional import import_optional_dependency
 from ._types import _OpenFile
 
@@ -47,6 +45,9 @@ def get_encoding(
         cchardet = None
 
     if cchardet is None:
+        # chardet is imported here, since importing it takes a while
+        import chardet
+
         detector = chardet.UniversalDetector()
     else:
         detector = cchardet.UniversalDetector()
@@ -11,6 +11,7 @@ import codecs
 import sys
 import unicodedata
 
+from typing import Any
 from typing import Iterable
 from typing import Optional
 from typing import Set
@@ -33,14 +34,21 @@ DEFAULT_BLOCK_CHARS: Set[str] = set(
     ]
 )
 
-#: Set of characters in the Unicode "Po" category
-UNICODE_PO_CHARS: Set[str] = set(
-    [
-        c
-        for c in map(chr, range(sys.maxunicode + 1))
-        if unicodedata.category(c) == "Po"
-    ]
-)
+#: Set of characters in the Unicode "Po" category. This is built when it is
+#: first used, since it requires a lookup for every code point.
+UNICODE_PO_CHARS: Set[str]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "UNICODE_PO_CHARS":
+        chars = set(
+            c
+            for c in map(chr, range(sys.maxunicode + 1))
+            if unicodedata.category(c) == "Po"
+        )
+        globals()[name] = chars
+        return chars
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
 def is_potential_escapechar(
@@ -79,6 +87,10 @@ def is_potential_escapechar(
     block_chars = (
         DEFAULT_BLOCK_CHARS if block_char is None else set(block_char)
     )
-    if uchar in UNICODE_PO_CHARS and uchar not in block_chars:
+    if (
+        len(uchar) == 1
+        and unicodedata.category(uchar) == "Po"
+        and uchar not in block_chars
+    ):
         return True
     return False
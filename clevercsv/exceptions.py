@@ -16,3 +16,7 @@ class Error(ParserError):
 
 class NoDetectionResult(Exception):
     pass
+
+
+class ApproximateDetectionWarning(UserWarning):
+    pass
@@ -18,13 +18,15 @@ from typing import Callable
 from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Set
 from typing import Tuple
 
 import regex
 
+from .cnormal_form import normal_forms
+from .cnormal_form import preceding_chars
 from .dialect import SimpleDialect
 from .escape import is_potential_escapechar
-from .utils import pairwise
 
 DELIMS: List[str] = [",", ";", "|", "\t"]
 QUOTECHARS: List[str] = ["'", '"']
@@ -55,8 +57,9 @@ def detect_dialect_normal(
     if delimiters is None:
         delimiters = DELIMS
     delimiters = list(delimiters)
+    escaped = escaped_chars(data, encoding, delimiters + QUOTECHARS)
     for delim, quotechar in itertools.product(delimiters, QUOTECHARS):
-        if maybe_has_escapechar(data, encoding, delim, quotechar):
+        if delim in escaped or quotechar in escaped:
             if verbose:
                 print("Not normal, has potential escapechar.")
             return None
@@ -92,8 +95,19 @@ def detect_dialect_normal(
 
     rows = split_file(data)
 
+    # All forms are matched in a single pass for delimiters of one character
+    matches: Optional[Set[Tuple[int, str, str]]] = None
+    if all(len(delim) == 1 for delim in delimiters):
+        matches = set(
+            normal_forms(rows, "".join(delimiters), "".join(QUOTECHARS))
+        )
+
     for ID, form_func, dialect in form_and_dialect:
-        if form_func(rows, dialect):
+        if matches is None:
+            matched = form_func(rows, dialect)
+        else:
+            matched = (ID, dialect.delimiter, dialect.quotechar) in matches
+        if matched:
             if verbose:
                 print("Matched normal form %i." % ID)
             return dialect
@@ -144,15 +158,40 @@ def has_nested_quotes(string: str, quotechar: str) -> bool:
     return quotechar in string[1:-1]
 
 
+def escaped_chars(data: str, encoding: str, chars: Iterable[str]) -> Set[str]:
+    """Find the characters that are preceded by a potential escape character
+
+    Parameters
+    ----------
+    data : str
+        The data as a single string
+
+    encoding : str
+        The encoding of the data
+
+    chars : Iterable[str]
+        The characters to check, such as the candidate delimiters and quote
+        characters. Strings that are not a single character are never
+        preceded by a potential escape character.
+
+    Returns
+    -------
+    escaped : Set[str]
+        The characters of chars that directly follow a potential escape
+        character somewhere in the data.
+    """
+    targets = "".join(c for c in chars if len(c) == 1)
+    return set(
+        char
+        for char, preceding in preceding_chars(data, targets).items()
+        if any(is_potential_escapechar(u, encoding) for u in preceding)
+    )
+
+
 def maybe_has_escapechar(
     data: str, encoding: str, delim: str, quotechar: str
 ) -> bool:
-    if delim not in data and quotechar not in data:
-        return False
-    for u, v in pairwise(data):
-        if v in [delim, quotechar] and is_potential_escapechar(u, encoding):
-            return True
-    return False
+    return bool(escaped_chars(data, encoding, [delim, quotechar]))
 
 
 def strip_trailing_crnl(data: str) -> str:
@@ -8,7 +8,7 @@ Author: Gertjan van den Burg
 """
 
 import codecs
-import itertools
+import re
 import unicodedata
 
 from typing import Dict
@@ -16,11 +16,17 @@ from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Set
-
-from ._regexes import PATTERN_URL
+from typing import Tuple
+
+from ._regexes import PATTERN_URL_ANCHOR
+from ._regexes import PATTERN_URL_CHARS
+from ._regexes import PATTERN_URL_CHARS_REVERSE
+from ._regexes import PATTERN_URL_FILTER
+from .cabstraction import c_masked_by_quotechar
+from .detection_profile import DetectionProfile
+from .detection_profile import timed
 from .dialect import SimpleDialect
 from .escape import is_potential_escapechar
-from .utils import pairwise
 
 
 def get_dialects(
@@ -28,6 +34,7 @@ def get_dialects(
     encoding: str = "UTF-8",
     delimiters: Optional[List[str]] = None,
     test_masked_by_quotes: bool = False,
+    profile: Optional[DetectionProfile] = None,
 ) -> List[SimpleDialect]:
     """Return the possible dialects for the given data.
 
@@ -58,8 +65,15 @@ def get_dialects(
     test_masked_by_quotes : bool
         Remove dialects where the delimiter is always masked by the quote
         character. Enabling this typically removes a number of potential
-        dialects from the list, which can remove false positives. It however
-        not a very fast operation, so it is disabled by default.
+        dialects from the list, which can remove false positives. All
+        dialects are tested in a single pass over the data with
+        :func:`masked_by_quotechars`. It is disabled by default for
+        backwards compatibility, but enabled by
+        :class:`~clevercsv.detect.Detector`.
+
+    profile : Optional[DetectionProfile]
+        If not None, the time spent on filtering URLs is added to this
+        profile.
 
     Returns
     -------
@@ -68,40 +82,29 @@ def get_dialects(
 
     """
     # URLs are removed to reduce noise
-    no_url = filter_urls(data)
-    delims = get_delimiters(no_url, encoding, delimiters=delimiters)
-    quotechars = get_quotechars(no_url)
-    escapechars = {}
-
-    for delim, quotechar in itertools.product(delims, quotechars):
-        escapechars[(delim, quotechar)] = set([""])
-
-    is_escapechar_cache: Dict[str, bool] = {}
-
-    # escapechars are those that precede a delimiter or quotechar
-    for u, v in pairwise(data):
-        if u not in is_escapechar_cache:
-            is_escapechar_cache[u] = is_potential_escapechar(u, encoding)
-        if not is_escapechar_cache[u]:
-            continue
-
-        for delim, quotechar in itertools.product(delims, quotechars):
-            if v == delim or v == quotechar:
-                escapechars[(delim, quotechar)].add(u)
-
-    # remove dialects where the delimiter is always masked by quotes.
-    dialects = []
+    with timed(profile, "url_filter"):
+        no_url = filter_urls(data)
+    chars = set(no_url)
+    delims = _select_delimiters(chars, encoding, delimiters=delimiters)
+    quotechars = _select_quotechars(chars)
+    preceding = preceding_escapechars(data, encoding, delims | quotechars)
+
+    candidates = []
     for delim in delims:
         for quotechar in quotechars:
-            for escapechar in escapechars[(delim, quotechar)]:
-                if test_masked_by_quotes and masked_by_quotechar(
-                    data, quotechar, escapechar, delim
-                ):
-                    continue
-                d = SimpleDialect(delim, quotechar, escapechar)
-                dialects.append(d)
+            escapechars = set([""])
+            escapechars.update(preceding.get(delim, ()))
+            escapechars.update(preceding.get(quotechar, ()))
+            for escapechar in escapechars:
+                candidates.append((delim, quotechar, escapechar))
+
+    # remove dialects where the delimiter is always masked by quotes.
+    if test_masked_by_quotes:
+        pairs = {(q, e) for _, q, e in candidates}
+        masked = masked_by_quotechars(data, pairs, delims)
+        candidates = [c for c in candidates if c[0] not in masked[c[1:]]]
 
-    return dialects
+    return [SimpleDialect(d, q, e) for d, q, e in candidates]
 
 
 def unicode_category(x: str, encoding: str) -> str:
@@ -125,9 +128,81 @@ def unicode_category(x: str, encoding: str) -> str:
     return unicodedata.category(as_unicode)
 
 
+def preceding_escapechars(
+    data: str, encoding: str, chars: Iterable[str]
+) -> Dict[str, Set[str]]:
+    """Find the potential escape characters that precede given characters
+
+    The potential escape characters of the data are found with
+    :func:`~clevercsv.escape.is_potential_escapechar`, and the characters
+    that follow them are collected with a single regular expression search.
+    The time this takes is linear in the length of the data and doesn't
+    depend on the number of characters.
+
+    Parameters
+    ----------
+    data : str
+        The data of the file as a string
+
+    encoding : str
+        The encoding of the file
+
+    chars : Iterable[str]
+        The characters to find the preceding escape characters for, such as
+        the potential delimiters and quote characters.
+
+    Returns
+    -------
+    preceding : Dict[str, Set[str]]
+        Map of every character of ``chars`` that is preceded by a potential
+        escape character to the set of such escape characters.
+
+    """
+    escapechars = [
+        u for u in set(data) if is_potential_escapechar(u, encoding)
+    ]
+    targets = [c for c in set(chars) if c]
+    preceding: Dict[str, Set[str]] = {}
+    if not escapechars or not targets:
+        return preceding
+
+    # the lookahead gives the pairs of overlapping escape characters too
+    pattern = "([%s])(?=([%s]))" % (
+        "".join(map(re.escape, escapechars)),
+        "".join(map(re.escape, targets)),
+    )
+    for u, v in set(re.findall(pattern, data)):
+        preceding.setdefault(v, set()).add(u)
+    return preceding
+
+
 def filter_urls(data: str) -> str:
-    """Filter URLs from the data"""
-    return PATTERN_URL.sub("U", data)
+    """Filter URLs from the data
+
+    A URL consists of a run of characters that can occur in URLs and it
+    contains an anchor, such as the dot before a top-level domain. The URL
+    pattern is therefore only applied to the runs of such characters that
+    contain an anchor. If the data has no anchors it is returned as is.
+
+    """
+    anchor = PATTERN_URL_ANCHOR.search(data)
+    if anchor is None:
+        return data
+
+    parts = []
+    end = 0
+    while anchor is not None:
+        # extend the anchor to the run of URL characters around it
+        before = PATTERN_URL_CHARS_REVERSE.match(data, end, anchor.start())
+        after = PATTERN_URL_CHARS.match(data, anchor.start())
+        assert before is not None and after is not None
+        parts.append(data[end : before.start()])
+        run = data[before.start() : after.end()]
+        parts.append(PATTERN_URL_FILTER.sub("U", run))
+        end = after.end()
+        anchor = PATTERN_URL_ANCHOR.search(data, end)
+    parts.append(data[end:])
+    return "".join(parts)
 
 
 def get_delimiters(
@@ -181,6 +256,24 @@ def get_delimiters(
         Set of potential delimiters. The empty string is added by default.
 
     """
+    return _select_delimiters(
+        set(data),
+        encoding,
+        delimiters=delimiters,
+        block_cat=block_cat,
+        block_char=block_char,
+    )
+
+
+def _select_delimiters(
+    chars: Set[str],
+    encoding: str,
+    delimiters: Optional[List[str]] = None,
+    block_cat: Optional[List[str]] = None,
+    block_char: Optional[List[str]] = None,
+) -> Set[str]:
+    # The potential delimiters among the unique characters of the data, see
+    # get_delimiters
     if block_cat is None:
         block_cat = [
             "Lu",
@@ -199,7 +292,7 @@ def get_delimiters(
         block_char = [".", "/", '"', "'", "\n", "\r"]
 
     D = set()
-    for x in set(data):
+    for x in chars:
         c = unicode_category(x, encoding=encoding)
         if delimiters is None:
             if x == "\t" or ((x not in block_char) and (c not in block_cat)):
@@ -239,13 +332,55 @@ def get_quotechars(
         default.
 
     """
+    return _select_quotechars(set(data), quote_chars=quote_chars)
+
+
+def _select_quotechars(
+    chars: Set[str], quote_chars: Optional[Iterable[str]] = None
+) -> Set[str]:
+    # The potential quote characters among the unique characters of the
+    # data, see get_quotechars
     if quote_chars is None:
         quote_chars = ["'", '"', "~", "`"]
-    Q = set(quote_chars) & set(data)
+    Q = set(quote_chars) & chars
     Q.add("")
     return Q
 
 
+def masked_by_quotechars(
+    data: str, pairs: Iterable[Tuple[str, str]], test_chars: Iterable[str]
+) -> Dict[Tuple[str, str], Set[str]]:
+    """Find the characters that are always masked by quote characters
+
+    This is the equivalent of :func:`masked_by_quotechar` for several quote
+    characters, escape characters, and test characters at once. All
+    combinations are tested in a single pass over the data, which stops as
+    soon as every test character has been found outside quoted segments.
+
+    Parameters
+    ----------
+    data: str
+        The data of the file as a string
+
+    pairs: Iterable[Tuple[str, str]]
+        The pairs of quote character and escape character to test
+
+    test_chars: Iterable[str]
+        The characters to test. The empty string is never masked.
+
+    Returns
+    -------
+    masked: Dict[Tuple[str, str], Set[str]]
+        A map from every pair of quote character and escape character to the
+        test characters that are never outside quoted segments.
+
+    """
+    pairs = list(pairs)
+    test_str = "".join(sorted(set(test_chars)))
+    result = c_masked_by_quotechar(data, pairs, test_str)
+    return {pair: set(masked) for pair, masked in zip(pairs, result)}
+
+
 def masked_by_quotechar(
     data: str, quotechar: str, escapechar: str, test_char: str
 ) -> bool:
@@ -253,6 +388,7 @@ def masked_by_quotechar(
 
     This function tests if a given character is always within quoted segments
     (defined by the quote character). Double quoting and escaping is supported.
+    The escape character escapes only the character that follows it.
 
     Parameters
     ----------
@@ -277,25 +413,5 @@ def masked_by_quotechar(
     """
     if test_char == "":
         return False
-    escape_next = False
-    in_quotes = False
-    i = 0
-    while i < len(data):
-        s = data[i]
-        if s == quotechar:
-            if escape_next:
-                i += 1
-                continue
-            if not in_quotes:
-                in_quotes = True
-            else:
-                if i + 1 < len(data) and data[i + 1] == quotechar:
-                    i += 1
-                else:
-                    in_quotes = False
-        elif s == test_char and not in_quotes:
-            return False
-        elif s == escapechar:
-            escape_next = True
-        i += 1
-    return True
+    masked = masked_by_quotechars(data, [(quotechar, escapechar)], test_char)
+    return test_char in masked[quotechar, escapechar]
@@ -16,10 +16,10 @@ from typing import Iterator
 from typing import List
 from typing import Optional
 
-from . import field_size_limit
 from ._types import _DialectLike
 from .cparser import Error as ParserError
 from .cparser import Parser
+from .cparser_util import field_size_limit
 from .dialect import SimpleDialect
 from .exceptions import Error
 
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+"""
+A cache for type detection results that can be shared between detectors.
+
+"""
+
+import json
+import threading
+
+from collections import OrderedDict
+
+from typing import Callable
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from .__version__ import __version__
+from ._types import AnyPath
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+class TypeCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    capacity: Optional[int]
+
+
+class TypeCache:
+    """Cache for the result of type detection on cells
+
+    The :class:`ConsistencyDetector` clears its internal cache of type
+    detection results for every call. When many files with a similar
+    vocabulary are processed, it is beneficial to keep the results of type
+    detection between calls. A ``TypeCache`` can be shared between detectors
+    and between threads for this purpose.
+
+    Note that the cached results are only valid for the default
+    :class:`~clevercsv.detect_type.TypeDetector`, so a cache shouldn't be
+    shared between detectors that use different type detection settings.
+
+    Parameters
+    ----------
+    capacity : Optional[int]
+        The maximum number of entries in the cache. If None, the cache is
+        unbounded.
+
+    policy : str
+        The eviction policy to use when the cache is full. Either ``"lru"``
+        to evict the least recently used entry, or ``"fifo"`` to evict the
+        oldest entry.
+
+    """
+
+    def __init__(
+        self, capacity: Optional[int] = 100_000, policy: str = "lru"
+    ) -> None:
+        if capacity is not None and capacity < 1:
+            raise ValueError("Capacity of the cache must be positive")
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(
+                "Unknown eviction policy %r, expected one of: %s"
+                % (policy, ", ".join(EVICTION_POLICIES))
+            )
+        self.capacity = capacity
+        self.policy = policy
+        self._data: OrderedDict[Tuple[str, bool], bool] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def lookup(
+        self,
+        cell: str,
+        is_quoted: bool,
+        func: Callable[[str, bool], bool],
+    ) -> bool:
+        """Return the cached result or compute it with ``func``
+
+        Parameters
+        ----------
+        cell : str
+            The cell to look up
+
+        is_quoted : bool
+            Whether the cell is quoted
+
+        func : Callable[[str, bool], bool]
+            Function that computes the result if it is not in the cache.
+
+        Returns
+        -------
+        is_known : bool
+            Whether the cell has a known type.
+
+        """
+        key = (cell, is_quoted)
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._hits += 1
+                if self.policy == "lru":
+                    self._data.move_to_end(key)
+                return value
+            self._misses += 1
+
+        value = func(cell, is_quoted)
+        self.put(cell, is_quoted, value)
+        return value
+
+    def put(self, cell: str, is_quoted: bool, value: bool) -> None:
+        """Add an entry to the cache, evicting entries if needed"""
+        key = (cell, is_quoted)
+        with self._lock:
+            if key in self._data:
+                self._data[key] = value
+                return
+            self._data[key] = value
+            if self.capacity is None:
+                return
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries from the cache and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> TypeCacheInfo:
+        """Return the statistics of the cache"""
+        with self._lock:
+            return TypeCacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._data),
+                self.capacity,
+            )
+
+    def save(self, filename: AnyPath) -> None:
+        """Save the entries of the cache to a JSON file
+
+        Entries are stored from the least to the most recently used (or
+        inserted), so that the order is retained when the cache is loaded.
+
+        Parameters
+        ----------
+        filename : str
+            The file to write the cache to.
+
+        """
+        with self._lock:
+            entries = [[c, q, v] for (c, q), v in self._data.items()]
+        obj = {"version": __version__, "entries": entries}
+        with open(filename, "w", encoding="utf-8") as fp:
+            json.dump(obj, fp)
+
+    @classmethod
+    def load(
+        cls,
+        filename: AnyPath,
+        capacity: Optional[int] = 100_000,
+        policy: str = "lru",
+    ) -> "TypeCache":
+        """Load a cache from a JSON file created with :meth:`save`
+
+        Entries saved with a different version of CleverCSV are ignored,
+        since type detection may have changed between versions.
+
+        Parameters
+        ----------
+        filename : str
+            The file to read the cache from.
+
+        capacity : Optional[int]
+            The capacity of the new cache. See :class:`TypeCache`.
+
+        policy : str
+            The eviction policy of the new cache. See :class:`TypeCache`.
+
+        Returns
+        -------
+        cache : TypeCache
+            The loaded cache.
+
+        """
+        cache = cls(capacity=capacity, policy=policy)
+        with open(filename, "r", encoding="utf-8") as fp:
+            obj = json.load(fp)
+        if obj.get("version") != __version__:
+            return cache
+        for cell, is_quoted, value in obj["entries"]:
+            cache.put(cell, bool(is_quoted), bool(value))
+        return cache
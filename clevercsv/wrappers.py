@@ -6,6 +6,7 @@ Wrappers for some loading/saving functionality.
 Author: Gertjan van den Burg
 
 """
+
 from __future__ import annotations
 
 import os
@@ -13,21 +14,30 @@ import warnings
 
 from typing import TYPE_CHECKING
 from typing import Any
+from typing import Dict
 from typing import Iterable
 from typing import Iterator
 from typing import List
 from typing import Mapping
 from typing import Optional
+from typing import Tuple
 from typing import TypeVar
 
 from ._optional import import_optional_dependency
+from .column_types import DEFAULT_SAMPLE_ROWS
+from .column_types import column_dtype
+from .column_types import infer_column_types
+from .consistency import DetectionBudget
 from .detect import Detector
+from .detection_cache import DetectionCache
 from .dialect import SimpleDialect
 from .dict_read_write import DictReader
 from .dict_read_write import DictWriter
 from .encoding import get_encoding
+from .exceptions import ApproximateDetectionWarning
 from .exceptions import NoDetectionResult
 from .read import reader
+from .type_cache import TypeCache
 from .write import writer
 
 if TYPE_CHECKING:
@@ -169,6 +179,7 @@ def read_table(
     encoding: Optional[str] = None,
     num_chars: Optional[int] = None,
     verbose: bool = False,
+    detection_cache: Optional[DetectionCache] = None,
 ) -> List[List[str]]:
     """Read a CSV file as a table (a list of lists)
 
@@ -200,6 +211,11 @@ def read_table(
     verbose: bool
         Whether or not to show detection progress.
 
+    detection_cache : Optional[DetectionCache]
+        A :class:`~clevercsv.detection_cache.DetectionCache` to look up and
+        store the detected dialect and encoding in. Only used when the
+        dialect is detected.
+
     Returns
     -------
     rows: list
@@ -218,6 +234,7 @@ def read_table(
             encoding=encoding,
             num_chars=num_chars,
             verbose=verbose,
+            detection_cache=detection_cache,
         )
     )
 
@@ -228,6 +245,7 @@ def stream_table(
     encoding: Optional[str] = None,
     num_chars: Optional[int] = None,
     verbose: bool = False,
+    detection_cache: Optional[DetectionCache] = None,
 ) -> Iterator[List[str]]:
     """Read a CSV file as a generator over rows of a table
 
@@ -259,6 +277,11 @@ def stream_table(
     verbose: bool
         Whether or not to show detection progress.
 
+    detection_cache : Optional[DetectionCache]
+        A :class:`~clevercsv.detection_cache.DetectionCache` to look up and
+        store the detected dialect and encoding in. Only used when the
+        dialect is detected.
+
     Returns
     -------
     rows: generator
@@ -270,6 +293,12 @@ def stream_table(
         When the dialect detection fails.
 
     """
+    params = _detection_params(num_chars=num_chars, encoding=encoding)
+    if dialect is None:
+        cached = _cache_get(detection_cache, filename, params)
+        if cached is not None:
+            dialect, encoding = cached
+
     if encoding is None:
         encoding = get_encoding(filename)
     with open(filename, "r", newline="", encoding=encoding) as fid:
@@ -278,6 +307,7 @@ def stream_table(
             dialect = Detector().detect(data, verbose=verbose)
             if dialect is None:
                 raise NoDetectionResult()
+            _cache_put(detection_cache, filename, params, dialect, encoding)
             fid.seek(0)
         r = reader(fid, dialect)
         yield from r
@@ -287,6 +317,8 @@ def read_dataframe(
     filename: "FileDescriptorOrPath",
     *args: Any,
     num_chars: Optional[int] = None,
+    infer_dtypes: bool = False,
+    infer_sample_rows: Optional[int] = DEFAULT_SAMPLE_ROWS,
     **kwargs: Any,
 ) -> pd.DataFrame:
     """Read a CSV file to a Pandas dataframe
@@ -312,6 +344,21 @@ def read_dataframe(
         Note that using less than the entire file will speed up detection, but
         can reduce the accuracy of the detected dialect.
 
+    infer_dtypes: bool
+        Whether to infer the types of the columns with
+        :func:`~clevercsv.column_types.infer_column_types` and pass them to
+        ``read_csv`` as the ``dtype`` and ``parse_dates`` arguments. This
+        avoids columns of mixed types, but it doesn't make reading faster,
+        since the rows are classified an additional time. Types given in
+        ``dtype`` or ``parse_dates`` take precedence. This is only supported
+        if ``header`` is ``"infer"``, 0, or None.
+
+    infer_sample_rows: Optional[int]
+        Number of rows of which the types are inferred if ``infer_dtypes``
+        is True. If None, all rows are used. If the inferred types don't fit
+        the rows after the sample, so that ``read_csv`` fails, the file is
+        read again without the inferred types.
+
     **kwargs:
         Additional keyword arguments for the ``pandas.read_csv`` function. You
         can specify the file encoding here if needed, and it will be used
@@ -334,6 +381,12 @@ def read_dataframe(
     if dialect is None:
         raise NoDetectionResult
 
+    inferred_kwargs = None
+    if infer_dtypes:
+        inferred_kwargs = _with_inferred_dtypes(
+            filename, dialect, enc, kwargs, infer_sample_rows
+        )
+
     csv_dialect = dialect.to_csv_dialect()
 
     # This is used to catch pandas' warnings when a dialect is supplied.
@@ -343,10 +396,77 @@ def read_dataframe(
             message="^Conflicting values for .*",
             category=pd.errors.ParserWarning,
         )
+        if inferred_kwargs is not None:
+            try:
+                return pd.read_csv(
+                    filename, *args, dialect=csv_dialect, **inferred_kwargs
+                )
+            except (ValueError, OverflowError):
+                # the inferred types don't fit the rows after the sample
+                pass
         df = pd.read_csv(filename, *args, dialect=csv_dialect, **kwargs)
     return df
 
 
+def _with_inferred_dtypes(
+    filename: "FileDescriptorOrPath",
+    dialect: SimpleDialect,
+    encoding: Optional[str],
+    kwargs: Dict[str, Any],
+    sample_rows: Optional[int],
+) -> Dict[str, Any]:
+    # The keyword arguments of read_csv with the inferred column types added
+    names = kwargs.get("names")
+    header = kwargs.get("header", "infer")
+    if not (header is None or header == "infer" or header == 0):
+        raise ValueError(
+            "Inferring dtypes is only supported if header is 'infer', 0, "
+            "or None"
+        )
+    has_header = header == 0 or (header == "infer" and names is None)
+    histograms = infer_column_types(
+        filename,
+        dialect,
+        encoding=encoding,
+        sample_rows=sample_rows,
+        header=has_header,
+    )
+
+    labels: List[Any]
+    if names is not None:
+        labels = list(names)
+    elif has_header:
+        with open(filename, "r", newline="", encoding=encoding) as fp:
+            labels = list(next(reader(fp, dialect=dialect), []))
+        # pandas renames empty and duplicate labels
+        labels = [
+            label if label and labels.count(label) == 1 else None
+            for label in labels
+        ]
+    else:
+        labels = list(range(len(histograms)))
+
+    dtype: Dict[Any, str] = {}
+    parse_dates: List[Any] = []
+    for label, histogram in zip(labels, histograms):
+        column = column_dtype(histogram)
+        if label is None or column is None:
+            continue
+        if column == "datetime":
+            parse_dates.append(label)
+        else:
+            dtype[label] = column
+
+    result = dict(kwargs)
+    user_dtype = kwargs.get("dtype")
+    if user_dtype is None or isinstance(user_dtype, Mapping):
+        dtype.update(user_dtype or {})
+        result["dtype"] = dtype
+    if "parse_dates" not in kwargs and parse_dates:
+        result["parse_dates"] = parse_dates
+    return result
+
+
 def detect_dialect(
     filename: "FileDescriptorOrPath",
     num_chars: Optional[int] = None,
@@ -354,6 +474,11 @@ def detect_dialect(
     verbose: bool = False,
     method: str = "auto",
     skip: bool = True,
+    type_sample_size: Optional[int] = None,
+    type_cache: Optional[TypeCache] = None,
+    progressive: bool = False,
+    detection_cache: Optional[DetectionCache] = None,
+    budget: Optional[DetectionBudget] = None,
 ) -> Optional[SimpleDialect]:
     """Detect the dialect of a CSV file
 
@@ -385,6 +510,37 @@ def detect_dialect(
         Skip computation of the type score for dialects with a low pattern
         score.
 
+    type_sample_size : Optional[int]
+        If not None, estimate the type score of the consistency measure from a
+        sample of this many rows instead of from all rows. This is useful for
+        speeding up detection on large files when :attr:`num_chars` is None.
+        See :meth:`Detector.detect` for details.
+
+    type_cache : Optional[TypeCache]
+        A :class:`~clevercsv.type_cache.TypeCache` to reuse the results of
+        type detection between calls. This speeds up detection for files with
+        a similar vocabulary.
+
+    progressive : bool
+        Detect the dialect progressively, by starting with a small part of
+        the file and reading more of it until the detected dialect is stable.
+        In this case :attr:`num_chars` is the maximum number of characters to
+        read. See :meth:`Detector.detect_progressive` for details.
+
+    detection_cache : Optional[DetectionCache]
+        A :class:`~clevercsv.detection_cache.DetectionCache` to look up and
+        store the detected dialect in. If the file hasn't changed since it
+        was last detected with the same parameters, the cached dialect is
+        returned without running detection.
+
+    budget : Optional[DetectionBudget]
+        Limits on the wall time and the number of cells used for detection.
+        If the budget is exhausted, the best dialect found so far is returned
+        and an :class:`~clevercsv.exceptions.ApproximateDetectionWarning` is
+        issued. Approximate results are not stored in the detection cache.
+        This option is ignored for progressive detection. See
+        :meth:`Detector.detect` for details.
+
     Returns
     -------
     dialect : Optional[SimpleDialect]
@@ -392,12 +548,47 @@ def detect_dialect(
         failed.
 
     """
+    params = _detection_params(
+        num_chars=num_chars,
+        encoding=encoding,
+        method=method,
+        skip=skip,
+        type_sample_size=type_sample_size,
+        progressive=progressive,
+    )
+    cached = _cache_get(detection_cache, filename, params)
+    if cached is not None:
+        return cached[0]
+
     enc = encoding or get_encoding(filename)
     with open(filename, "r", newline="", encoding=enc) as fp:
-        data = fp.read(num_chars) if num_chars else fp.read()
-        dialect = Detector().detect(
-            data, verbose=verbose, method=method, skip=skip
-        )
+        if progressive:
+            dialect = Detector(type_cache=type_cache).detect_progressive(
+                fp,
+                verbose=verbose,
+                method=method,
+                skip=skip,
+                max_chars=num_chars,
+            )
+        else:
+            data = fp.read(num_chars) if num_chars else fp.read()
+            detector = Detector(type_cache=type_cache)
+            dialect = detector.detect(
+                data,
+                verbose=verbose,
+                method=method,
+                skip=skip,
+                type_sample_size=type_sample_size,
+                budget=budget,
+            )
+            if detector.approximate_:
+                warnings.warn(
+                    "Detection budget exhausted, the detected dialect is "
+                    "approximate.",
+                    ApproximateDetectionWarning,
+                )
+                return dialect
+    _cache_put(detection_cache, filename, params, dialect, enc)
     return dialect
 
 
@@ -505,3 +696,49 @@ def write_dicts(
         w.writeheader()
         w.writerow(first)
         w.writerows(iterator)
+
+
+def _detection_params(
+    num_chars: Optional[int] = None,
+    encoding: Optional[str] = None,
+    method: str = "auto",
+    skip: bool = True,
+    type_sample_size: Optional[int] = None,
+    progressive: bool = False,
+) -> Dict[str, Any]:
+    # Parameters that identify a detection result in the detection cache. The
+    # defaults match those of detect_dialect, so that entries are shared
+    # between the wrapper functions.
+    return dict(
+        num_chars=num_chars,
+        encoding=encoding,
+        method=method,
+        skip=skip,
+        type_sample_size=type_sample_size,
+        progressive=progressive,
+    )
+
+
+def _cache_get(
+    detection_cache: Optional[DetectionCache],
+    filename: "FileDescriptorOrPath",
+    params: Mapping[str, Any],
+) -> Optional[Tuple[SimpleDialect, Optional[str]]]:
+    # File descriptors can't be identified, so these are never cached
+    if detection_cache is None or isinstance(filename, int):
+        return None
+    return detection_cache.get(filename, params)
+
+
+def _cache_put(
+    detection_cache: Optional[DetectionCache],
+    filename: "FileDescriptorOrPath",
+    params: Mapping[str, Any],
+    dialect: Optional[SimpleDialect],
+    encoding: Optional[str],
+) -> None:
+    if detection_cache is None or isinstance(filename, int):
+        return
+    if dialect is None:
+        return
+    detection_cache.put(filename, params, dialect, encoding)
@@ -268,6 +268,194 @@ merge_err:
 	return new_S_obj;
 }
 
+/*
+ * Characters that are never equal to a character of the data, used for an
+ * empty quote or escape character.
+ */
+#define NO_CHAR 0x110000
+
+static int _set_pair_char(const char *name, Py_UCS4 *target, PyObject *src)
+{
+	Py_ssize_t len;
+	if (!PyUnicode_Check(src)) {
+		PyErr_Format(PyExc_TypeError, "\"%s\" must be string, not %.200s",
+				name, src->ob_type->tp_name);
+		return -1;
+	}
+	len = PyUnicode_GetLength(src);
+	if (len > 1) {
+		PyErr_Format(PyExc_TypeError,
+				"\"%s\" must be a 1-character string", name);
+		return -1;
+	}
+	*target = len ? PyUnicode_READ_CHAR(src, 0) : NO_CHAR;
+	return 0;
+}
+
+/*
+ * Find the test characters that never occur outside quoted segments, for
+ * every (quotechar, escapechar) pair in a single pass over the data. The
+ * scan stops as soon as every test character has been seen outside quotes
+ * for every pair.
+ */
+PyObject *c_masked_by_quotechar(PyObject *self, PyObject *args)
+{
+	int kind, tkind;
+	void *data, *tdata;
+	Py_UCS4 s, t, *quote = NULL, *escape = NULL, *tests = NULL,
+		*masked = NULL;
+	bool *in_quotes = NULL, *escape_next = NULL, *skip_next = NULL,
+	     *unmasked = NULL;
+	bool pending = false;
+	char ascii[128] = { 0 };
+	size_t i, len, n_masked, remaining;
+	Py_ssize_t p, j, k, n_pairs, n_tests;
+	PyObject *S = NULL, *pairs = NULL, *test_chars = NULL, *seq = NULL,
+		 *pair, *result = NULL, *item;
+
+	if (!PyArg_ParseTuple(args, "UOU", &S, &pairs, &test_chars))
+		return NULL;
+	if (PyUnicode_READY(S) == -1 || PyUnicode_READY(test_chars) == -1)
+		return NULL;
+
+	seq = PySequence_Fast(pairs, "pairs must be a sequence");
+	if (seq == NULL)
+		return NULL;
+	n_pairs = PySequence_Fast_GET_SIZE(seq);
+	n_tests = PyUnicode_GET_LENGTH(test_chars);
+
+	quote = PyMem_Calloc(n_pairs + 1, sizeof(Py_UCS4));
+	escape = PyMem_Calloc(n_pairs + 1, sizeof(Py_UCS4));
+	tests = PyMem_Calloc(n_tests + 1, sizeof(Py_UCS4));
+	masked = PyMem_Calloc(n_tests + 1, sizeof(Py_UCS4));
+	in_quotes = PyMem_Calloc(n_pairs + 1, sizeof(bool));
+	escape_next = PyMem_Calloc(n_pairs + 1, sizeof(bool));
+	skip_next = PyMem_Calloc(n_pairs + 1, sizeof(bool));
+	unmasked = PyMem_Calloc(n_pairs * n_tests + 1, sizeof(bool));
+	if (quote == NULL || escape == NULL || tests == NULL || masked == NULL
+			|| in_quotes == NULL || escape_next == NULL
+			|| skip_next == NULL || unmasked == NULL) {
+		PyErr_NoMemory();
+		goto masked_err;
+	}
+
+	// characters that need more than the fast path are marked in the ASCII
+	// table, other characters are compared directly.
+	for (p=0; p<n_pairs; p++) {
+		pair = PySequence_Fast_GET_ITEM(seq, p);
+		if (!PyTuple_Check(pair) || PyTuple_GET_SIZE(pair) != 2) {
+			PyErr_SetString(PyExc_TypeError,
+					"pairs must contain (quotechar, escapechar) tuples");
+			goto masked_err;
+		}
+		if (_set_pair_char("quotechar", &quote[p],
+					PyTuple_GET_ITEM(pair, 0)) < 0)
+			goto masked_err;
+		if (_set_pair_char("escapechar", &escape[p],
+					PyTuple_GET_ITEM(pair, 1)) < 0)
+			goto masked_err;
+		if (quote[p] < 128)
+			ascii[quote[p]] = 1;
+		if (escape[p] < 128)
+			ascii[escape[p]] = 1;
+	}
+	tkind = PyUnicode_KIND(test_chars);
+	tdata = PyUnicode_DATA(test_chars);
+	for (j=0; j<n_tests; j++) {
+		tests[j] = PyUnicode_READ(tkind, tdata, j);
+		if (tests[j] < 128)
+			ascii[tests[j]] = 1;
+	}
+
+	kind = PyUnicode_KIND(S);
+	data = PyUnicode_DATA(S);
+	len = PyUnicode_GET_LENGTH(S);
+	remaining = (size_t)(n_pairs * n_tests);
+
+	for (i=0; i<len && remaining > 0; i++) {
+		s = PyUnicode_READ(kind, data, i);
+
+		if (s < 128 && !ascii[s]) {
+			// an ordinary character only ends pending escapes
+			if (pending) {
+				for (p=0; p<n_pairs; p++)
+					escape_next[p] = false;
+				pending = false;
+			}
+			continue;
+		}
+
+		k = -1;
+		for (j=0; j<n_tests; j++) {
+			if (s == tests[j]) {
+				k = j;
+				break;
+			}
+		}
+
+		pending = false;
+		for (p=0; p<n_pairs; p++) {
+			if (skip_next[p]) {
+				// second quote character of an escaped quote
+				skip_next[p] = false;
+			} else if (s == quote[p]) {
+				if (escape_next[p]) {
+					escape_next[p] = false;
+				} else if (!in_quotes[p]) {
+					in_quotes[p] = true;
+				} else {
+					t = i + 1 < len ? PyUnicode_READ(kind, data, i + 1) : NO_CHAR;
+					if (t == quote[p])
+						skip_next[p] = true;
+					else
+						in_quotes[p] = false;
+				}
+			} else {
+				if (k >= 0 && !in_quotes[p]
+						&& !unmasked[p * n_tests + k]) {
+					unmasked[p * n_tests + k] = true;
+					remaining--;
+				}
+				if (s == escape[p])
+					escape_next[p] = !escape_next[p];
+				else
+					escape_next[p] = false;
+			}
+			pending |= escape_next[p];
+		}
+	}
+
+	result = PyList_New(n_pairs);
+	if (result == NULL)
+		goto masked_err;
+	for (p=0; p<n_pairs; p++) {
+		n_masked = 0;
+		for (j=0; j<n_tests; j++) {
+			if (!unmasked[p * n_tests + j])
+				masked[n_masked++] = tests[j];
+		}
+		item = PyUnicode_FromKindAndData(PyUnicode_4BYTE_KIND, masked,
+				(Py_ssize_t)n_masked);
+		if (item == NULL) {
+			Py_CLEAR(result);
+			goto masked_err;
+		}
+		PyList_SET_ITEM(result, p, item);
+	}
+
+masked_err:
+	Py_DECREF(seq);
+	PyMem_Free(quote);
+	PyMem_Free(escape);
+	PyMem_Free(tests);
+	PyMem_Free(masked);
+	PyMem_Free(in_quotes);
+	PyMem_Free(escape_next);
+	PyMem_Free(skip_next);
+	PyMem_Free(unmasked);
+	return result;
+}
+
 /*
  * MODULE
  */
@@ -276,12 +464,18 @@ PyDoc_STRVAR(cabstraction_module_doc,
 		"Helpers for abstraction computation in C\n");
 PyDoc_STRVAR(cabstraction_base_abstraction_doc, "");
 PyDoc_STRVAR(cabstraction_c_merge_with_quotechar_doc, "");
+PyDoc_STRVAR(cabstraction_c_masked_by_quotechar_doc,
+		"c_masked_by_quotechar(data, pairs, test_chars)\n\n"
+		"Return, for every (quotechar, escapechar) pair, the characters of\n"
+		"test_chars that never occur outside quoted segments of the data.");
 
 static struct PyMethodDef cabstraction_methods[] = {
 	{ "base_abstraction", (PyCFunction)base_abstraction, METH_VARARGS,
 		cabstraction_base_abstraction_doc },
 	{ "c_merge_with_quotechar", (PyCFunction)c_merge_with_quotechar, METH_VARARGS,
 		cabstraction_c_merge_with_quotechar_doc },
+	{ "c_masked_by_quotechar", (PyCFunction)c_masked_by_quotechar, METH_VARARGS,
+		cabstraction_c_masked_by_quotechar_doc },
 	{ NULL, NULL, 0, NULL }
 };
 
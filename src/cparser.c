@@ -81,6 +81,19 @@ typedef struct {
 	int return_quoted;
 
 	ParserState state;
+
+	/* type counting mode, see Parser_count_types */
+	int count_types;
+	PyObject *classifier;
+	Py_ssize_t n_known;
+	Py_ssize_t n_total;
+	Py_ssize_t row_known;
+	Py_ssize_t row_total;
+	int early_stop;
+	int stopped;
+	Py_ssize_t num_cells;
+	double pattern_score;
+	double incumbent;
 } ParserObj;
 
 static PyTypeObject Parser_Type;
@@ -187,10 +200,134 @@ static int _quotecond(PyObject *field, Py_ssize_t field_len, Py_UCS4 q)
 	return (_strstartswith(field, q) && _strendswith(field, q));
 }
 
+#define ASCII_DIGIT(c) ((c) >= '0' && (c) <= '9')
+#define ASCII_ALPHA(c) (((c) >= 'a' && (c) <= 'z') || ((c) >= 'A' && (c) <= 'Z'))
+
+/*
+ * Recognize cells of a common type without calling into Python. Returns 1 if
+ * the cell has a known type and 0 if this can't be decided here. The cells
+ * that are accepted are a subset of those accepted by the TypeDetector:
+ * empty cells, alphanumeric cells with ASCII characters, "n/a", and simple
+ * numbers and percentages.
+ */
+static int _classify_native(const Py_UCS4 *s, Py_ssize_t n)
+{
+	Py_ssize_t i = 0, j = n, k;
+
+	while (i < j && Py_UNICODE_ISSPACE(s[i]))
+		i++;
+	while (j > i && Py_UNICODE_ISSPACE(s[j - 1]))
+		j--;
+
+	// empty
+	if (i == j)
+		return 1;
+
+	// alphanumeric, this includes "na" and "nan"
+	for (k = i; k < j; k++) {
+		if (!(ASCII_ALPHA(s[k]) || ASCII_DIGIT(s[k]) || s[k] == ' '))
+			break;
+	}
+	if (k == j)
+		return 1;
+
+	// n/a
+	if (j - i == 3 && (s[i] == 'n' || s[i] == 'N') && s[i + 1] == '/' &&
+			(s[i + 2] == 'a' || s[i + 2] == 'A'))
+		return 1;
+
+	// number or percentage: [+-]?(0|[1-9][0-9]*)(\.[0-9]*)?%?
+	k = i;
+	if (s[k] == '+' || s[k] == '-')
+		k++;
+	if (k < j && s[k] == '0') {
+		k++;
+	} else if (k < j && s[k] >= '1' && s[k] <= '9') {
+		while (k < j && ASCII_DIGIT(s[k]))
+			k++;
+	} else {
+		return 0;
+	}
+	if (k < j && s[k] == '.') {
+		k++;
+		while (k < j && ASCII_DIGIT(s[k]))
+			k++;
+	}
+	if (k < j && s[k] == '%')
+		k++;
+	return k == j;
+}
+
+static int parse_count_field(ParserObj *self, int trailing)
+{
+	Py_ssize_t start = 0, end = self->field_len, total, misses;
+	Py_UCS4 q = self->quotechar;
+	PyObject *field, *res;
+	int is_quoted = 0, known;
+
+	self->field_len = 0;
+	if (self->stopped)
+		return 0;
+
+	// strip quotes if quoted string
+	if (q != '\0' && end > 1 && self->field[0] == q &&
+			self->field[end - 1] == q) {
+		start = 1;
+		end -= 1;
+		is_quoted = 1;
+	}
+
+	// strip partial quotes if trailing at end of file
+	if (trailing && end > start && self->field[start] == q) {
+		start++;
+		is_quoted = 1;
+	}
+
+	self->row_total++;
+	known = _classify_native(self->field + start, end - start);
+	if (!known) {
+		field = PyUnicode_FromKindAndData(PyUnicode_4BYTE_KIND,
+				(void *) (self->field + start), end - start);
+		if (field == NULL)
+			return -1;
+		res = PyObject_CallFunctionObjArgs(self->classifier, field,
+				is_quoted ? Py_True : Py_False, NULL);
+		Py_DECREF(field);
+		if (res == NULL)
+			return -1;
+		known = PyObject_IsTrue(res);
+		Py_DECREF(res);
+		if (known < 0)
+			return -1;
+	}
+
+	if (known) {
+		self->row_known++;
+		return 0;
+	}
+	if (!self->early_stop)
+		return 0;
+	total = self->n_total + self->row_total;
+	if (total > self->num_cells) {
+		// the bound on the number of cells was wrong
+		self->early_stop = 0;
+		return 0;
+	}
+	// upper bound on the type score if all remaining cells are known
+	misses = total - self->n_known - self->row_known;
+	if (self->pattern_score * ((double) (self->num_cells - misses) /
+				(double) self->num_cells) < self->incumbent)
+		self->stopped = 1;
+	return 0;
+}
+
 static int parse_save_field(ParserObj *self, int trailing)
 {
 	int is_quoted = 0;
 
+	if (self->count_types)
+		return parse_count_field(self, trailing);
+
 	PyObject *field = PyUnicode_FromKindAndData(PyUnicode_4BYTE_KIND,
 			(void *) self->field, self->field_len);
 	if (field == NULL) {
@@ -538,6 +675,7 @@ static void Parser_dealloc(ParserObj *self)
 	PyObject_GC_UnTrack(self);
 	Py_XDECREF(self->input_iter);
 	Py_XDECREF(self->fields);
+	Py_XDECREF(self->classifier);
 	if (self->field != NULL)
 		PyMem_Free(self->field);
 	PyObject_GC_Del(self);
@@ -547,6 +685,7 @@ static int Parser_traverse(ParserObj *self, visitproc visit, void *arg)
 {
 	Py_VISIT(self->input_iter);
 	Py_VISIT(self->fields);
+	Py_VISIT(self->classifier);
 	return 0;
 }
 
@@ -554,9 +693,117 @@ static int Parser_clear(ParserObj *self)
 {
 	Py_CLEAR(self->input_iter);
 	Py_CLEAR(self->fields);
+	Py_CLEAR(self->classifier);
 	return 0;
 }
 
+static PyObject *Parser_count_types(ParserObj *self, PyObject *args,
+		PyObject *keyword_args)
+{
+	PyObject *classifier = NULL, *budget = Py_None, *row, *res;
+	Py_ssize_t num_cells = -1, budget_interval = 1000, charged = 0;
+	double pattern_score = 0.0, incumbent = 0.0;
+	int exhausted = 0;
+
+	static char *kwlist[] = {
+		"classifier",
+		"num_cells",
+		"pattern_score",
+		"incumbent",
+		"budget",
+		"budget_interval",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(args, keyword_args, "O|$nddOn",
+				kwlist, &classifier, &num_cells,
+				&pattern_score, &incumbent, &budget,
+				&budget_interval))
+		return NULL;
+	if (!PyCallable_Check(classifier)) {
+		PyErr_SetString(PyExc_TypeError, "classifier must be callable");
+		return NULL;
+	}
+	if (budget != Py_None && !PyCallable_Check(budget)) {
+		PyErr_SetString(PyExc_TypeError, "budget must be callable");
+		return NULL;
+	}
+
+	Py_INCREF(classifier);
+	Py_XSETREF(self->classifier, classifier);
+	self->count_types = 1;
+	self->n_known = 0;
+	self->n_total = 0;
+	self->stopped = 0;
+	self->early_stop = num_cells > 0;
+	self->num_cells = num_cells;
+	self->pattern_score = pattern_score;
+	self->incumbent = incumbent;
+
+	// The counts of a row are only added when the parser returns the row,
+	// because an incomplete row at the end of the data is dropped.
+	for (;;) {
+		self->row_known = 0;
+		self->row_total = 0;
+		row = Parser_iternext(self);
+		if (row == NULL)
+			break;
+		Py_DECREF(row);
+		self->n_known += self->row_known;
+		self->n_total += self->row_total;
+		if (self->stopped)
+			break;
+		if (budget == Py_None ||
+				self->n_total - charged < budget_interval)
+			continue;
+		// The budget is checked between rows, so the counts are of
+		// complete rows when counting stops.
+		res = PyObject_CallFunction(budget, "n",
+				self->n_total - charged);
+		charged = self->n_total;
+		if (res == NULL)
+			break;
+		exhausted = PyObject_IsTrue(res);
+		Py_DECREF(res);
+		if (exhausted)
+			break;
+	}
+	self->stopped = self->stopped && row != NULL;
+
+	// charge the budget for the remaining cells
+	if (!PyErr_Occurred() && budget != Py_None &&
+			self->n_total > charged) {
+		res = PyObject_CallFunction(budget, "n",
+				self->n_total - charged);
+		Py_XDECREF(res);
+	}
+
+	self->count_types = 0;
+	Py_CLEAR(self->classifier);
+	if (PyErr_Occurred() || exhausted < 0)
+		return NULL;
+	if (self->stopped)
+		Py_RETURN_NONE;
+	return Py_BuildValue("(nn)", self->n_known, self->n_total);
+}
+
+PyDoc_STRVAR(Parser_count_types_doc,
+		"count_types(classifier, *, num_cells=-1, pattern_score=0.0, \n"
+		"            incumbent=0.0, budget=None, budget_interval=1000)\n"
+		"\n"
+		"Parse the remaining input and count the cells with a known type.\n"
+		"Common types are recognized natively, for other cells\n"
+		"classifier(cell, is_quoted) is called. Returns a tuple\n"
+		"(known, total), or None if counting was stopped early because the\n"
+		"consistency score can't exceed the incumbent score.\n"
+		"\n"
+		"If budget is given, budget(cells) is called with the number of\n"
+		"cells counted since the previous call, after every row that brings\n"
+		"this number to at least budget_interval, and once for the\n"
+		"remaining cells at the end. If it returns True, counting stops and\n"
+		"the counts of the rows parsed so far are returned.\n"
+	    );
+
 PyDoc_STRVAR(Parser_Type_doc,
 		"CSV parser\n"
 		"\n"
@@ -564,6 +811,8 @@ PyDoc_STRVAR(Parser_Type_doc,
 	    );
 
 static struct PyMethodDef Parser_methods[] = {
+	{ "count_types", (PyCFunction)Parser_count_types,
+		METH_VARARGS | METH_KEYWORDS, Parser_count_types_doc},
 	{ NULL, NULL }
 };
 
@@ -631,6 +880,9 @@ static PyObject *cparser_parser(PyObject *module, PyObject *args, PyObject *keyw
 	self->field_size = 0;
 	self->doublequote = 0;
 	self->return_quoted = 0;
+	self->count_types = 0;
+	self->classifier = NULL;
+	self->stopped = 0;
 
 	if (parse_reset(self) < 0) {
 		Py_DECREF(self);
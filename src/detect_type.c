@@ -0,0 +1,620 @@
+/**
+ * @file detect_type.c
+ * @brief Recognizers for numbers, dates, times, and JSON for type detection
+ *
+ * Every recognizer accepts exactly the strings that are a full match of the
+ * corresponding regular expression in clevercsv/_regexes.py. In those
+ * expressions \d matches any Unicode decimal digit, and the regex package
+ * and Python may use different versions of the Unicode database. The
+ * recognizers therefore only handle cells of ASCII characters and the CJK
+ * characters of the date formats, and call a fallback for other cells.
+ *
+ * Copyright (c) The Alan Turing Institute.
+ * See the LICENSE file for licensing information.
+ *
+*/
+
+#define MODULE_VERSION "1.0"
+
+#include <stdbool.h>
+
+#include "Python.h"
+
+typedef struct {
+	int kind;
+	const void *data;
+	Py_ssize_t len;
+} Cell;
+
+static inline Py_UCS4 _at(const Cell *c, Py_ssize_t i)
+{
+	return PyUnicode_READ(c->kind, c->data, i);
+}
+
+/* \d, for cells without other non-ASCII characters than the CJK ones */
+static inline bool _digit(const Cell *c, Py_ssize_t i)
+{
+	Py_UCS4 ch;
+	if (i >= c->len)
+		return false;
+	ch = _at(c, i);
+	return ch >= '0' && ch <= '9';
+}
+
+/* [lo-hi] */
+static inline bool _range(const Cell *c, Py_ssize_t i, char lo, char hi)
+{
+	Py_UCS4 ch;
+	if (i >= c->len)
+		return false;
+	ch = _at(c, i);
+	return ch >= (Py_UCS4)lo && ch <= (Py_UCS4)hi;
+}
+
+static inline bool _char(const Cell *c, Py_ssize_t i, Py_UCS4 ch)
+{
+	return i < c->len && _at(c, i) == ch;
+}
+
+static Py_ssize_t _skip_digits(const Cell *c, Py_ssize_t i)
+{
+	while (_digit(c, i))
+		i++;
+	return i;
+}
+
+/*
+ * NUMBERS
+ */
+
+/* [eE][+-]?\d+ up to the end of the cell */
+static bool _exponent_end(const Cell *c, Py_ssize_t i)
+{
+	if (!(_char(c, i, 'e') || _char(c, i, 'E')))
+		return false;
+	i++;
+	if (_char(c, i, '+') || _char(c, i, '-'))
+		i++;
+	if (!_digit(c, i))
+		return false;
+	return _skip_digits(c, i) == c->len;
+}
+
+/* PATTERN_NUMBER_1 */
+static bool number_1(const Cell *c)
+{
+	Py_ssize_t i = 0, j;
+	Py_UCS4 ch;
+	bool after_digit;
+
+	if (c->len == 0)
+		return false;
+	/* (?=[+-\.\d]), where +-\. is the range of "+,-." */
+	ch = _at(c, 0);
+	if (!(ch == '+' || ch == ',' || ch == '-' || ch == '.' || _digit(c, 0)))
+		return false;
+	if (ch == '+' || ch == '-')
+		i++;
+
+	/* (?:0|[1-9]\d*)? must take all leading digits, since nothing after
+	 * it can start with a digit */
+	j = _skip_digits(c, i);
+	if (j > i) {
+		if (_char(c, i, '0')) {
+			if (j != i + 1)
+				return false;
+		} else if (!_range(c, i, '1', '9'))
+			return false;
+	}
+	i = j;
+	after_digit = i > 0 && _digit(c, i - 1);
+
+	if (i == c->len)
+		return true;
+
+	/* (?<=\d)[eE][+-]?\d+, in the branches without dot or comma */
+	if (after_digit && _exponent_end(c, i))
+		return true;
+
+	/* ((?<=\d)\.|\.(?=\d))\d*(\d*[eE][+-]?\d+)? */
+	if (_char(c, i, '.') && (after_digit || _digit(c, i + 1))) {
+		j = _skip_digits(c, i + 1);
+		return j == c->len || _exponent_end(c, j);
+	}
+
+	/* ,\d+(\d+[eE][+-]?\d+)? */
+	if (_char(c, i, ',') && _digit(c, i + 1)) {
+		j = _skip_digits(c, i + 1);
+		return j == c->len || (j - i - 1 >= 2 && _exponent_end(c, j));
+	}
+	return false;
+}
+
+/* PATTERN_NUMBER_2 and PATTERN_NUMBER_3:
+ * [+-]?(?:[1-9]|[1-9]\d{0,2})(?:<group>\d{3})+<decimal>\d* */
+static bool _grouped_number(const Cell *c, Py_UCS4 group, Py_UCS4 decimal)
+{
+	Py_ssize_t i = 0, j;
+	int groups = 0;
+
+	if (_char(c, 0, '+') || _char(c, 0, '-'))
+		i++;
+	if (!_range(c, i, '1', '9'))
+		return false;
+	j = _skip_digits(c, i);
+	if (j - i > 3)
+		return false;
+	i = j;
+	while (_char(c, i, group)) {
+		if (!(_digit(c, i + 1) && _digit(c, i + 2) && _digit(c, i + 3)))
+			return false;
+		i += 4;
+		groups++;
+	}
+	if (groups == 0 || !_char(c, i, decimal))
+		return false;
+	return _skip_digits(c, i + 1) == c->len;
+}
+
+static bool number_2(const Cell *c)
+{
+	return _grouped_number(c, ',', '.');
+}
+
+static bool number_3(const Cell *c)
+{
+	return _grouped_number(c, '.', ',');
+}
+
+static bool number(const Cell *c)
+{
+	return number_1(c) || number_2(c) || number_3(c);
+}
+
+/*
+ * TIMES
+ */
+
+/* (0[0-9]|1[0-9]|2[0-3]) */
+static bool _hh(const Cell *c, Py_ssize_t i)
+{
+	if (_range(c, i, '0', '1'))
+		return _range(c, i + 1, '0', '9');
+	return _char(c, i, '2') && _range(c, i + 1, '0', '3');
+}
+
+/* ([0-5][0-9]) */
+static bool _mm(const Cell *c, Py_ssize_t i)
+{
+	return _range(c, i, '0', '5') && _range(c, i + 1, '0', '9');
+}
+
+/* PATTERN_TIME_HHMM_1 */
+static bool time_hhmm(const Cell *c)
+{
+	return c->len == 5 && _hh(c, 0) && _char(c, 2, ':') && _mm(c, 3);
+}
+
+/* PATTERN_TIME_HHMM_2 and PATTERN_TIME_HH */
+static bool time_HHMM(const Cell *c)
+{
+	return c->len == 4 && _hh(c, 0) && _mm(c, 2);
+}
+
+/* PATTERN_TIME_HHMMSS */
+static bool time_hhmmss(const Cell *c)
+{
+	return c->len == 8 && _hh(c, 0) && _char(c, 2, ':') && _mm(c, 3) &&
+		_char(c, 5, ':') && _mm(c, 6);
+}
+
+/* PATTERN_TIME_HHMMSSZZ */
+static bool time_hhmmsszz(const Cell *c)
+{
+	return c->len == 14 && _hh(c, 0) && _char(c, 2, ':') && _mm(c, 3) &&
+		_char(c, 5, ':') && _mm(c, 6) &&
+		(_char(c, 8, '+') || _char(c, 8, '-')) &&
+		_range(c, 9, '0', '1') && _range(c, 10, '0', '9') &&
+		_char(c, 11, ':') && _mm(c, 12);
+}
+
+/* PATTERN_TIME_HMM: ([0-9]|1[0-9]|2[0-3]):([0-5][0-9]) */
+static bool time_hmm(const Cell *c)
+{
+	if (c->len == 4)
+		return _range(c, 0, '0', '9') && _char(c, 1, ':') && _mm(c, 2);
+	return c->len == 5 && (_char(c, 0, '1') || _char(c, 0, '2')) &&
+		_hh(c, 0) && _char(c, 2, ':') && _mm(c, 3);
+}
+
+static bool time_any(const Cell *c)
+{
+	return time_hmm(c) || time_hhmm(c) || time_hhmmss(c) ||
+		time_hhmmsszz(c);
+}
+
+/*
+ * DATES
+ *
+ * A date is a sequence of components. Every component returns a bit mask of
+ * the lengths with which it can match at a position, so that all ways of
+ * matching the sequence can be tried, as the regular expression does.
+ */
+
+typedef enum {
+	MM,	/* (0[1-9]|1[0-2]) */
+	DD,	/* (0[1-9]|[12]\d|3[01]) */
+	YEAR,	/* ([12]\d{3}|\d{2}) */
+	M_OPT,	/* (0?[1-9]|1[0-2]) */
+	D_OPT,	/* (0?[1-9]|[12]\d|3[01]) */
+	M,	/* ([1-9]|1[0-2]) */
+	D,	/* ([1-9]|[12]\d|3[01]) */
+	SEP,	/* (?P<sep>[-\/. ]) */
+	SEP_REF,	/* (?P=sep) */
+	LIT_YEAR_ZH,
+	LIT_MONTH_ZH,
+	LIT_DAY_ZH,
+	LIT_YEAR_KO,
+	LIT_MONTH_KO,
+	LIT_DAY_KO,
+	END
+} DatePart;
+
+#define LEN(n) (1u << (n))
+
+static unsigned _two_digit_day(const Cell *c, Py_ssize_t i)
+{
+	/* [12]\d|3[01] */
+	if (_range(c, i, '1', '2') && _digit(c, i + 1))
+		return LEN(2);
+	if (_char(c, i, '3') && _range(c, i + 1, '0', '1'))
+		return LEN(2);
+	return 0;
+}
+
+static unsigned _date_part(const Cell *c, DatePart part, Py_ssize_t i,
+		Py_UCS4 sep)
+{
+	unsigned mask = 0;
+	Py_UCS4 ch;
+
+	switch (part) {
+		case MM:
+		case M_OPT:
+		case M:
+			if (_char(c, i, '0') && _range(c, i + 1, '1', '9'))
+				mask |= part == M ? 0 : LEN(2);
+			if (_char(c, i, '1') && _range(c, i + 1, '0', '2'))
+				mask |= LEN(2);
+			if (part != MM && _range(c, i, '1', '9'))
+				mask |= LEN(1);
+			return mask;
+		case DD:
+		case D_OPT:
+		case D:
+			if (_char(c, i, '0') && _range(c, i + 1, '1', '9'))
+				mask |= part == D ? 0 : LEN(2);
+			mask |= _two_digit_day(c, i);
+			if (part != DD && _range(c, i, '1', '9'))
+				mask |= LEN(1);
+			return mask;
+		case YEAR:
+			if (_range(c, i, '1', '2') && _digit(c, i + 1) &&
+					_digit(c, i + 2) && _digit(c, i + 3))
+				mask |= LEN(4);
+			if (_digit(c, i) && _digit(c, i + 1))
+				mask |= LEN(2);
+			return mask;
+		case SEP:
+			if (i >= c->len)
+				return 0;
+			ch = _at(c, i);
+			if (ch == '-' || ch == '/' || ch == '.' || ch == ' ')
+				return LEN(1);
+			return 0;
+		case SEP_REF:
+			return _char(c, i, sep) ? LEN(1) : 0;
+		case LIT_YEAR_ZH:
+			return _char(c, i, 0x5E74) ? LEN(1) : 0;
+		case LIT_MONTH_ZH:
+			return _char(c, i, 0x6708) ? LEN(1) : 0;
+		case LIT_DAY_ZH:
+			return _char(c, i, 0x65E5) ? LEN(1) : 0;
+		case LIT_YEAR_KO:
+			return _char(c, i, 0xB144) ? LEN(1) : 0;
+		case LIT_MONTH_KO:
+			return _char(c, i, 0xC6D4) ? LEN(1) : 0;
+		case LIT_DAY_KO:
+			return _char(c, i, 0xC77C) ? LEN(1) : 0;
+		case END:
+			break;
+	}
+	return 0;
+}
+
+static bool _match_date_parts(const Cell *c, const DatePart *parts,
+		Py_ssize_t i, Py_UCS4 sep)
+{
+	unsigned mask;
+	Py_ssize_t n;
+
+	if (*parts == END)
+		return i == c->len;
+	mask = _date_part(c, *parts, i, sep);
+	if (*parts == SEP && mask)
+		sep = _at(c, i);
+	for (n = 1; mask; n++) {
+		if ((mask & LEN(n)) &&
+				_match_date_parts(c, parts + 1, i + n, sep))
+			return true;
+		mask &= ~LEN(n);
+	}
+	return false;
+}
+
+static const DatePart DATE_FORMATS[][7] = {
+	{ MM, DD, YEAR, END },
+	{ MM, SEP, D_OPT, SEP_REF, YEAR, END },
+	{ DD, MM, YEAR, END },
+	{ DD, SEP, M_OPT, SEP_REF, YEAR, END },
+	{ YEAR, SEP, M_OPT, SEP_REF, D_OPT, END },
+	{ YEAR, LIT_YEAR_ZH, M_OPT, LIT_MONTH_ZH, D_OPT, LIT_DAY_ZH, END },
+	{ YEAR, LIT_YEAR_KO, M_OPT, LIT_MONTH_KO, D_OPT, LIT_DAY_KO, END },
+	{ YEAR, MM, DD, END },
+	{ M, SEP, D_OPT, SEP_REF, YEAR, END },
+	{ D, SEP, M_OPT, SEP_REF, YEAR, END },
+};
+
+/* PATTERN_DATE */
+static bool date(const Cell *c)
+{
+	size_t k;
+
+	/* every date has at least 4 and at most 12 characters */
+	if (c->len < 4 || c->len > 12)
+		return false;
+	for (k = 0; k < sizeof(DATE_FORMATS) / sizeof(DATE_FORMATS[0]); k++) {
+		if (_match_date_parts(c, DATE_FORMATS[k], 0, 0))
+			return true;
+	}
+	return false;
+}
+
+/*
+ * JSON
+ *
+ * A single pass over the cell that checks that the brackets outside of
+ * strings are balanced and that the first bracket is closed by the last
+ * character. This is a necessary condition for a JSON object or array of at
+ * most max_depth levels, and doesn't validate anything else.
+ */
+
+static int json_structure(const Cell *c, Py_ssize_t max_depth)
+{
+	Py_ssize_t i, depth = 0;
+	Py_UCS4 ch;
+	bool in_string = false;
+	char *stack;
+	int result = 0;
+
+	if (max_depth < 1)
+		return 0;
+	stack = PyMem_Malloc(max_depth);
+	if (stack == NULL) {
+		PyErr_NoMemory();
+		return -1;
+	}
+
+	for (i = 0; i < c->len; i++) {
+		ch = _at(c, i);
+		if (in_string) {
+			if (ch == '\\')
+				i++;
+			else if (ch == '"')
+				in_string = false;
+			continue;
+		}
+		switch (ch) {
+			case '"':
+				in_string = true;
+				break;
+			case '{':
+			case '[':
+				if (depth == max_depth)
+					goto done;
+				stack[depth++] = ch == '{' ? '}' : ']';
+				break;
+			case '}':
+			case ']':
+				if (depth == 0 || stack[--depth] != (char)ch)
+					goto done;
+				if (depth == 0) {
+					result = i == c->len - 1;
+					goto done;
+				}
+				break;
+		}
+	}
+
+done:
+	PyMem_Free(stack);
+	return result;
+}
+
+/*
+ * MODULE
+ */
+
+typedef bool (*recognizer)(const Cell *);
+
+static bool _native(const Cell *c)
+{
+	Py_ssize_t i;
+	Py_UCS4 ch;
+
+	for (i = 0; i < c->len; i++) {
+		ch = _at(c, i);
+		if (ch < 128)
+			continue;
+		switch (ch) {
+			case 0x5E74: case 0x6708: case 0x65E5:
+			case 0xB144: case 0xC6D4: case 0xC77C:
+				continue;
+		}
+		return false;
+	}
+	return true;
+}
+
+static PyObject *_recognize(PyObject *const *args, Py_ssize_t nargs,
+		recognizer func)
+{
+	Cell c;
+	PyObject *cell, *result;
+	int match;
+
+	if (nargs != 2) {
+		PyErr_Format(PyExc_TypeError,
+				"expected 2 arguments (fallback, cell), got %zd",
+				nargs);
+		return NULL;
+	}
+	cell = args[1];
+	if (!PyUnicode_Check(cell)) {
+		PyErr_Format(PyExc_TypeError, "cell must be str, not %.200s",
+				Py_TYPE(cell)->tp_name);
+		return NULL;
+	}
+	c.kind = PyUnicode_KIND(cell);
+	c.data = PyUnicode_DATA(cell);
+	c.len = PyUnicode_GET_LENGTH(cell);
+	if (PyUnicode_IS_ASCII(cell) || _native(&c))
+		return PyBool_FromLong(func(&c));
+
+	result = PyObject_CallOneArg(args[0], cell);
+	if (result == NULL)
+		return NULL;
+	match = PyObject_IsTrue(result);
+	Py_DECREF(result);
+	if (match < 0)
+		return NULL;
+	return PyBool_FromLong(match);
+}
+
+#define RECOGNIZER(name) \
+	static PyObject *py_##name(PyObject *self, PyObject *const *args, \
+			Py_ssize_t nargs) \
+	{ \
+		return _recognize(args, nargs, name); \
+	}
+
+RECOGNIZER(number)
+RECOGNIZER(number_1)
+RECOGNIZER(number_2)
+RECOGNIZER(number_3)
+RECOGNIZER(time_any)
+RECOGNIZER(time_hmm)
+RECOGNIZER(time_hhmm)
+RECOGNIZER(time_hhmmss)
+RECOGNIZER(time_hhmmsszz)
+RECOGNIZER(time_HHMM)
+RECOGNIZER(date)
+
+static PyObject *py_json_structure(PyObject *self, PyObject *const *args,
+		Py_ssize_t nargs)
+{
+	Cell c;
+	PyObject *cell;
+	Py_ssize_t max_depth;
+	int result;
+
+	if (nargs != 2) {
+		PyErr_Format(PyExc_TypeError,
+				"expected 2 arguments (cell, max_depth), got %zd",
+				nargs);
+		return NULL;
+	}
+	cell = args[0];
+	if (!PyUnicode_Check(cell)) {
+		PyErr_Format(PyExc_TypeError, "cell must be str, not %.200s",
+				Py_TYPE(cell)->tp_name);
+		return NULL;
+	}
+	max_depth = PyNumber_AsSsize_t(args[1], PyExc_OverflowError);
+	if (max_depth == -1 && PyErr_Occurred())
+		return NULL;
+
+	c.kind = PyUnicode_KIND(cell);
+	c.data = PyUnicode_DATA(cell);
+	c.len = PyUnicode_GET_LENGTH(cell);
+	result = json_structure(&c, max_depth);
+	if (result < 0)
+		return NULL;
+	return PyBool_FromLong(result);
+}
+
+PyDoc_STRVAR(cdetect_type_module_doc,
+		"Recognizers for numbers, dates, and times in C\n\n"
+		"Every recognizer is called as recognizer(fallback, cell) and\n"
+		"returns whether the cell is a full match of its pattern. The\n"
+		"fallback is called with the cell for cells that the recognizer\n"
+		"doesn't handle, and should return a true value for a match.\n"
+		"The module also has a structure check for JSON cells.\n");
+PyDoc_STRVAR(cdetect_type_number_doc,
+		"Match any of PATTERN_NUMBER_1, 2, or 3");
+PyDoc_STRVAR(cdetect_type_time_doc,
+		"Match any of the time patterns of TypeDetector.is_time");
+PyDoc_STRVAR(cdetect_type_json_structure_doc,
+		"json_structure(cell, max_depth)\n\n"
+		"Check that the brackets of a cell are balanced outside of\n"
+		"strings, are nested at most max_depth levels deep, and that the\n"
+		"first bracket is closed by the last character. The scan stops at\n"
+		"the first violation.");
+PyDoc_STRVAR(cdetect_type_pattern_doc,
+		"Match the pattern with the same name");
+
+#define METHOD(name, func, doc) \
+	{ name, (PyCFunction)(void (*)(void))func, METH_FASTCALL, doc }
+
+static struct PyMethodDef cdetect_type_methods[] = {
+	METHOD("number", py_number, cdetect_type_number_doc),
+	METHOD("number_1", py_number_1, cdetect_type_pattern_doc),
+	METHOD("number_2", py_number_2, cdetect_type_pattern_doc),
+	METHOD("number_3", py_number_3, cdetect_type_pattern_doc),
+	METHOD("time", py_time_any, cdetect_type_time_doc),
+	METHOD("time_hmm", py_time_hmm, cdetect_type_pattern_doc),
+	METHOD("time_hhmm", py_time_hhmm, cdetect_type_pattern_doc),
+	METHOD("time_hhmmss", py_time_hhmmss, cdetect_type_pattern_doc),
+	METHOD("time_hhmmsszz", py_time_hhmmsszz, cdetect_type_pattern_doc),
+	METHOD("time_HHMM", py_time_HHMM, cdetect_type_pattern_doc),
+	METHOD("time_HH", py_time_HHMM, cdetect_type_pattern_doc),
+	METHOD("date", py_date, cdetect_type_pattern_doc),
+	METHOD("json_structure", py_json_structure,
+			cdetect_type_json_structure_doc),
+	{ NULL, NULL, 0, NULL }
+};
+
+static struct PyModuleDef moduledef = {
+	PyModuleDef_HEAD_INIT,
+	"clevercsv.cdetect_type",
+	cdetect_type_module_doc,
+	-1,
+	cdetect_type_methods,
+	NULL,
+	NULL,
+	NULL,
+	NULL
+};
+
+PyMODINIT_FUNC PyInit_cdetect_type(void)
+{
+	PyObject *module;
+	module = PyModule_Create(&moduledef);
+	if (module == NULL)
+		return NULL;
+
+	if (PyModule_AddStringConstant(module, "__version__",
+				MODULE_VERSION) == -1)
+		return NULL;
+	return module;
+}
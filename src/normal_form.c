@@ -0,0 +1,557 @@
+/**
+ * @file normal_form.c
+ * @brief Single-pass matcher for the normal forms of CSV files
+ *
+ * The matcher evaluates the normal forms of clevercsv/normal_form.py for all
+ * candidate delimiters and quote characters in one pass over the rows of a
+ * file. It follows the Python implementation exactly, including the way in
+ * which split_row splits rows that contain the quote character. Candidates
+ * are dropped as soon as a row doesn't match their form, and the pass stops
+ * when no candidates are left. The module also reports the characters that
+ * precede the delimiters and quote characters, which is used to check for
+ * potential escape characters before trying any form.
+ *
+ * Copyright (c) The Alan Turing Institute.
+ * See the LICENSE file for licensing information.
+ *
+*/
+
+#define MODULE_VERSION "1.0"
+
+#include <stdbool.h>
+
+#include "Python.h"
+
+/* Never equal to a character of a string, used for an empty character */
+#define NO_CHAR 0x110000
+
+typedef struct {
+	int kind;
+	const void *data;
+	Py_ssize_t len;
+} Row;
+
+typedef struct {
+	Py_ssize_t start;
+	Py_ssize_t end;
+} Span;
+
+typedef struct {
+	Span *spans;
+	Py_ssize_t n;
+	Py_ssize_t size;
+} Cells;
+
+static inline Py_UCS4 _at(const Row *r, Py_ssize_t i)
+{
+	return PyUnicode_READ(r->kind, r->data, i);
+}
+
+static int _push(Cells *c, Py_ssize_t start, Py_ssize_t end)
+{
+	if (c->n == c->size) {
+		Py_ssize_t size = c->size ? 2 * c->size : 16;
+		Span *spans = PyMem_Realloc(c->spans, size * sizeof(Span));
+		if (spans == NULL) {
+			PyErr_NoMemory();
+			return -1;
+		}
+		c->spans = spans;
+		c->size = size;
+	}
+	c->spans[c->n].start = start;
+	c->spans[c->n].end = end;
+	c->n++;
+	return 0;
+}
+
+static bool _contains(const Row *r, Py_ssize_t start, Py_ssize_t end,
+		Py_UCS4 ch)
+{
+	Py_ssize_t i;
+	for (i=start; i<end; i++) {
+		if (_at(r, i) == ch)
+			return true;
+	}
+	return false;
+}
+
+/* split_row() of normal_form.py on the part [start, end) of the row */
+static int _split_row(const Row *r, Py_ssize_t start, Py_ssize_t end,
+		Py_UCS4 delim, Py_UCS4 quote, Cells *c)
+{
+	Py_ssize_t i, cell_start = start;
+	bool in_quotes = false;
+	Py_UCS4 ch;
+
+	c->n = 0;
+	if (quote == NO_CHAR || !_contains(r, start, end, quote)) {
+		for (i=start; i<end; i++) {
+			if (_at(r, i) == delim) {
+				if (_push(c, cell_start, i) < 0)
+					return -1;
+				cell_start = i + 1;
+			}
+		}
+		return _push(c, cell_start, end);
+	}
+
+	for (i=start; i<end; i++) {
+		ch = _at(r, i);
+		if (ch == delim && !in_quotes) {
+			if (_push(c, cell_start, i) < 0)
+				return -1;
+			cell_start = i + 1;
+		} else if (ch == quote) {
+			in_quotes = !in_quotes;
+		}
+	}
+	// the last cell is only kept if it isn't empty
+	if (cell_start < end)
+		return _push(c, cell_start, end);
+	return 0;
+}
+
+/*
+ * CELL PREDICATES
+ */
+
+static inline bool _is_elementary_char(Py_UCS4 ch)
+{
+	return ('a' <= ch && ch <= 'z') || ('A' <= ch && ch <= 'Z') ||
+		('0' <= ch && ch <= '9') || ch == '.' || ch == '_' ||
+		ch == '&' || ch == '-' || ch == '@' || ch == '+' || ch == '%' ||
+		ch == '(' || ch == ')' || ch == ' ' || ch == '/';
+}
+
+/* characters allowed in the cells of form 4, without and with quotes */
+static inline bool _is_form_4_char(Py_UCS4 ch, bool quoted)
+{
+	return ('a' <= ch && ch <= 'z') || ('A' <= ch && ch <= 'Z') ||
+		('0' <= ch && ch <= '9') || ch == '.' || ch == '_' ||
+		ch == '&' || ch == '-' || (quoted && ch == ' ');
+}
+
+static bool _is_quoted(const Row *r, const Span *s, Py_UCS4 quote)
+{
+	if (s->end - s->start < 2)
+		return false;
+	return _at(r, s->start) == quote && _at(r, s->end - 1) == quote;
+}
+
+static bool _is_any_quoted(const Row *r, const Span *s)
+{
+	return _is_quoted(r, s, '\'') || _is_quoted(r, s, '"');
+}
+
+static bool _is_any_empty(const Row *r, const Span *s)
+{
+	Py_ssize_t len = s->end - s->start;
+	return len == 0 || (len == 2 && _is_any_quoted(r, s));
+}
+
+static bool _is_elementary(const Row *r, const Span *s)
+{
+	Py_ssize_t i;
+	if (s->end == s->start)
+		return false;
+	for (i=s->start; i<s->end; i++) {
+		if (!_is_elementary_char(_at(r, i)))
+			return false;
+	}
+	return true;
+}
+
+/* The cells of form 1: quoted, and no quotes inside the quotes */
+static bool _form_1_cell(const Row *r, const Span *s, Py_UCS4 quote)
+{
+	return _is_quoted(r, s, quote) &&
+		!_contains(r, s->start + 1, s->end - 1, quote);
+}
+
+/* The cells of form 2: empty or elementary. Elementary cells have no
+ * quotes, so they are neither quoted nor partially quoted. */
+static bool _form_2_cell(const Row *r, const Span *s)
+{
+	return s->end == s->start || _is_elementary(r, s);
+}
+
+/* The cells of form 3: not empty, and quoted with the quote character or
+ * elementary */
+static bool _form_3_cell(const Row *r, const Span *s, Py_UCS4 quote)
+{
+	if (_is_any_empty(r, s))
+		return false;
+	if (_is_any_quoted(r, s))
+		return _is_quoted(r, s, quote);
+	return _is_elementary(r, s);
+}
+
+static bool _form_4_row(const Row *r, Py_UCS4 quote)
+{
+	Span s = { 0, r->len };
+	Py_ssize_t i;
+
+	if (quote == NO_CHAR) {
+		if (_is_any_quoted(r, &s))
+			return false;
+	} else {
+		if (!_is_quoted(r, &s, quote))
+			return false;
+		s.start++;
+		s.end--;
+	}
+	for (i=s.start; i<s.end; i++) {
+		if (!_is_form_4_char(_at(r, i), quote != NO_CHAR))
+			return false;
+	}
+	return true;
+}
+
+/*
+ * The rows of forms 1, 2, 3, and 5 must all have the delimiter and the same
+ * number of cells. The number of cells of the first row is stored in
+ * *first. Returns false if the cells don't pass this test.
+ */
+static bool _same_length(const Cells *c, Py_ssize_t *first)
+{
+	if (*first < 0)
+		*first = c->n;
+	return c->n == *first && c->n != 1;
+}
+
+PyObject *normal_forms(PyObject *self, PyObject *args)
+{
+	PyObject *rows = NULL, *delims_obj = NULL, *quotes_obj = NULL,
+		 *seq = NULL, *result = NULL, *item = NULL, *row_obj;
+	Py_ssize_t n_rows, n_delims, n_quotes, r, i, j, k, alive;
+	Py_ssize_t *first_2 = NULL, *first_13 = NULL, *first_5 = NULL;
+	Py_UCS4 *delims = NULL, *quotes = NULL, d, q;
+	bool *form_1 = NULL, *form_2 = NULL, *form_3 = NULL, *form_4 = NULL,
+	     *form_5 = NULL, *has_delim = NULL, ok_1, ok_3;
+	Cells cells = { NULL, 0, 0 };
+	Row row;
+
+	if (!PyArg_ParseTuple(args, "OUU", &rows, &delims_obj, &quotes_obj))
+		return NULL;
+	if (PyUnicode_READY(delims_obj) == -1 ||
+			PyUnicode_READY(quotes_obj) == -1)
+		return NULL;
+	seq = PySequence_Fast(rows, "rows must be a sequence");
+	if (seq == NULL)
+		return NULL;
+
+	n_rows = PySequence_Fast_GET_SIZE(seq);
+	n_delims = PyUnicode_GET_LENGTH(delims_obj);
+	n_quotes = PyUnicode_GET_LENGTH(quotes_obj);
+
+	delims = PyMem_Calloc(n_delims + 1, sizeof(Py_UCS4));
+	quotes = PyMem_Calloc(n_quotes + 1, sizeof(Py_UCS4));
+	has_delim = PyMem_Calloc(n_delims + 1, sizeof(bool));
+	form_2 = PyMem_Calloc(n_delims + 1, sizeof(bool));
+	first_2 = PyMem_Calloc(n_delims + 1, sizeof(Py_ssize_t));
+	form_1 = PyMem_Calloc(n_delims * n_quotes + 1, sizeof(bool));
+	form_3 = PyMem_Calloc(n_delims * n_quotes + 1, sizeof(bool));
+	form_5 = PyMem_Calloc(n_delims * n_quotes + 1, sizeof(bool));
+	first_13 = PyMem_Calloc(n_delims * n_quotes + 1, sizeof(Py_ssize_t));
+	first_5 = PyMem_Calloc(n_delims * n_quotes + 1, sizeof(Py_ssize_t));
+	form_4 = PyMem_Calloc(n_quotes + 1, sizeof(bool));
+	if (delims == NULL || quotes == NULL || has_delim == NULL ||
+			form_2 == NULL || first_2 == NULL || form_1 == NULL ||
+			form_3 == NULL || form_5 == NULL || first_13 == NULL ||
+			first_5 == NULL || form_4 == NULL) {
+		PyErr_NoMemory();
+		goto normal_err;
+	}
+
+	// Forms 3, 4, and 5 need more than one row, and forms 1 and 2 need at
+	// least one row.
+	for (i=0; i<n_delims; i++) {
+		delims[i] = PyUnicode_READ_CHAR(delims_obj, i);
+		form_2[i] = n_rows > 0;
+		first_2[i] = -1;
+	}
+	for (j=0; j<n_quotes; j++)
+		quotes[j] = PyUnicode_READ_CHAR(quotes_obj, j);
+	for (k=0; k<n_delims * n_quotes; k++) {
+		form_1[k] = n_rows > 0;
+		form_3[k] = form_5[k] = n_rows > 1;
+		first_13[k] = first_5[k] = -1;
+	}
+	// the last entry of form_4 is for the empty quote character
+	for (j=0; j<=n_quotes; j++)
+		form_4[j] = n_rows > 1;
+
+	for (r=0; r<n_rows; r++) {
+		row_obj = PySequence_Fast_GET_ITEM(seq, r);
+		if (!PyUnicode_Check(row_obj)) {
+			PyErr_SetString(PyExc_TypeError, "rows must be strings");
+			goto normal_err;
+		}
+		if (PyUnicode_READY(row_obj) == -1)
+			goto normal_err;
+		row.kind = PyUnicode_KIND(row_obj);
+		row.data = PyUnicode_DATA(row_obj);
+		row.len = PyUnicode_GET_LENGTH(row_obj);
+
+		alive = 0;
+		for (j=0; j<=n_quotes; j++) {
+			q = j < n_quotes ? quotes[j] : NO_CHAR;
+			if (form_4[j])
+				form_4[j] = _form_4_row(&row, q);
+			alive += form_4[j];
+		}
+
+		for (i=0; i<n_delims; i++) {
+			d = delims[i];
+			has_delim[i] = _contains(&row, 0, row.len, d);
+
+			if (form_2[i]) {
+				form_2[i] = has_delim[i];
+				if (form_2[i] && _split_row(&row, 0, row.len, d,
+							NO_CHAR, &cells) < 0)
+					goto normal_err;
+				if (form_2[i])
+					form_2[i] = _same_length(&cells, &first_2[i]);
+				for (k=0; form_2[i] && k<cells.n; k++)
+					form_2[i] = _form_2_cell(&row, &cells.spans[k]);
+			}
+			alive += form_2[i];
+
+			for (j=0; j<n_quotes; j++) {
+				q = quotes[j];
+				k = i * n_quotes + j;
+				if ((form_1[k] || form_3[k]) && !has_delim[i])
+					form_1[k] = form_3[k] = false;
+				if (form_1[k] || form_3[k]) {
+					if (_split_row(&row, 0, row.len, d, q, &cells) < 0)
+						goto normal_err;
+					if (!_same_length(&cells, &first_13[k]))
+						form_1[k] = form_3[k] = false;
+					ok_1 = form_1[k];
+					ok_3 = form_3[k];
+					for (Py_ssize_t c=0; (ok_1 || ok_3) && c<cells.n; c++) {
+						ok_1 = ok_1 && _form_1_cell(&row, &cells.spans[c], q);
+						ok_3 = ok_3 && _form_3_cell(&row, &cells.spans[c], q);
+					}
+					form_1[k] = ok_1;
+					form_3[k] = ok_3;
+				}
+
+				// form 5 is form 2 on the rows without the quotes around
+				// them, split with the quote character
+				if (form_5[k])
+					form_5[k] = has_delim[i] && row.len > 2 &&
+						_at(&row, 0) == q &&
+						_at(&row, row.len - 1) == q &&
+						_contains(&row, 1, row.len - 1, d);
+				if (form_5[k]) {
+					if (_split_row(&row, 1, row.len - 1, d, q, &cells) < 0)
+						goto normal_err;
+					form_5[k] = _same_length(&cells, &first_5[k]);
+					for (Py_ssize_t c=0; form_5[k] && c<cells.n; c++)
+						form_5[k] = _form_2_cell(&row, &cells.spans[c]);
+				}
+				alive += form_1[k] + form_3[k] + form_5[k];
+			}
+		}
+		if (!alive)
+			break;
+	}
+
+	result = PyList_New(0);
+	if (result == NULL)
+		goto normal_err;
+	for (i=0; i<n_delims; i++) {
+		if (form_2[i]) {
+			item = Py_BuildValue("(iNs)", 2,
+					PyUnicode_FromOrdinal(delims[i]), "");
+			if (item == NULL || PyList_Append(result, item) < 0)
+				goto result_err;
+			Py_DECREF(item);
+		}
+		for (j=0; j<n_quotes; j++) {
+			k = i * n_quotes + j;
+			bool forms[3] = { form_1[k], form_3[k], form_5[k] };
+			int ids[3] = { 1, 3, 5 };
+			for (int f=0; f<3; f++) {
+				if (!forms[f])
+					continue;
+				item = Py_BuildValue("(iNN)", ids[f],
+						PyUnicode_FromOrdinal(delims[i]),
+						PyUnicode_FromOrdinal(quotes[j]));
+				if (item == NULL || PyList_Append(result, item) < 0)
+					goto result_err;
+				Py_DECREF(item);
+			}
+		}
+	}
+	for (j=0; j<=n_quotes; j++) {
+		if (!form_4[j])
+			continue;
+		if (j < n_quotes)
+			item = Py_BuildValue("(isN)", 4, "",
+					PyUnicode_FromOrdinal(quotes[j]));
+		else
+			item = Py_BuildValue("(iss)", 4, "", "");
+		if (item == NULL || PyList_Append(result, item) < 0)
+			goto result_err;
+		Py_DECREF(item);
+	}
+	goto normal_err;
+
+result_err:
+	Py_XDECREF(item);
+	Py_CLEAR(result);
+
+normal_err:
+	Py_DECREF(seq);
+	PyMem_Free(cells.spans);
+	PyMem_Free(delims);
+	PyMem_Free(quotes);
+	PyMem_Free(has_delim);
+	PyMem_Free(form_1);
+	PyMem_Free(form_2);
+	PyMem_Free(form_3);
+	PyMem_Free(form_4);
+	PyMem_Free(form_5);
+	PyMem_Free(first_2);
+	PyMem_Free(first_13);
+	PyMem_Free(first_5);
+	return result;
+}
+
+/*
+ * PRECEDING CHARACTERS
+ */
+
+static PyObject *preceding_chars(PyObject *self, PyObject *args)
+{
+	PyObject *data = NULL, *chars = NULL, *result = NULL, *key = NULL;
+	PyObject **sets = NULL, *prev = NULL;
+	Py_ssize_t i, j, n_chars, len;
+	Py_UCS4 *targets = NULL;
+	Py_UCS4 u, v;
+	unsigned char *seen = NULL;
+	const void *buf;
+	int kind;
+
+	if (!PyArg_ParseTuple(args, "UU", &data, &chars))
+		return NULL;
+
+	n_chars = PyUnicode_GET_LENGTH(chars);
+	targets = PyMem_Calloc(n_chars + 1, sizeof(Py_UCS4));
+	sets = PyMem_Calloc(n_chars + 1, sizeof(PyObject *));
+	/* ASCII preceding characters are tracked in a table per target */
+	seen = PyMem_Calloc((n_chars + 1) * 128, sizeof(unsigned char));
+	if (targets == NULL || sets == NULL || seen == NULL) {
+		PyErr_NoMemory();
+		goto preceding_err;
+	}
+
+	result = PyDict_New();
+	if (result == NULL)
+		goto preceding_err;
+	for (j=0; j<n_chars; j++) {
+		targets[j] = PyUnicode_READ_CHAR(chars, j);
+		key = PyUnicode_FromOrdinal(targets[j]);
+		if (key == NULL)
+			goto result_err;
+		sets[j] = PyDict_GetItemWithError(result, key);
+		if (sets[j] == NULL) {
+			if (PyErr_Occurred())
+				goto result_err;
+			sets[j] = PySet_New(NULL);
+			if (sets[j] == NULL)
+				goto result_err;
+			if (PyDict_SetItem(result, key, sets[j]) < 0) {
+				Py_DECREF(sets[j]);
+				goto result_err;
+			}
+			Py_DECREF(sets[j]);
+		}
+		Py_CLEAR(key);
+	}
+
+	kind = PyUnicode_KIND(data);
+	buf = PyUnicode_DATA(data);
+	len = PyUnicode_GET_LENGTH(data);
+	for (i=1; i<len; i++) {
+		v = PyUnicode_READ(kind, buf, i);
+		for (j=0; j<n_chars; j++) {
+			if (v != targets[j])
+				continue;
+			u = PyUnicode_READ(kind, buf, i - 1);
+			if (u < 128) {
+				if (seen[j * 128 + u])
+					continue;
+				seen[j * 128 + u] = 1;
+			}
+			prev = PyUnicode_FromOrdinal(u);
+			if (prev == NULL || PySet_Add(sets[j], prev) < 0)
+				goto result_err;
+			Py_CLEAR(prev);
+		}
+	}
+	goto preceding_err;
+
+result_err:
+	Py_XDECREF(key);
+	Py_XDECREF(prev);
+	Py_CLEAR(result);
+
+preceding_err:
+	PyMem_Free(targets);
+	PyMem_Free(sets);
+	PyMem_Free(seen);
+	return result;
+}
+
+/*
+ * MODULE
+ */
+
+PyDoc_STRVAR(cnormal_form_module_doc,
+		"Single-pass matcher for the normal forms of CSV files\n");
+PyDoc_STRVAR(cnormal_form_normal_forms_doc,
+		"normal_forms(rows, delimiters, quotechars)\n\n"
+		"Return the (form, delimiter, quotechar) tuples of the normal\n"
+		"forms that the rows match, for every delimiter and quote\n"
+		"character given as the characters of a string.");
+PyDoc_STRVAR(cnormal_form_preceding_chars_doc,
+		"preceding_chars(data, chars)\n\n"
+		"Return a dict that maps every character of chars to the set of\n"
+		"characters that directly precede it somewhere in data.");
+
+static struct PyMethodDef cnormal_form_methods[] = {
+	{ "normal_forms", (PyCFunction)normal_forms, METH_VARARGS,
+		cnormal_form_normal_forms_doc },
+	{ "preceding_chars", (PyCFunction)preceding_chars, METH_VARARGS,
+		cnormal_form_preceding_chars_doc },
+	{ NULL, NULL, 0, NULL }
+};
+
+static struct PyModuleDef moduledef = {
+	PyModuleDef_HEAD_INIT,
+	"clevercsv.cnormal_form",
+	cnormal_form_module_doc,
+	-1,
+	cnormal_form_methods,
+	NULL,
+	NULL,
+	NULL,
+	NULL
+};
+
+PyMODINIT_FUNC PyInit_cnormal_form(void)
+{
+	PyObject *module;
+	module = PyModule_Create(&moduledef);
+	if (module == NULL)
+		return NULL;
+
+	if (PyModule_AddStringConstant(module, "__version__",
+				MODULE_VERSION) == -1)
+		return NULL;
+	return module;
+}
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for the asyncio wrappers
+
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Any
+from typing import List
+
+from clevercsv import aio
+from clevercsv import writer
+from clevercsv.dialect import SimpleDialect
+from clevercsv.exceptions import NoDetectionResult
+
+
+class AsyncWrappersTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dialect = SimpleDialect(";", '"', "")
+        self.table = [["A", "B", "C"]] + [
+            [str(i), "a;%i" % i, "%i.5" % i] for i in range(25)
+        ]
+        tmpfd, self.tmpfname = tempfile.mkstemp(prefix="ccsv_", suffix=".csv")
+        with os.fdopen(tmpfd, "w", newline="") as fp:
+            writer(fp, dialect=self.dialect).writerows(self.table)
+
+    def tearDown(self) -> None:
+        os.unlink(self.tmpfname)
+
+    def test_detect_dialect_async(self) -> None:
+        dialect = asyncio.run(aio.detect_dialect_async(self.tmpfname))
+        self.assertEqual(dialect, self.dialect)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            dialect = asyncio.run(
+                aio.detect_dialect_async(
+                    self.tmpfname, executor=executor, method="consistency"
+                )
+            )
+        self.assertEqual(dialect, self.dialect)
+
+    def test_read_table_async(self) -> None:
+        rows = asyncio.run(aio.read_table_async(self.tmpfname))
+        self.assertEqual(rows, self.table)
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            rows = asyncio.run(
+                aio.read_table_async(self.tmpfname, executor=executor)
+            )
+        self.assertEqual(rows, self.table)
+
+    def test_stream_table_async_batches(self) -> None:
+        batches: List[int] = []
+
+        def next_batch(*args: Any) -> List[List[str]]:
+            batch = original(*args)
+            batches.append(len(batch))
+            return batch
+
+        async def consume() -> List[List[str]]:
+            rows: List[List[str]] = []
+            async for row in aio.stream_table_async(
+                self.tmpfname, dialect=self.dialect, batch_size=10
+            ):
+                # batches are only read when the previous one is consumed
+                self.assertLessEqual(sum(batches) - len(rows), 10)
+                rows.append(row)
+            return rows
+
+        original = aio._next_batch
+        aio._next_batch = next_batch  # type: ignore[assignment]
+        try:
+            rows = asyncio.run(consume())
+        finally:
+            aio._next_batch = original  # type: ignore[assignment]
+        self.assertEqual(rows, self.table)
+        self.assertEqual(batches, [10, 10, 6])
+
+    def test_stream_table_async_no_result(self) -> None:
+        async def consume() -> None:
+            async for _ in aio.stream_table_async(self.tmpfname):
+                pass
+
+        # see the corresponding test of stream_table
+        with open(self.tmpfname, "w") as fp:
+            fp.write('1, "AA"\n2, "BB"\n3, "CC"')
+        with self.assertRaises(NoDetectionResult):
+            asyncio.run(consume())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for batch dialect detection
+
+"""
+
+import os
+import tempfile
+import threading
+import time
+import types
+import unittest
+
+from typing import Iterator
+from typing import List
+
+from clevercsv import writer
+from clevercsv.batch import detect_dialects
+from clevercsv.consistency import DetectionBudget
+from clevercsv.dialect import SimpleDialect
+
+
+class _ExitingPath(os.PathLike):
+    # A path that makes the worker process exit when it is opened
+    def __fspath__(self) -> str:
+        os._exit(3)
+
+
+class _UnpicklableError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class _UnpicklableErrorPath(os.PathLike):
+    # A path with an error that can't be unpickled by the parent process
+    def __fspath__(self) -> str:
+        raise _UnpicklableError(1, "failed")
+
+
+class _LockingErrorPath(os.PathLike):
+    # A path with an error that can't be pickled by the worker process
+    def __fspath__(self) -> str:
+        error = OSError("failed")
+        error.lock = threading.Lock()  # type: ignore[attr-defined]
+        raise error
+
+
+class BatchDetectionTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dialects = {}
+        for i, delim in enumerate([",", ";", "\t", "|"]):
+            dialect = SimpleDialect(delim, '"', "")
+            table = [["A", "B", "C"]] + [
+                ["%i" % j, "a%s%i" % (delim, j), "%i.5" % j] for j in range(20)
+            ]
+            path = os.path.join(self.tmpdir.name, "file_%i.csv" % i)
+            with open(path, "w", newline="") as fp:
+                writer(fp, dialect=dialect).writerows(table)
+            self.dialects[path] = dialect
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_detect_dialects(self) -> None:
+        paths = sorted(self.dialects)
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                results = list(detect_dialects(paths, workers=workers))
+                self.assertEqual(len(results), len(paths))
+                for result in results:
+                    self.assertIsNone(result.error)
+                    assert isinstance(result.path, str)
+                    self.assertEqual(
+                        result.dialect, self.dialects[result.path]
+                    )
+                    self.assertEqual(result.encoding, "ascii")
+
+    def test_detect_dialects_errors(self) -> None:
+        missing = os.path.join(self.tmpdir.name, "missing.csv")
+        path = sorted(self.dialects)[0]
+        results = list(detect_dialects([missing, path], workers=2))
+        errors = {r.path: r.error for r in results}
+        self.assertIsInstance(errors[missing], FileNotFoundError)
+        self.assertIsNone(errors[path])
+
+    def test_detect_dialects_budget(self) -> None:
+        path = sorted(self.dialects)[0]
+        (result,) = detect_dialects(
+            [path],
+            workers=1,
+            method="consistency",
+            budget=DetectionBudget(max_time=0.0),
+        )
+        self.assertIsNone(result.error)
+        self.assertTrue(result.approximate)
+        self.assertIsNotNone(result.dialect)
+
+        (result,) = detect_dialects([path], workers=1)
+        self.assertFalse(result.approximate)
+
+    def test_detect_dialects_lazy(self) -> None:
+        paths = sorted(self.dialects) * 5
+        consumed: List[str] = []
+
+        def generate() -> Iterator[str]:
+            for path in paths:
+                consumed.append(path)
+                yield path
+
+        results = detect_dialects(generate(), workers=2)
+        next(results)
+        # one file per worker is in flight, plus the next one
+        self.assertLessEqual(len(consumed), 3)
+        self.assertEqual(len(list(results)), len(paths) - 1)
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "requires named pipes")
+    def test_detect_dialects_timeout(self) -> None:
+        # opening a named pipe without a writer blocks forever
+        fifo = os.path.join(self.tmpdir.name, "fifo.csv")
+        os.mkfifo(fifo)
+        paths = sorted(self.dialects)
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                results = list(
+                    detect_dialects(
+                        [fifo] + paths, workers=workers, timeout=0.5
+                    )
+                )
+                errors = {r.path: r.error for r in results}
+                self.assertEqual(len(results), len(paths) + 1)
+                self.assertIsInstance(errors.pop(fifo), TimeoutError)
+                self.assertEqual(list(errors.values()), [None] * len(paths))
+
+        # closing the results doesn't wait for the file that is in flight
+        pending = detect_dialects([fifo, paths[0]], workers=2)
+        assert isinstance(pending, types.GeneratorType)
+        self.assertEqual(next(pending).path, paths[0])
+        start = time.monotonic()
+        pending.close()
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_detect_dialects_worker_errors(self) -> None:
+        path = sorted(self.dialects)[0]
+        exiting = _ExitingPath()
+        unpicklable = _UnpicklableErrorPath()
+        locking = _LockingErrorPath()
+        results = list(
+            detect_dialects(
+                [exiting, path, unpicklable, locking, path], workers=2
+            )
+        )
+        self.assertEqual(len(results), 5)
+        errors = {r.path: r.error for r in results}
+        self.assertIsInstance(errors[exiting], ChildProcessError)
+        self.assertIsInstance(errors[unpicklable], TypeError)
+        self.assertIsInstance(errors[locking], RuntimeError)
+        self.assertEqual(
+            [r.error for r in results if r.path == path], [None, None]
+        )
+
+    def test_detect_dialects_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            list(detect_dialects([], workers=0))
+        with self.assertRaises(ValueError):
+            list(detect_dialects([], timeout=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for column type inference
+
+"""
+
+import os
+import tempfile
+import unittest
+
+from clevercsv import writer
+from clevercsv.column_types import column_dtype
+from clevercsv.column_types import infer_column_types
+from clevercsv.dialect import SimpleDialect
+
+
+class ColumnTypesTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dialect = SimpleDialect(",", '"', "")
+        table = [
+            ["A", "B", "C", "D"],
+            ["1", "1.5", "", "2020-01-15"],
+            ["2", "1,000.5", "NA", "abc"],
+            ["-3", "1e5", "na"],
+        ]
+        tmpfd, self.tmpfname = tempfile.mkstemp(prefix="ccsv_", suffix=".csv")
+        with os.fdopen(tmpfd, "w", newline="") as fp:
+            writer(fp, dialect=self.dialect).writerows(table)
+
+    def tearDown(self) -> None:
+        os.unlink(self.tmpfname)
+
+    def test_infer_column_types(self) -> None:
+        histograms = infer_column_types(
+            self.tmpfname, self.dialect, header=True
+        )
+        self.assertEqual(
+            histograms,
+            [
+                {"integer": 3},
+                {"float": 2, "number": 1},
+                {"empty": 1, "missing": 1, "nan": 1},
+                {"iso_date": 1, "unicode_alphanum": 1},
+            ],
+        )
+
+        histograms = infer_column_types(self.tmpfname, self.dialect)
+        self.assertEqual(histograms[0], {"unicode_alphanum": 1, "integer": 3})
+
+        histograms = infer_column_types(
+            self.tmpfname, self.dialect, sample_rows=1, header=True
+        )
+        self.assertEqual(histograms[1], {"float": 1})
+
+        with self.assertRaises(ValueError):
+            infer_column_types(self.tmpfname, self.dialect, sample_rows=-1)
+
+    def test_column_dtype(self) -> None:
+        self.assertEqual(column_dtype({"integer": 3}), "int64")
+        self.assertEqual(column_dtype({"integer": 3, "empty": 1}), "float64")
+        self.assertEqual(column_dtype({"integer": 3, "missing": 1}), "float64")
+        self.assertEqual(column_dtype({"integer": 3, "float": 1}), "float64")
+        self.assertEqual(column_dtype({"iso_date": 2, "empty": 1}), "datetime")
+        self.assertEqual(column_dtype({"iso_datetime": 2}), "datetime")
+        self.assertIsNone(column_dtype({"iso_date": 2, "iso_datetime": 1}))
+        self.assertIsNone(column_dtype({"date": 2, "iso_date": 1}))
+        self.assertIsNone(column_dtype({"date": 2, "datetime": 1}))
+        self.assertEqual(column_dtype({"integer": 3, "nan": 1}), "str")
+        self.assertEqual(column_dtype({"number": 1}), "str")
+        self.assertIsNone(column_dtype({"unicode_alphanum": 1, None: 2}))
+        self.assertIsNone(column_dtype({"empty": 1}))
+        self.assertIsNone(column_dtype({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,9 @@ import unittest
 
 from clevercsv.consistency import ConsistencyDetector
 from clevercsv.consistency import ConsistencyScore
+from clevercsv.consistency import DetectionBudget
+from clevercsv.consistency import ProgressiveConsistencyDetector
+from clevercsv.detect_pattern import max_num_cells
 from clevercsv.dialect import SimpleDialect
 
 
@@ -25,3 +28,216 @@ class ConsistencyTestCase(unittest.TestCase):
         }
         H = ConsistencyDetector.get_best_dialects(scores)
         self.assertEqual(H, [SimpleDialect("|", None, None)])
+
+    def test_compute_type_score_early_stop(self) -> None:
+        data = "a,b,c\n1,2,3\n4,5,6\n{x,y,z\n7,8,9"
+        dialect = SimpleDialect(",", "", "")
+        detector = ConsistencyDetector()
+        T = detector.compute_type_score(data, dialect)
+        self.assertIsNotNone(T)
+
+        # with an incumbent that can be reached, the score is computed
+        T_full = detector.compute_type_score(
+            data, dialect, P=1.0, incumbent=0.5, num_cells=15
+        )
+        self.assertEqual(T, T_full)
+
+        # with an incumbent that can't be reached, computation stops
+        T_stop = detector.compute_type_score(
+            data, dialect, P=1.0, incumbent=0.99, num_cells=15
+        )
+        self.assertIsNone(T_stop)
+
+    def test_compute_type_score_early_stop_bad_estimate(self) -> None:
+        data = "a,b,c\n1,2,3\n{x,y,z\n7,8,9"
+        dialect = SimpleDialect(",", "", "")
+        detector = ConsistencyDetector()
+        T = detector.compute_type_score(data, dialect)
+        # if the estimate of the number of cells is too low early stopping is
+        # disabled once this is noticed
+        T_est = detector.compute_type_score(
+            data, dialect, P=1.0, incumbent=0.9, num_cells=3
+        )
+        self.assertEqual(T, T_est)
+
+    def test_compute_type_score_early_stop_escaped_newline(self) -> None:
+        # The first cell is unknown and the escaped line break creates a cell
+        # that doesn't appear in the abstraction, so counting the cells in
+        # the abstraction gives too low a bound before any overflow is seen.
+        data = "$\n\\\n"
+        dialect = SimpleDialect(",", '"', "\\")
+        num_cells = max_num_cells(data, dialect)
+        self.assertGreaterEqual(num_cells, 2)
+
+        detectors = [
+            ConsistencyDetector(),
+            ConsistencyDetector(budget=DetectionBudget(max_cells=100)),
+        ]
+        for detector in detectors:
+            with self.subTest(budget=detector._budget):
+                T = detector.compute_type_score(data, dialect)
+                self.assertEqual(T, 0.5)
+                T_stop = detector.compute_type_score(
+                    data, dialect, P=1.0, incumbent=0.4, num_cells=num_cells
+                )
+                self.assertEqual(T_stop, T)
+
+    def test_consistency_scores_early_stop(self) -> None:
+        data = "a,b,c\n1,2,3\n4,5,6\n7,8,9"
+        dialects = [
+            SimpleDialect(",", "", ""),
+            SimpleDialect(" ", "", ""),
+            SimpleDialect("", "", ""),
+        ]
+        with_skip = ConsistencyDetector(skip=True)
+        without_skip = ConsistencyDetector(skip=False)
+        scores_skip = with_skip.compute_consistency_scores(data, dialects)
+        scores_full = without_skip.compute_consistency_scores(data, dialects)
+        self.assertEqual(
+            ConsistencyDetector.get_best_dialects(scores_skip),
+            ConsistencyDetector.get_best_dialects(scores_full),
+        )
+
+    def test_sampled_type_score(self) -> None:
+        rows = [
+            "%i;name %i;%i.5;%s" % (i, i, i, "x,y" if i % 7 == 0 else "z")
+            for i in range(500)
+        ]
+        data = "\n".join(rows)
+        exact = ConsistencyDetector().detect(data)
+        detector = ConsistencyDetector(type_sample_size=20)
+        sampled = detector.detect(data)
+        self.assertEqual(sampled, exact)
+        self.assertEqual(sampled, SimpleDialect(";", "", ""))
+
+    def test_sampled_type_score_fallback(self) -> None:
+        # Two dialects with identical scores can only be distinguished by
+        # computing the type score exactly
+        data = "a,b c\nd,e f\ng,h i\nj,k l"
+        detector = ConsistencyDetector(type_sample_size=1)
+        dialect = detector.detect(data, delimiters=[",", " "])
+        self.assertEqual(dialect, ConsistencyDetector().detect(data))
+        self.assertTrue(detector.sampling_fallback_)
+
+    def test_budget(self) -> None:
+        rows = ["%i;name %i;%i.5" % (i, i, i) for i in range(500)]
+        data = "\n".join(rows)
+        exact = ConsistencyDetector().detect(data)
+
+        detector = ConsistencyDetector(budget=DetectionBudget(max_cells=10**6))
+        self.assertEqual(detector.detect(data), exact)
+        self.assertFalse(detector.approximate_)
+
+        detector = ConsistencyDetector(budget=DetectionBudget(max_cells=100))
+        self.assertIsNotNone(detector.detect(data))
+        self.assertTrue(detector.approximate_)
+
+        detector = ConsistencyDetector(budget=DetectionBudget(max_time=0.0))
+        self.assertIsNotNone(detector.detect(data))
+        self.assertTrue(detector.approximate_)
+
+    def test_budget_best_so_far(self) -> None:
+        data = "a,1,2.5\nb,2,3.5\nc,3,4.5\nd,4,5.5"
+        dialects = [SimpleDialect(",", "", ""), SimpleDialect(";", "", "")]
+        detector = ConsistencyDetector(
+            skip=False, budget=DetectionBudget(max_cells=14)
+        )
+        self.assertEqual(
+            detector.detect(data, delimiters=[",", ";"]), dialects[0]
+        )
+        self.assertTrue(detector.approximate_)
+
+        # all cells of the first dialect fit in the budget
+        detector._start_budget()
+        scores = detector.compute_consistency_scores(data, dialects)
+        self.assertTrue(detector.approximate_)
+        self.assertEqual(scores[dialects[0]].T, 1.0)
+        self.assertEqual(len(scores), 2)
+
+    def test_prefilter(self) -> None:
+        corpus = [
+            "a,1,2.5\nb,2,3.5\nc,3,4.5\nd,4,5.5",
+            "7,5; Mon, Jan 12;6,40\n100; Fri, Mar 21;8,23\n8,2; Thu, Sep 17;"
+            '2,71\n538,0;;7,26\n"NA"; Wed, Oct 4;6,93',
+            'id|name|time\r\n1|"Smith; J."|12:30\r\n2|"Doe, J."|08:15\r\n',
+            "x\ty\tz\n1\t\t3\n4\t5\t\n",
+            "'a b','c:d'\n'e f','g:h'\n",
+            'k1=a\\,b,k2="c"\nk1=d,k2="e,f"\n',
+            "single column\nwith text\n",
+            "\n".join("%i;name %i;%i.5" % (i, i, i) for i in range(200)),
+        ]
+        for data in corpus:
+            with self.subTest(data=data):
+                expected = ConsistencyDetector().detect(data)
+                for type_sample_size in [None, 10]:
+                    detector = ConsistencyDetector(
+                        prefilter=True, type_sample_size=type_sample_size
+                    )
+                    self.assertEqual(detector.detect(data), expected)
+
+        data = "\n".join("%i,12:%02i,a!" % (i, i % 60) for i in range(100))
+        detector = ConsistencyDetector(prefilter=True)
+        self.assertEqual(detector.detect(data), SimpleDialect(",", "", ""))
+        self.assertEqual(detector.dropped_delimiters_, ["", "!", ":"])
+
+        detector = ConsistencyDetector(skip=False, prefilter=True)
+        self.assertEqual(detector.detect(data), SimpleDialect(",", "", ""))
+        self.assertEqual(detector.dropped_delimiters_, [])
+
+    def test_sample_type_score_exact(self) -> None:
+        import random
+
+        detector = ConsistencyDetector(type_sample_size=10)
+        rows = [[("1", False), ("{a", False)], [("abc", True)]]
+        sample = detector.sample_type_score(rows, 10, random.Random(0))
+        self.assertTrue(sample.exact)
+        self.assertEqual(sample.T, 2 / 3)
+        self.assertEqual(sample.T_lower, sample.T_upper)
+
+        sample = detector.sample_type_score(rows, 1, random.Random(0))
+        self.assertFalse(sample.exact)
+        self.assertLessEqual(sample.T_lower, sample.T)
+        self.assertLessEqual(sample.T, sample.T_upper)
+
+    def test_progressive_accumulated_type_score(self) -> None:
+        lines = ["a,1,2.5\n", "b,{x,3.5\n", "c,3,4.5\n", "d,4,{y\n"]
+        dialect = SimpleDialect(",", "", "")
+        detector = ProgressiveConsistencyDetector()
+        for line in lines:
+            result, margin = detector.update(line)
+            exp = ConsistencyDetector().compute_type_score(
+                detector.data, dialect
+            )
+            self.assertEqual(detector.accumulated_type_score(dialect), exp)
+        self.assertEqual(result, dialect)
+        self.assertGreater(margin, 0)
+
+    def test_progressive_quoted_across_chunks(self) -> None:
+        # chunks that start or end inside a quoted cell with line breaks
+        chunks = ['1,"a\n', 'b c, d",2\n3,4\n"', 'x\ny",5\r', "\n6,7", ""]
+        dialects = [SimpleDialect(",", '"', ""), SimpleDialect(",", "", "")]
+        detector = ProgressiveConsistencyDetector()
+        for chunk in chunks:
+            detector.update(chunk)
+            for dialect in dialects:
+                with self.subTest(data=detector.data, dialect=dialect):
+                    exp = ConsistencyDetector().compute_type_score(
+                        detector.data, dialect
+                    )
+                    self.assertEqual(
+                        detector.accumulated_type_score(dialect), exp
+                    )
+
+    def test_progressive_masked_by_quotes(self) -> None:
+        data = '"a,b";"c,d"\n"e,f";"g,h"\n'
+        for masked, exp in [(False, True), (True, False)]:
+            detector = ProgressiveConsistencyDetector(
+                skip=False,
+                delimiters=[",", ";"],
+                test_masked_by_quotes=masked,
+            )
+            detector.update(data)
+            with self.subTest(test_masked_by_quotes=masked):
+                self.assertEqual(
+                    SimpleDialect(",", '"', "") in detector._type_counts, exp
+                )
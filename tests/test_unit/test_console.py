@@ -170,6 +170,50 @@ escapechar ="""
         finally:
             os.unlink(tmpfname)
 
+    def test_detect_opts_5(self) -> None:
+        table: TableType = [["A", "B", "C"], [1, 2, 3], [4, 5, 6]]
+        dialect = SimpleDialect(delimiter=";", quotechar="", escapechar="")
+        tmpfname = self._build_file(table, dialect)
+        exp = "Detected: " + str(dialect)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_file = os.path.join(tmpdir, "cache.sqlite")
+            try:
+                for _ in range(2):
+                    application = build_application()
+                    tester = Tester(application)
+                    tester.test_command(
+                        "detect", ["--cache", cache_file, tmpfname]
+                    )
+                    stdout = tester.get_stdout()
+                    self.assertIsNotNone(stdout)
+                    assert stdout is not None
+                    self.assertEqual(exp, stdout.strip())
+                self.assertTrue(os.path.exists(cache_file))
+            finally:
+                os.unlink(tmpfname)
+
+    def test_detect_opts_6(self) -> None:
+        table: TableType = [["A", "B", "C"], [1, 2, 3], [4, 5, 6]]
+        dialect = SimpleDialect(delimiter=";", quotechar="", escapechar="")
+        tmpfname = self._build_file(table, dialect)
+
+        application = build_application()
+        tester = Tester(application)
+        try:
+            tester.test_command("detect", ["--json", "--profile", tmpfname])
+        finally:
+            os.unlink(tmpfname)
+
+        stdout = tester.get_stdout()
+        self.assertIsNotNone(stdout)
+        assert stdout is not None
+        output = json.loads(stdout)
+        self.assertEqual(output["delimiter"], ";")
+        profile = output["profile"]
+        self.assertEqual(profile["method"], "normal")
+        self.assertIn("normal_form", profile["stages"])
+
     def test_code_1(self) -> None:
         table: TableType = [["A", "B", "C"], [1, 2, 3], [4, 5, 6]]
         dialect = SimpleDialect(delimiter=";", quotechar="", escapechar="")
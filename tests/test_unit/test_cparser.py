@@ -15,13 +15,17 @@ from typing import List
 from typing import Tuple
 from typing import TypeVar
 
+from clevercsv.cparser_util import count_known_types
 from clevercsv.cparser_util import parse_data
+from clevercsv.cparser_util import parse_string
+from clevercsv.detect_pattern import max_num_cells
+from clevercsv.detect_type import TypeDetector
+from clevercsv.dialect import SimpleDialect
 
 T = TypeVar("T", str, Tuple[str, bool])
 
 
 class ParserTestCase(unittest.TestCase):
-
     """
     Testing splitting on delimiter with or without quotes
     """
@@ -393,5 +397,123 @@ class ParserTestCase(unittest.TestCase):
         )
 
 
+class CountKnownTypesTestCase(unittest.TestCase):
+    def _count_python(
+        self, data: str, dialect: SimpleDialect
+    ) -> Tuple[int, int]:
+        td = TypeDetector()
+        known = total = 0
+        for row in parse_string(data, dialect, return_quoted=True):
+            for cell, is_quoted in row:
+                total += 1
+                known += td.is_known_type(cell, is_quoted)
+        return known, total
+
+    def test_count_known_types(self) -> None:
+        td = TypeDetector()
+        samples = [
+            'a,1,2.5\n"b,c",{x,12%\n  ,n/a,2020-01-01',
+            "a;b\nc;'d;e'\n'f",
+            "x:/\n:/",
+        ]
+        dialects = [
+            SimpleDialect(",", '"', ""),
+            SimpleDialect(";", "'", ""),
+            SimpleDialect(":", "", "/"),
+        ]
+        for data in samples:
+            for dialect in dialects:
+                with self.subTest(data=data, dialect=dialect):
+                    self.assertEqual(
+                        count_known_types(data, dialect, td.is_known_type),
+                        self._count_python(data, dialect),
+                    )
+
+    def test_count_known_types_native(self) -> None:
+        # common types are recognized without calling the classifier
+        calls: List[str] = []
+
+        def classifier(cell: str, is_quoted: bool) -> bool:
+            calls.append(cell)
+            return False
+
+        data = "abc,12,-0.5,7%,,N/A, x y \n{a,2020-01-01,1e5"
+        counts = count_known_types(
+            data, SimpleDialect(",", "", ""), classifier
+        )
+        self.assertEqual(counts, (8, 10))
+        self.assertEqual(calls, ["{a", "2020-01-01"])
+
+    def test_count_known_types_early_stop(self) -> None:
+        dialect = SimpleDialect(",", "", "")
+        data = "{a,{b,{c,{d"
+        counts = count_known_types(
+            data, dialect, lambda c, q: False, num_cells=4
+        )
+        self.assertEqual(counts, (0, 4))
+        counts = count_known_types(
+            data,
+            dialect,
+            lambda c, q: False,
+            num_cells=4,
+            pattern_score=1.0,
+            incumbent=0.5,
+        )
+        self.assertIsNone(counts)
+
+    def test_count_known_types_budget(self) -> None:
+        dialect = SimpleDialect(",", "", "")
+        data = "1,2,3\n4,5,6\n7,8,9\n10,11,12\n"
+        calls: List[int] = []
+
+        def budget(cells: int) -> bool:
+            calls.append(cells)
+            return False
+
+        counts = count_known_types(
+            data, dialect, lambda c, q: False, budget=budget, budget_interval=5
+        )
+        self.assertEqual(counts, (12, 12))
+        self.assertEqual(calls, [6, 6])
+
+        # counting stops after the row in which the budget is exhausted
+        def exhausted(cells: int) -> bool:
+            calls.append(cells)
+            return True
+
+        calls.clear()
+        counts = count_known_types(
+            data,
+            dialect,
+            lambda c, q: False,
+            budget=exhausted,
+            budget_interval=4,
+        )
+        self.assertEqual(counts, (6, 6))
+        self.assertEqual(calls, [6])
+
+        # the remaining cells are charged at the end
+        calls.clear()
+        counts = count_known_types(
+            data, dialect, lambda c, q: False, budget=budget
+        )
+        self.assertEqual(counts, (12, 12))
+        self.assertEqual(calls, [12])
+
+    def test_count_known_types_early_stop_escaped_newline(self) -> None:
+        # the escaped line break is a cell that the abstraction doesn't see
+        dialect = SimpleDialect(",", '"', "\\")
+        data = "$\n\\\n"
+        counts = count_known_types(
+            data,
+            dialect,
+            lambda c, q: c == "\n",
+            num_cells=max_num_cells(data, dialect),
+            pattern_score=1.0,
+            incumbent=0.4,
+        )
+        self.assertEqual(counts, (1, 2))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -7,9 +7,12 @@ Author: Gertjan van den Burg
 
 """
 
+import io
 import unittest
 
+from clevercsv.consistency import DetectionBudget
 from clevercsv.detect import Detector
+from clevercsv.dialect import SimpleDialect
 
 
 class DetectorTestCase(unittest.TestCase):
@@ -154,6 +157,84 @@ bytearray(b'fake data'),10:35:30,2006-10-27T02:30:45
             detector.has_header(self.header2 + self.sample8), True
         )
 
+    def test_detect_progressive(self) -> None:
+        detector = Detector()
+        for sample in [self.sample1, self.sample2, self.sample4]:
+            with self.subTest(sample=sample):
+                exp = detector.detect(sample)
+                out = detector.detect_progressive(sample, initial_chars=10)
+                self.assertEqual(out, exp)
+
+    def test_detect_progressive_stops_early(self) -> None:
+        rows = ['%i;"name, %i";%i.5' % (i, i, i) for i in range(2000)]
+        data = "\n".join(rows)
+        detector = Detector()
+        dialect = detector.detect_progressive(
+            io.StringIO(data, newline=""), initial_chars=100, stable_rounds=2
+        )
+        self.assertEqual(dialect, SimpleDialect(";", '"', ""))
+        self.assertLess(detector.num_chars_, len(data))
+
+        dialect = detector.detect_progressive(
+            data, initial_chars=100, max_chars=150
+        )
+        self.assertEqual(dialect, SimpleDialect(";", '"', ""))
+        self.assertLessEqual(detector.num_chars_, 200)
+
+    def test_detect_budget(self) -> None:
+        rows = ["%i;name %i;%i.5" % (i, i, i) for i in range(500)]
+        data = "\n".join(rows)
+        detector = Detector()
+        exact = detector.detect(data, method="consistency")
+        self.assertFalse(detector.approximate_)
+
+        dialect = detector.detect(
+            data, method="consistency", budget=DetectionBudget(max_cells=50)
+        )
+        self.assertTrue(detector.approximate_)
+        self.assertIsNotNone(dialect)
+
+        dialect = detector.detect(
+            data, budget=DetectionBudget(max_time=60, max_cells=10**6)
+        )
+        self.assertFalse(detector.approximate_)
+        self.assertEqual(dialect, exact)
+
+    def test_detect_profile(self) -> None:
+        rows = ['%i;"name, %i";%i.5;{x' % (i, i, i) for i in range(100)]
+        data = "\n".join(rows)
+        detector = Detector()
+        dialect = detector.detect(data, profile=True)
+        self.assertEqual(dialect, SimpleDialect(";", '"', ""))
+        profile = detector.profile_
+        assert profile is not None
+        self.assertEqual(profile.method, "consistency")
+        self.assertEqual(
+            list(profile.stages),
+            [
+                "normal_form",
+                "get_dialects",
+                "url_filter",
+                "consistency_scores",
+            ],
+        )
+        self.assertEqual(len(profile.dialects), profile.num_dialects)
+        statuses = {d.dialect: d.status for d in profile.dialects}
+        assert dialect is not None
+        self.assertEqual(statuses[dialect], "scored")
+        self.assertGreater(profile.type_cache_misses, 0)
+        self.assertIn("consistency_scores", profile.format())
+
+        detector.detect(data)
+        self.assertIsNone(detector.profile_)
+
+    def test_detect_progressive_invalid(self) -> None:
+        detector = Detector()
+        with self.assertRaises(ValueError):
+            detector.detect_progressive(self.sample1, initial_chars=0)
+        with self.assertRaises(ValueError):
+            detector.detect_progressive(self.sample1, growth=1.0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -10,11 +10,11 @@ Author: Gertjan van den Burg
 import unittest
 
 from clevercsv import detect_pattern
+from clevercsv.cparser_util import parse_string
 from clevercsv.dialect import SimpleDialect
 
 
 class PatternTestCase(unittest.TestCase):
-
     """
     Abstraction tests
     """
@@ -194,6 +194,53 @@ class PatternTestCase(unittest.TestCase):
         exp = 10 / 3
         self.assertAlmostEqual(exp, out)
 
+    def test_pattern_score_bounds(self) -> None:
+        data = (
+            "7,5; Mon, Jan 12;6,40\n100; Fri, Mar 21;8,23\n8,2; Thu, Sep 17;"
+            '2,71\n538,0;;7,26\n"NA"; Wed, Oct 4;6,93'
+        )
+        bounds = detect_pattern.pattern_score_bounds(data, [";", ",", "", "|"])
+        self.assertAlmostEqual(bounds[";"], 5 * 2 / 3 + 5e-3)
+        self.assertAlmostEqual(bounds[","], 2 * 3 / 4 + 3 * 2 / 3 + 5e-3)
+        self.assertAlmostEqual(bounds[""], 5e-3)
+        self.assertAlmostEqual(bounds["|"], 5e-3)
+
+        # the bound holds for any quote character and escape character
+        data = 'a;"b;c"\r\n"d\ne";f\\;g\rh'
+        bounds = detect_pattern.pattern_score_bounds(data, [";"])
+        for quotechar in ["", '"']:
+            for escapechar in ["", "\\"]:
+                d = SimpleDialect(";", quotechar, escapechar)
+                with self.subTest(dialect=d):
+                    score = detect_pattern.pattern_score(data, d)
+                    self.assertLessEqual(score, bounds[";"])
+
+    def test_max_num_cells(self) -> None:
+        self.assertEqual(
+            detect_pattern.max_num_cells("", SimpleDialect(",", "", "")), 0
+        )
+        # an escaped line break is counted, although it is part of a cell
+        data = ",1\n\\\n\n$,,\n"
+        dialect = SimpleDialect(",", '"', "\\")
+        self.assertEqual(detect_pattern.max_num_cells(data, dialect), 8)
+        self.assertEqual(
+            detect_pattern.max_num_cells(data, SimpleDialect("", "", "")), 5
+        )
+
+        cases = [
+            ('a,"b,c"\r\n"d\ne",f\\,g\rh', ",", '"', "\\"),
+            ("a;b\\\n\\\n;\n", ";", "", "\\"),
+            ('"a\n\n"b\n', "", '"', ""),
+        ]
+        for data, delimiter, quotechar, escapechar in cases:
+            dialect = SimpleDialect(delimiter, quotechar, escapechar)
+            with self.subTest(data=data, dialect=dialect):
+                rows = list(parse_string(data, dialect))
+                self.assertLessEqual(
+                    sum(map(len, rows)),
+                    detect_pattern.max_num_cells(data, dialect),
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -7,11 +7,22 @@ Author: Gertjan van den Burg
 
 """
 
+import time
 import unittest
 
 from typing import List
+from typing import Optional
 
+import regex
+
+from clevercsv import cdetect_type
+from clevercsv._regexes import DEFAULT_TYPE_REGEXES
+from clevercsv.detect_type import DEFAULT_TYPE_PREFILTERS
+from clevercsv.detect_type import SUGGESTED_MAX_CELL_LENGTHS
 from clevercsv.detect_type import TypeDetector
+from clevercsv.detect_type import TypePrefilter
+from clevercsv.detect_type import is_determined_signature
+from clevercsv.detect_type import shape_signature
 from clevercsv.detect_type import type_score
 from clevercsv.dialect import SimpleDialect
 
@@ -385,6 +396,424 @@ class TypeDetectorTestCase(unittest.TestCase):
             with self.subTest(path=path):
                 self.assertFalse(self.td.is_unix_path(path))
 
+    # SHAPE SIGNATURES
+
+    def test_shape_signature(self) -> None:
+        self.assertEqual(shape_signature("12.50"), "99.99")
+        self.assertEqual(shape_signature("99.01"), "99.99")
+        self.assertEqual(shape_signature("Ab-3"), "aa-9")
+        self.assertEqual(shape_signature("1,234.56"), "9,999.99")
+        self.assertEqual(shape_signature("a" * 40 + "12"), "a9")
+
+    def test_determined_signature(self) -> None:
+        self.assertTrue(is_determined_signature("99.99"))
+        self.assertTrue(is_determined_signature("aa a-9_(a)!"))
+        self.assertTrue(is_determined_signature(""))
+        self.assertFalse(is_determined_signature("9,999.99"))
+        self.assertFalse(is_determined_signature("99:99"))
+        self.assertFalse(is_determined_signature("a@a.aa"))
+
+    def test_signature_cache(self) -> None:
+        td = TypeDetector()
+        no_sig = TypeDetector(use_signatures=False)
+        cells = [
+            "12.50",
+            "13.75",
+            "01.5",
+            "1,234.56",
+            "1,2345.6",
+            "12:30",
+            "25:30",
+            " abc ",
+            "{a",
+            "a,b",
+        ]
+        for cell in cells:
+            for is_quoted in [False, True]:
+                with self.subTest(cell=cell, is_quoted=is_quoted):
+                    self.assertEqual(
+                        td.is_known_type(cell, is_quoted=is_quoted),
+                        no_sig.is_known_type(cell, is_quoted=is_quoted),
+                    )
+        self.assertIn("99.99", td._signature_cache)
+        self.assertNotIn("99:99", td._signature_cache)
+
+    def test_signature_cache_custom_patterns(self) -> None:
+        patterns = dict(TypeDetector().patterns)
+        patterns["unicode_alphanum"] = regex.compile(r"[a-z]+")
+        td = TypeDetector(patterns=patterns)
+        self.assertFalse(td.use_signatures)
+        self.assertFalse(td.is_known_type("Abc"))
+
+    def _detect_type_sequential(
+        self, td: TypeDetector, cell: str, is_quoted: bool
+    ) -> Optional[str]:
+        cell = cell.strip() if td.strip_whitespace else cell
+        for name, func in td._type_tests:
+            if func(cell, is_quoted=is_quoted):
+                return name
+        return None
+
+    def test_combined_tests(self) -> None:
+        cells = [
+            "",
+            "  ",
+            "1.5",
+            "1,000.50",
+            "1.5e10",
+            "12:30",
+            "12:30:45+01:00",
+            "5%",
+            "5 %",
+            "$ 10",
+            "/usr/bin",
+            "N/A",
+            "2020-01-15",
+            "2020-01-15T12:30Z",
+            "12.1.2020",
+            "1.2.3.4",
+            "www.example.com",
+            "mail@example.com",
+            "abc, def",
+            "bytearray(b'')",
+            '{"a": 1}',
+            "{a",
+            "5\n",
+            "2020-01-15\n",
+        ]
+        detectors = [TypeDetector(), TypeDetector(strip_whitespace=False)]
+        for td in detectors:
+            for cell in cells:
+                for is_quoted in [False, True]:
+                    with self.subTest(cell=cell, is_quoted=is_quoted):
+                        self.assertEqual(
+                            td.detect_type(cell, is_quoted=is_quoted),
+                            self._detect_type_sequential(td, cell, is_quoted),
+                        )
+
+    def test_combined_tests_custom(self) -> None:
+        class NoTens(TypeDetector):
+            def is_number(self, cell: str, is_quoted: bool = False) -> bool:
+                return super().is_number(cell) and not cell.endswith("0")
+
+        patterns = dict(TypeDetector().patterns)
+        patterns["unix_path"] = regex.compile(r"[a-z]+")
+        td = NoTens(patterns=patterns)
+        self.assertEqual(td.detect_type("10"), "unicode_alphanum")
+        self.assertEqual(td.detect_type("11"), "number")
+        self.assertEqual(td.detect_type("10%"), None)
+        self.assertEqual(td.detect_type("11%"), "percentage")
+        self.assertEqual(td.detect_type("abc"), "unix_path")
+        self.assertEqual(td.detect_type("ABC"), "unicode_alphanum")
+
+    def test_patterns_update(self) -> None:
+        td = TypeDetector()
+        pattern = regex.compile(r"[a-z]+")
+        with self.assertRaises(TypeError):
+            td.patterns["unix_path"] = pattern  # type: ignore[index]
+
+        self.assertEqual(td.detect_type("abc"), "unicode_alphanum")
+        self.assertTrue(td.is_known_type("Abc"))
+        self.assertTrue(td.use_signatures)
+
+        td.patterns = {
+            **td.patterns,
+            "unix_path": pattern,
+            "unicode_alphanum": pattern,
+        }
+        self.assertEqual(td.detect_type("abc"), "unix_path")
+        self.assertFalse(td.use_signatures)
+        self.assertFalse(td.is_known_type("Abc"))
+
+        td.patterns = DEFAULT_TYPE_REGEXES
+        self.assertIsNot(td.patterns, DEFAULT_TYPE_REGEXES)
+        self.assertEqual(td.detect_type("abc"), "unicode_alphanum")
+        self.assertTrue(td.is_known_type("Abc"))
+        self.assertTrue(td.use_signatures)
+
+    def test_prefilters(self) -> None:
+        prefilter = TypePrefilter(r"\d", "%")
+        self.assertTrue(prefilter.matches("1", "%"))
+        self.assertFalse(prefilter.matches("a", "%"))
+        self.assertFalse(prefilter.matches("1", "1"))
+        self.assertFalse(prefilter.matches("", ""))
+        self.assertTrue(TypePrefilter().matches("a", "b"))
+
+        cells = [
+            "+",
+            ",5",
+            "1.",
+            "1,000.5",
+            "1.000,5",
+            "http://localhost:8080/",
+            "www.example.com/a_(b)",
+            "a.b+c@example.com",
+            "1.2.3.4",
+            "12:30:45+01:00",
+            "1:30",
+            "€ 5",
+            "~/bin/",
+            "2019年3月1日",
+            "19년3월1일",
+            "abc?",
+            "abc, def",
+        ]
+        for cell in cells:
+            for key, pattern in DEFAULT_TYPE_REGEXES.items():
+                if pattern.fullmatch(cell) is None:
+                    continue
+                with self.subTest(cell=cell, key=key):
+                    self.assertTrue(
+                        DEFAULT_TYPE_PREFILTERS[key].matches(cell[0], cell[-1])
+                    )
+
+    def test_prefilters_custom(self) -> None:
+        calls = []
+
+        class Pattern:
+            def fullmatch(self, cell: str) -> Optional[str]:
+                calls.append(cell)
+                return cell if cell.startswith("#") else None
+
+        patterns = dict(TypeDetector().patterns)
+        patterns["unix_path"] = Pattern()  # type: ignore[assignment]
+        td = TypeDetector(patterns=patterns)
+        self.assertEqual(td.detect_type("#1"), "unix_path")
+        self.assertEqual(td.detect_type("ab"), "unicode_alphanum")
+        self.assertEqual(calls, ["#1", "ab"])
+
+        calls.clear()
+        td = TypeDetector(
+            patterns=patterns, prefilters={"unix_path": TypePrefilter("#")}
+        )
+        self.assertEqual(td.detect_type("#1"), "unix_path")
+        self.assertEqual(td.detect_type("ab"), "unicode_alphanum")
+        self.assertEqual(calls, ["#1"])
+
+    def test_detect_types(self) -> None:
+        cells = ["1", "abc", "1", "a,b", "a,b", "", "{a"]
+        quoted = [False, False, False, False, True, False, False]
+        self.assertEqual(
+            self.td.detect_types(cells, quoted),
+            [self.td.detect_type(c, q) for c, q in zip(cells, quoted)],
+        )
+        self.assertEqual(
+            self.td.detect_types(iter(cells)),
+            [self.td.detect_type(c) for c in cells],
+        )
+        self.assertEqual(
+            self.td.is_known_types(cells, quoted),
+            [True, True, True, False, True, True, False],
+        )
+        self.assertEqual(self.td.detect_types([]), [])
+        with self.assertRaises(ValueError):
+            self.td.is_known_types(cells, quoted[:-1])
+
+    def test_adaptive(self) -> None:
+        cells = [
+            "",
+            "123",
+            "1.2.3.4",
+            "20200115",
+            "2020-01-15",
+            "12:30",
+            "2020-01-15T12:30",
+            "5%",
+            "$5",
+            "nan",
+            "NA",
+            "/usr/bin",
+            "www.example.com",
+            "mail@example.com",
+            "abc",
+            "bytearray(b'abc')",
+            '{"a": 1}',
+            "1,000.5",
+            "+",
+        ]
+        td = TypeDetector(adaptive=True)
+        for cell in ["123"] * 10 + ["2020-01-15"] * 5 + ["abc"] * 3:
+            self.assertIsNotNone(td.detect_type(cell))
+        order = td.type_order()
+        self.assertEqual(
+            order[:4],
+            [
+                ("number", 10),
+                ("date", 5),
+                ("unicode_alphanum", 3),
+                ("empty", 0),
+            ],
+        )
+        self.assertCountEqual(
+            [name for name, _ in order], td.list_known_types()
+        )
+
+        # the learned order doesn't change the detected types
+        for cell in cells * 3:
+            for is_quoted in [False, True]:
+                with self.subTest(cell=cell, is_quoted=is_quoted):
+                    self.assertEqual(
+                        td.detect_type(cell, is_quoted=is_quoted),
+                        self.td.detect_type(cell, is_quoted=is_quoted),
+                    )
+
+        td.reset_type_order()
+        self.assertEqual(
+            td.type_order(), [(name, 0) for name in td.list_known_types()]
+        )
+
+        # types can overlap with every type of higher priority if the type
+        # tests aren't the default
+        class NoTens(TypeDetector):
+            def is_number(self, cell: str, is_quoted: bool = False) -> bool:
+                return super().is_number(cell) and not cell.endswith("0")
+
+        patterns = dict(TypeDetector().patterns)
+        patterns["unix_path"] = regex.compile(r"[a-z]+")
+        td = NoTens(patterns=patterns, adaptive=True)
+        for cell in ["abc", "11", "10"] * 3:
+            self.assertEqual(
+                td.detect_type(cell),
+                NoTens(patterns=patterns).detect_type(cell),
+            )
+        self.assertEqual(td.detect_type("ABC"), "unicode_alphanum")
+
+    def test_native(self) -> None:
+        cells = [
+            "1",
+            "-1.5e-10",
+            "1,000.50",
+            "1.000,50",
+            "1,",
+            "01,000",
+            "1e",
+            "12:30",
+            "1:30",
+            "24:00",
+            "12:30:45+01:00",
+            "0130",
+            "2020-01-15",
+            "2019年3月1日",
+            "19년3월31일",
+            "2020-01-15T12:30Z",
+            "2021-09-26T12:13:31+01:00",
+            "٣٫٥",
+            "١٢:٣٠",
+            "２０２０-01-15",
+            "١٢٣",
+        ]
+        native = TypeDetector()
+        regexes = TypeDetector(use_native=False)
+        self.assertTrue(native._native)
+        self.assertFalse(regexes._native)
+        for cell in cells:
+            with self.subTest(cell=cell):
+                self.assertEqual(
+                    native.detect_type(cell), regexes.detect_type(cell)
+                )
+                for key in native._native:
+                    self.assertEqual(
+                        native._run_regex(cell, key),
+                        regexes._run_regex(cell, key),
+                    )
+
+        # the regular expressions are used for custom patterns
+        patterns = DEFAULT_TYPE_REGEXES.copy()
+        patterns["number_1"] = regex.compile("[0-9]+0")
+        td = TypeDetector(patterns=patterns)
+        self.assertNotIn("number_1", td._native)
+        self.assertFalse(td.is_number("1"))
+        self.assertTrue(td.is_number("10"))
+
+    def test_max_lengths(self) -> None:
+        url = "www.example.com/" + "a" * SUGGESTED_MAX_CELL_LENGTHS["url"]
+        td = TypeDetector(max_lengths=SUGGESTED_MAX_CELL_LENGTHS)
+        self.assertTrue(td.is_url(url))
+        self.assertIsNone(td.detect_type(url))
+        self.assertEqual(td.detect_type(url[:2048]), "url")
+
+        td = TypeDetector(max_lengths={"url": None, "number": 3})
+        self.assertEqual(td.detect_type(url), "url")
+        self.assertEqual(td.detect_type("123"), "number")
+        self.assertEqual(td.detect_type("1234"), "unicode_alphanum")
+        self.assertIsNone(td.detect_type("+12.5"))
+
+        # a length limit on alphanumeric text disables the signature cache
+        td = TypeDetector(max_lengths={"unicode_alphanum": 3})
+        self.assertFalse(td.use_signatures)
+        self.assertTrue(td.is_known_type("abc"))
+        self.assertFalse(td.is_known_type("abcd"))
+
+    def test_default_limits(self) -> None:
+        # by default there are no limits on the length or the nesting of
+        # cells, so that long cells keep their type
+        self.assertEqual(self.td.max_lengths, {})
+        self.assertIsNone(self.td.max_json_depth)
+        url = "www.example.com/" + "a" * 5000
+        self.assertEqual(self.td.detect_type(url), "url")
+        email = "a" * 300 + "@example.com"
+        self.assertEqual(self.td.detect_type(email), "email")
+        deep = '{"a":' * 500 + "1" + "}" * 500
+        self.assertEqual(self.td.detect_type(deep), "json")
+
+    def test_json_structure(self) -> None:
+        yes_structure = [
+            "{}",
+            '{"a": [1, {"b": "}"}]}',
+            '{"a": "\\"}"}',
+            "[[]]",
+        ]
+        for cell in yes_structure:
+            with self.subTest(cell=cell):
+                self.assertTrue(cdetect_type.json_structure(cell, 10))
+        no_structure = [
+            "",
+            "{",
+            "{]",
+            "{}}",
+            '{"a": 1}, {"b": 2}',
+            '{"a}',
+            '{"a\\"}',
+            "[[[]]]",
+        ]
+        for cell in no_structure:
+            with self.subTest(cell=cell):
+                self.assertFalse(cdetect_type.json_structure(cell, 2))
+
+        td = TypeDetector(max_json_depth=100)
+        deep = '{"a":' * 100 + "1" + "}" * 100
+        self.assertTrue(td.is_json_obj(deep))
+        self.assertFalse(td.is_json_obj('{"a":' + deep + "}"))
+        # nesting that the json module can't parse is rejected
+        deep = '{"a":' * 10_000 + "1" + "}" * 10_000
+        self.assertFalse(self.td.is_json_obj(deep))
+
+    def test_adversarial_cells(self) -> None:
+        # cells on which a backtracking regular expression or a recursive
+        # parser takes time that is quadratic in the length of the cell, or
+        # fails
+        n = 100_000
+        cells = [
+            "a" * n + "#a",
+            "a." * n + "a",
+            "ab." * n + "-",
+            "/a" * n + "!a",
+            "www.example.com/" + "a." * n + " a",
+            "a@a" + ".a" * n + "!a",
+            "\u0661" * n + ".\u0661\u0661e\u0661x",
+            "$ " + "1" * n + "x",
+            '{"a":' * n + "1" + "}" * n,
+            "{" + "[]" * n + "}",
+            '{"' + '\\"' * n + "}",
+            "2020-01-01T" + "1" * n,
+        ]
+        for cell in cells:
+            with self.subTest(cell=cell[:20]):
+                start = time.perf_counter()
+                self.td.detect_type(cell)
+                self.td.detect_type(cell, is_quoted=True)
+                self.assertLess(time.perf_counter() - start, 1.0)
+
     """
     Type Score tests
     """
@@ -435,5 +864,12 @@ class TypeDetectorTestCase(unittest.TestCase):
         self.assertAlmostEqual(exp, out)
 
 
+class RegexTypeDetectorTestCase(TypeDetectorTestCase):
+    """Run the type detection tests without the native recognizers"""
+
+    def setUp(self) -> None:
+        self.td = TypeDetector(use_native=False)
+
+
 if __name__ == "__main__":
     unittest.main()
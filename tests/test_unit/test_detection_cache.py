@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for the detection cache.
+
+"""
+
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from clevercsv.detection_cache import DetectionCache
+from clevercsv.dialect import SimpleDialect
+from clevercsv.wrappers import detect_dialect
+from clevercsv.wrappers import read_table
+
+
+class DetectionCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.csv_file = os.path.join(self._tmpdir.name, "data.csv")
+        with open(self.csv_file, "w", newline="", encoding="utf-8") as fp:
+            fp.write("a;b;c\n1;2;3\n4;5;6\n")
+        self.cache = DetectionCache(
+            os.path.join(self._tmpdir.name, "cache.sqlite")
+        )
+        self.dialect = SimpleDialect(";", "", "")
+
+    def tearDown(self) -> None:
+        self.cache.close()
+        self._tmpdir.cleanup()
+
+    def test_get_put(self) -> None:
+        params = {"num_chars": None, "method": "auto"}
+        self.assertIsNone(self.cache.get(self.csv_file, params))
+        self.cache.put(self.csv_file, params, self.dialect, "utf-8")
+        self.assertEqual(
+            self.cache.get(self.csv_file, params), (self.dialect, "utf-8")
+        )
+        self.assertIsNone(
+            self.cache.get(self.csv_file, {"num_chars": 10, "method": "auto"})
+        )
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(self.csv_file, params))
+
+    def test_invalidate_on_change(self) -> None:
+        params = {"num_chars": None}
+        self.cache.put(self.csv_file, params, self.dialect, "utf-8")
+        with open(self.csv_file, "a", newline="", encoding="utf-8") as fp:
+            fp.write("7;8;9\n")
+        self.assertIsNone(self.cache.get(self.csv_file, params))
+
+    def test_invalidate_on_version(self) -> None:
+        params = {"num_chars": None}
+        self.cache.put(self.csv_file, params, self.dialect, "utf-8")
+        self.assertIsNotNone(self.cache.get(self.csv_file, params))
+        with mock.patch("clevercsv.detection_cache.__version__", "0.0.0"):
+            self.assertIsNone(self.cache.get(self.csv_file, params))
+
+    def test_verify_hash(self) -> None:
+        params = {"num_chars": None}
+        stat = os.stat(self.csv_file)
+        self.cache.verify_hash = True
+        self.cache.put(self.csv_file, params, self.dialect, "utf-8")
+        self.assertIsNotNone(self.cache.get(self.csv_file, params))
+
+        # same size and modification time, but different content
+        with open(self.csv_file, "w", newline="", encoding="utf-8") as fp:
+            fp.write("a,b,c\n1,2,3\n4,5,6\n")
+        os.utime(self.csv_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(self.cache.get(self.csv_file, params))
+
+        self.cache.verify_hash = False
+        self.assertIsNotNone(self.cache.get(self.csv_file, params))
+
+    def test_detect_dialect(self) -> None:
+        dialect = detect_dialect(self.csv_file, detection_cache=self.cache)
+        self.assertEqual(dialect, self.dialect)
+
+        with mock.patch("clevercsv.wrappers.Detector") as detector:
+            dialect = detect_dialect(self.csv_file, detection_cache=self.cache)
+            detector.assert_not_called()
+        self.assertEqual(dialect, self.dialect)
+
+        # the cache is shared with the other wrappers
+        with mock.patch("clevercsv.wrappers.Detector") as detector:
+            rows = read_table(self.csv_file, detection_cache=self.cache)
+            detector.assert_not_called()
+        self.assertEqual(
+            rows, [["a", "b", "c"], ["1", "2", "3"], ["4", "5", "6"]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for the lazy initialization of the package on import.
+
+"""
+
+import json
+import subprocess
+import sys
+import unittest
+
+from clevercsv import escape
+from clevercsv._regexes import DEFAULT_TYPE_REGEXES
+from clevercsv._regexes import LazyPattern
+from clevercsv._regexes import lazy_compile
+
+_IMPORT_SCRIPT = """
+import json
+import sys
+
+import clevercsv
+
+from clevercsv import escape
+from clevercsv._regexes import DEFAULT_TYPE_REGEXES
+
+print(json.dumps({
+    "modules": sorted(
+        m for m in ["chardet", "concurrent.futures.process"]
+        if m in sys.modules
+    ),
+    "unicode_po_chars": "UNICODE_PO_CHARS" in vars(escape),
+    "compiled": sorted(
+        k for k, p in DEFAULT_TYPE_REGEXES.items()
+        if vars(p).get("_compiled") is not None
+    ),
+}))
+"""
+
+
+class ImportTestCase(unittest.TestCase):
+    def test_lazy_initialization(self) -> None:
+        output = subprocess.check_output(
+            [sys.executable, "-c", _IMPORT_SCRIPT], text=True
+        )
+        self.assertEqual(
+            json.loads(output),
+            {"modules": [], "unicode_po_chars": False, "compiled": []},
+        )
+
+    def test_lazy_pattern(self) -> None:
+        pattern = lazy_compile(r"\d+")
+        self.assertIsInstance(pattern, LazyPattern)
+        self.assertEqual(pattern.pattern, r"\d+")
+        self.assertEqual(repr(pattern), r"LazyPattern('\\d+')")
+        self.assertIsNotNone(pattern.fullmatch("123"))
+        self.assertIsNone(pattern.fullmatch("12a"))
+        self.assertEqual(pattern.sub("D", "a1b22"), "aDbD")
+
+        match = pattern.search("ab123c", 3, 5)
+        assert match is not None
+        self.assertEqual(match.span(), (3, 5))
+        match = pattern.match("ab123c", 2)
+        assert match is not None
+        self.assertEqual(match.group(), "123")
+        self.assertEqual(pattern.findall("1a22b"), ["1", "22"])
+        self.assertEqual(
+            [m.group() for m in pattern.finditer("1a22b")], ["1", "22"]
+        )
+        self.assertEqual(pattern.split("a1b22c"), ["a", "b", "c"])
+        self.assertIs(pattern.compiled, pattern.compiled)
+        self.assertEqual(pattern.compiled.pattern, r"\d+")
+
+        for key, pattern in DEFAULT_TYPE_REGEXES.items():
+            with self.subTest(key=key):
+                self.assertIsInstance(pattern, LazyPattern)
+
+    def test_unicode_po_chars(self) -> None:
+        chars = escape.UNICODE_PO_CHARS
+        self.assertIs(escape.UNICODE_PO_CHARS, chars)
+        self.assertIn("\\", chars)
+        self.assertIn("¡", chars)
+        self.assertNotIn("a", chars)
+        self.assertNotIn("-", chars)
+
+        block = escape.DEFAULT_BLOCK_CHARS
+        sample = list(map(chr, range(0x3100)))
+        self.assertEqual(
+            [c for c in sample if escape.is_potential_escapechar(c, "utf-8")],
+            [c for c in sample if c in chars and c not in block],
+        )
+        self.assertFalse(escape.is_potential_escapechar("\\\\", "utf-8"))
+
+        with self.assertRaises(AttributeError):
+            escape.UNKNOWN_ATTRIBUTE  # type: ignore[attr-defined]
+
+
+if __name__ == "__main__":
+    unittest.main()
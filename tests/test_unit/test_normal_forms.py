@@ -7,14 +7,21 @@ Author: Gertjan van den Burg
 
 """
 
+import itertools
 import unittest
 
+from clevercsv.cnormal_form import normal_forms
+from clevercsv.cnormal_form import preceding_chars
 from clevercsv.dialect import SimpleDialect
+from clevercsv.normal_form import QUOTECHARS
+from clevercsv.normal_form import detect_dialect_normal
+from clevercsv.normal_form import escaped_chars
 from clevercsv.normal_form import is_form_1
 from clevercsv.normal_form import is_form_2
 from clevercsv.normal_form import is_form_3
 from clevercsv.normal_form import is_form_4
 from clevercsv.normal_form import is_form_5
+from clevercsv.normal_form import maybe_has_escapechar
 
 
 class NormalFormTestCase(unittest.TestCase):
@@ -89,6 +96,86 @@ class NormalFormTestCase(unittest.TestCase):
             is_form_5('"A,""B"""\n"1,"\n"2,3"'.split("\n"), dialect)
         )
 
+    def test_normal_forms(self) -> None:
+        form_funcs = {
+            1: is_form_1,
+            2: is_form_2,
+            3: is_form_3,
+            4: is_form_4,
+            5: is_form_5,
+        }
+        delimiters = [",", ";", "|", "\t"]
+        candidates = [(2, delim, "") for delim in delimiters]
+        for delim, quotechar in itertools.product(delimiters, QUOTECHARS):
+            candidates.extend((ID, delim, quotechar) for ID in [1, 3, 5])
+        candidates.extend((4, "", quotechar) for quotechar in QUOTECHARS)
+        candidates.append((4, "", ""))
+
+        samples = [
+            '"A","B"\n"C","D"',
+            '"A","","C"',
+            '"A"\n"b""A""c","B"',
+            "1,2,3\na,b,c",
+            "1,,3\n4,5,",
+            'A,"B"\nC,"D,E"',
+            "A;'B'\n'C';D",
+            'A|"B"|C\n1|"2|3"|4',
+            "A\nB\nC",
+            "'A'\n'B C'",
+            '"A,B"\n"1,"\n"2,3"',
+            '"A,""B"""\n"1,"\n"2,3"',
+            "A\tB\n\tC",
+            'A,B"\n,"',
+            "",
+        ]
+        for data in samples:
+            rows = data.split("\n")
+            expected = {
+                (ID, delim, quotechar)
+                for ID, delim, quotechar in candidates
+                if form_funcs[ID](rows, SimpleDialect(delim, quotechar, ""))
+            }
+            with self.subTest(data=data):
+                self.assertEqual(
+                    set(normal_forms(rows, "".join(delimiters), "'\"")),
+                    expected,
+                )
+
+    def test_detect_dialect_normal(self) -> None:
+        data = '"A","B"\n"C","D"'
+        self.assertEqual(
+            detect_dialect_normal(data), SimpleDialect(",", '"', "")
+        )
+        self.assertEqual(
+            detect_dialect_normal("A::B\nC::D", delimiters=[",", "::"]),
+            SimpleDialect("::", "", ""),
+        )
+        self.assertIsNone(detect_dialect_normal("A,B\nC;D"))
+        self.assertIsNone(detect_dialect_normal('"A"\\,"B"\n"C","D"'))
+
+    def test_preceding_chars(self) -> None:
+        self.assertEqual(
+            preceding_chars('a,b\\,c;"x"\u00e9,', ',;"\t'),
+            {
+                ",": {"a", "\\", "\u00e9"},
+                ";": {"c"},
+                '"': {";", "x"},
+                "\t": set(),
+            },
+        )
+        self.assertEqual(preceding_chars(",,", ",,"), {",": {","}})
+        self.assertEqual(preceding_chars("", ","), {",": set()})
+
+    def test_escaped_chars(self) -> None:
+        data = 'A,B\\,C\n"D"\u00a1;E'
+        self.assertEqual(escaped_chars(data, "utf-8", [",", ";"]), {",", ";"})
+        self.assertEqual(escaped_chars(data, "utf-8", ['"', "|"]), set())
+        self.assertEqual(escaped_chars(data, "utf-8", [",,", ""]), set())
+        self.assertEqual(escaped_chars("A.,B", "utf-8", [","]), set())
+
+        self.assertTrue(maybe_has_escapechar(data, "utf-8", "|", ";"))
+        self.assertFalse(maybe_has_escapechar(data, "utf-8", "|", '"'))
+
 
 if __name__ == "__main__":
     unittest.main()
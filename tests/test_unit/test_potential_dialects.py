@@ -7,12 +7,19 @@ Author: Gertjan van den Burg
 
 """
 
+import itertools
 import unittest
 
+from clevercsv._regexes import PATTERN_URL
+from clevercsv._regexes import PATTERN_URL_FILTER
+from clevercsv.dialect import SimpleDialect
 from clevercsv.potential_dialects import filter_urls
 from clevercsv.potential_dialects import get_delimiters
+from clevercsv.potential_dialects import get_dialects
 from clevercsv.potential_dialects import get_quotechars
 from clevercsv.potential_dialects import masked_by_quotechar
+from clevercsv.potential_dialects import masked_by_quotechars
+from clevercsv.potential_dialects import preceding_escapechars
 
 
 class PotentialDialectTestCase(unittest.TestCase):
@@ -21,12 +28,68 @@ class PotentialDialectTestCase(unittest.TestCase):
         self.assertFalse(masked_by_quotechar('A"B&C"A&A', '"', "", "&"))
         self.assertFalse(masked_by_quotechar('A|"B&C"A', '"', "|", "&"))
         self.assertFalse(masked_by_quotechar('A"B"C', '"', "", ""))
+        self.assertTrue(masked_by_quotechar('"A""B&C"', '"', "", "&"))
+        # the escape character only escapes the next character
+        self.assertFalse(masked_by_quotechar('"A\\"B"&"C"', '"', "\\", "&"))
+        self.assertFalse(masked_by_quotechar('"A\\\\"&"B"', '"', "\\", "&"))
+
+    def test_masked_by_quotechars(self) -> None:
+        data = '"a,b";c\n"d;e\\"f",g\n'
+        pairs = [('"', ""), ('"', "\\"), ("", ""), ("'", "\\")]
+        self.assertEqual(
+            masked_by_quotechars(data, pairs, [",", ";", "|", ""]),
+            {
+                ('"', ""): {",", "|"},
+                ('"', "\\"): {"|"},
+                ("", ""): {"|"},
+                ("'", "\\"): {"|"},
+            },
+        )
+        self.assertEqual(
+            masked_by_quotechars("", pairs[:1], ","), {pairs[0]: {","}}
+        )
 
     def test_filter_urls(self) -> None:
         data = "A,B\nwww.google.com,10\nhttps://gertjanvandenburg.com,25\n"
         exp = "A,B\nU,10\nU,25\n"
         self.assertEqual(exp, filter_urls(data))
 
+        data = "1,2.5,3\n4,5.25,6\n"
+        self.assertIs(filter_urls(data), data)
+
+        data = 'a;"http://localhost:8080/x";10.0.0.1:80,b.co;x.org/~u (1.5)'
+        exp = 'a;"U";U,U;U (1.5)'
+        self.assertEqual(exp, filter_urls(data))
+        self.assertEqual(exp, PATTERN_URL_FILTER.sub("U", data))
+
+    def test_filter_urls_prefix(self) -> None:
+        # a URL can end at a top-level domain inside a label
+        cases = {
+            "visit foo.com-bar now": "visit U-bar now",
+            "abc.de2;x": "U2;x",
+            "a.co.uk-1": "U-1",
+            "x;a.b.com_1,localhost-": "x;U_1,U-",
+        }
+        for data, exp in cases.items():
+            with self.subTest(data=data):
+                self.assertEqual(filter_urls(data), exp)
+                self.assertEqual(PATTERN_URL_FILTER.sub("U", data), exp)
+
+        # filter_urls only applies the pattern near anchors, and the pattern
+        # for full matches of cells agrees with it on full matches
+        parts = ["a", "Z", "1", ".", "-", "/", "_", ",", "co", "uk", "://"]
+        for n in range(1, 5):
+            for items in itertools.product(parts, repeat=n):
+                data = "".join(items)
+                self.assertEqual(
+                    filter_urls(data), PATTERN_URL_FILTER.sub("U", data), data
+                )
+                self.assertEqual(
+                    PATTERN_URL.fullmatch(data) is None,
+                    PATTERN_URL_FILTER.fullmatch(data) is None,
+                    data,
+                )
+
     def test_get_quotechars(self) -> None:
         data = "A,B,'A',B\"D\"E"
         exp = set(['"', "'", ""])
@@ -39,6 +102,30 @@ class PotentialDialectTestCase(unittest.TestCase):
         out = get_delimiters(data, "UTF-8")
         self.assertEqual(out, exp)
 
+    def test_preceding_escapechars(self) -> None:
+        data = 'a\\,b\\\\"c/d@;e'
+        self.assertEqual(
+            preceding_escapechars(data, "UTF-8", [",", '"', ";", ""]),
+            {",": {"\\"}, '"': {"\\"}, ";": {"@"}},
+        )
+        self.assertEqual(preceding_escapechars(data, "UTF-8", ["|"]), {})
+        self.assertEqual(preceding_escapechars("a,b", "UTF-8", [","]), {})
+
+    def test_get_dialects(self) -> None:
+        data = 'a,"b\\"c",d\n1,2,3\n'
+        dialects = get_dialects(data)
+        self.assertIn(SimpleDialect(",", '"', "\\"), dialects)
+        self.assertIn(SimpleDialect(",", '"', ""), dialects)
+        self.assertIn(SimpleDialect(",", "", ""), dialects)
+        self.assertNotIn(SimpleDialect(",", "", "\\"), dialects)
+        self.assertEqual(len(dialects), len(set(dialects)))
+
+        masked = get_dialects(data, test_masked_by_quotes=True)
+        self.assertEqual(
+            set(dialects) - set(masked),
+            {SimpleDialect("\\", '"', "\\"), SimpleDialect("\\", '"', "")},
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
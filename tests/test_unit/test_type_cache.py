@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for the shared type cache.
+
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from clevercsv.consistency import ConsistencyDetector
+from clevercsv.detect import Detector
+from clevercsv.detect_type import TypeDetector
+from clevercsv.type_cache import TypeCache
+
+
+class TypeCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.td = TypeDetector()
+
+    def test_lookup(self) -> None:
+        cache = TypeCache()
+        self.assertTrue(cache.lookup("123", False, self.td.is_known_type))
+        self.assertFalse(cache.lookup("{a", False, self.td.is_known_type))
+        self.assertTrue(cache.lookup("123", False, self.td.is_known_type))
+        info = cache.info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.size, 2)
+
+    def test_eviction_lru(self) -> None:
+        cache = TypeCache(capacity=2, policy="lru")
+        cache.lookup("a", False, self.td.is_known_type)
+        cache.lookup("b", False, self.td.is_known_type)
+        cache.lookup("a", False, self.td.is_known_type)
+        cache.lookup("c", False, self.td.is_known_type)
+        self.assertIn(("a", False), cache)
+        self.assertNotIn(("b", False), cache)
+        self.assertIn(("c", False), cache)
+        self.assertEqual(cache.info().evictions, 1)
+
+    def test_eviction_fifo(self) -> None:
+        cache = TypeCache(capacity=2, policy="fifo")
+        cache.lookup("a", False, self.td.is_known_type)
+        cache.lookup("b", False, self.td.is_known_type)
+        cache.lookup("a", False, self.td.is_known_type)
+        cache.lookup("c", False, self.td.is_known_type)
+        self.assertNotIn(("a", False), cache)
+        self.assertIn(("b", False), cache)
+        self.assertIn(("c", False), cache)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            TypeCache(capacity=0)
+        with self.assertRaises(ValueError):
+            TypeCache(policy="random")
+
+    def test_save_load(self) -> None:
+        cache = TypeCache()
+        for cell in ["1", "abc", "{a", "1.5"]:
+            cache.lookup(cell, False, self.td.is_known_type)
+        cache.lookup("a,b", True, self.td.is_known_type)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "cache.json")
+            cache.save(filename)
+            loaded = TypeCache.load(filename)
+            self.assertEqual(len(loaded), 5)
+            self.assertIn(("a,b", True), loaded)
+            self.assertFalse(loaded.lookup("{a", False, lambda c, q: True))
+
+            # entries from other versions are ignored
+            with open(filename, "r", encoding="utf-8") as fp:
+                obj = json.load(fp)
+            obj["version"] = "0.0.0"
+            with open(filename, "w", encoding="utf-8") as fp:
+                json.dump(obj, fp)
+            self.assertEqual(len(TypeCache.load(filename)), 0)
+
+    def test_shared_between_detectors(self) -> None:
+        # dates are not recognized by the C parser, so they use the cache
+        data = "a;2020-01-01;2.5\nb;2020-01-02;3.5\nc;2020-01-03;4.5"
+        cache = TypeCache()
+        first = ConsistencyDetector(type_cache=cache).detect(data)
+        misses = cache.info().misses
+        self.assertGreater(misses, 0)
+
+        second = ConsistencyDetector(type_cache=cache).detect(data)
+        self.assertEqual(first, second)
+        self.assertEqual(cache.info().misses, misses)
+        self.assertEqual(first, ConsistencyDetector().detect(data))
+
+        detector = Detector(type_cache=cache)
+        dialect = detector.detect(data, method="consistency")
+        self.assertEqual(dialect, first)
+        self.assertEqual(cache.info().misses, misses)
+
+    def test_threads(self) -> None:
+        cache = TypeCache(capacity=50)
+        cells = [str(i) for i in range(200)]
+
+        def work() -> None:
+            for cell in cells:
+                cache.lookup(cell, False, self.td.is_known_type)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        info = cache.info()
+        self.assertEqual(info.size, 50)
+        self.assertEqual(info.hits + info.misses, 800)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,9 @@ import os
 import tempfile
 import types
 import unittest
+import warnings
+
+from unittest import mock
 
 from typing import Any
 from typing import Dict
@@ -140,6 +143,126 @@ class WrappersTestCase(unittest.TestCase):
         with self.subTest(name="simple_encoding"):
             self._df_test(table, dialect, num_char=10, encoding="latin1")
 
+    def test_read_dataframe_infer_dtypes(self) -> None:
+        table: List[List[Any]] = [
+            ["int", "float", "missing", "date", "mixed", "text", "text"],
+            [1, 1.5, 1, "2020-01-15", 1, "a", "b"],
+            [2, 3, "", "2020-01-16", "x", "c", "d"],
+            [3, 4.25, "NA", "2020-01-17", 2, "e", "f"],
+        ]
+        dialect = SimpleDialect(delimiter=";", quotechar='"', escapechar="")
+        tmpfname = self._write_tmpfile(table, dialect)
+        try:
+            df = wrappers.read_dataframe(tmpfname, infer_dtypes=True)
+            exp = wrappers.read_dataframe(tmpfname)
+            self.assertEqual(list(df.columns), list(exp.columns))
+            self.assertEqual(df["int"].dtype, "int64")
+            self.assertEqual(df["float"].dtype, "float64")
+            self.assertEqual(df["missing"].dtype, "float64")
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["date"]))
+            self.assertEqual(list(df["mixed"]), ["1", "x", "2"])
+
+            df = wrappers.read_dataframe(
+                tmpfname, infer_dtypes=True, dtype={"int": "float64"}
+            )
+            self.assertEqual(df["int"].dtype, "float64")
+
+            with self.assertRaises(ValueError):
+                wrappers.read_dataframe(tmpfname, infer_dtypes=True, header=1)
+        finally:
+            os.unlink(tmpfname)
+
+        tmpfname = self._write_tmpfile(table[1:], dialect)
+        try:
+            df = wrappers.read_dataframe(
+                tmpfname, infer_dtypes=True, header=None
+            )
+            self.assertEqual(df[0].dtype, "int64")
+            self.assertEqual(list(df[4]), ["1", "x", "2"])
+        finally:
+            os.unlink(tmpfname)
+
+    def test_read_dataframe_infer_dtypes_sample(self) -> None:
+        table: List[List[Any]] = [["int", "float", "text", "date"]]
+        table.extend([i, i, i, "2020-01-%02i" % i] for i in range(1, 11))
+        table.append([11, 1.5, "x", "2020-01-11"])
+        dialect = SimpleDialect(delimiter=",", quotechar='"', escapechar="")
+        tmpfname = self._write_tmpfile(table, dialect)
+        try:
+            # the types of the sample don't fit the last row, so the types
+            # are inferred by pandas
+            df = wrappers.read_dataframe(
+                tmpfname, infer_dtypes=True, infer_sample_rows=5
+            )
+            exp = wrappers.read_dataframe(tmpfname)
+            for column in exp.columns:
+                with self.subTest(column=column):
+                    self.assertEqual(df[column].dtype, exp[column].dtype)
+                    self.assertEqual(list(df[column]), list(exp[column]))
+
+            df = wrappers.read_dataframe(
+                tmpfname, infer_dtypes=True, infer_sample_rows=None
+            )
+            self.assertEqual(df["int"].dtype, "int64")
+            self.assertEqual(df["float"].dtype, "float64")
+            self.assertEqual(list(df["text"])[-2:], ["10", "x"])
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["date"]))
+        finally:
+            os.unlink(tmpfname)
+
+        # the types of the sample are used if they fit all rows
+        tmpfname = self._write_tmpfile(table[:-1], dialect)
+        try:
+            with mock.patch(
+                "clevercsv.wrappers.infer_column_types",
+                wraps=wrappers.infer_column_types,
+            ) as infer:
+                df = wrappers.read_dataframe(
+                    tmpfname, infer_dtypes=True, infer_sample_rows=5
+                )
+            self.assertEqual(infer.call_args.kwargs["sample_rows"], 5)
+            self.assertEqual(df["float"].dtype, "int64")
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["date"]))
+        finally:
+            os.unlink(tmpfname)
+
+    def test_read_dataframe_infer_dtypes_dates(self) -> None:
+        # Ambiguous dates are left as text, like read_dataframe does
+        table = [
+            ["dayfirst", "version", "cjk", "iso", "isotime"],
+            ["13/02/2021", "1.2.20", "2021年1月2日", "2021-02-01", ""],
+            [
+                "01/02/2021",
+                "3.4.21",
+                "2021年3月4日",
+                "",
+                "2021-02-01 10:00:00",
+            ],
+            ["02/03/2021", "10.11.12", "2021年5月6日", "2021-02-03", ""],
+        ]
+        dialect = SimpleDialect(delimiter=",", quotechar='"', escapechar="")
+        tmpfname = self._write_tmpfile(table, dialect)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                df = wrappers.read_dataframe(tmpfname, infer_dtypes=True)
+            exp = wrappers.read_dataframe(tmpfname)
+            for i, column in enumerate(["dayfirst", "version", "cjk"]):
+                with self.subTest(column=column):
+                    self.assertEqual(list(df[column]), list(exp[column]))
+                    self.assertEqual(
+                        list(df[column]), [row[i] for row in table[1:]]
+                    )
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["iso"]))
+            self.assertTrue(
+                pd.api.types.is_datetime64_any_dtype(df["isotime"])
+            )
+            self.assertEqual(
+                df["isotime"][1], pd.Timestamp("2021-02-01 10:00:00")
+            )
+        finally:
+            os.unlink(tmpfname)
+
     def test_read_table(self) -> None:
         table: List[List[Any]]
 